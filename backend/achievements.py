@@ -0,0 +1,84 @@
+import json
+import os
+from bisect import bisect_right
+from collections import defaultdict
+
+# Métricas suportadas (tempos em minutos)
+#   sessions      total de sessões concluídas
+#   work_time     tempo total de trabalho
+#   streak        maior sequência de dias consecutivos com sessões
+#   project_time  tempo de trabalho acumulado em um mesmo projeto
+METRICS = ('sessions', 'work_time', 'streak', 'project_time')
+
+DEFAULT_RULES_PATH = os.path.join(os.path.dirname(__file__), "achievement_rules.json")
+
+class AchievementRule:
+    """Regra de conquista: desbloqueada quando ``metric`` atinge ``threshold``"""
+    __slots__ = ('title', 'description', 'achievement_type', 'metric', 'threshold')
+
+    def __init__(self, title: str, description: str, achievement_type: str, metric: str, threshold: int):
+        if metric not in METRICS:
+            raise ValueError(f"Métrica desconhecida na conquista '{title}': {metric}")
+        if int(threshold) <= 0:
+            raise ValueError(f"Limite inválido na conquista '{title}': {threshold}")
+        self.title = title
+        self.description = description
+        self.achievement_type = achievement_type
+        self.metric = metric
+        self.threshold = int(threshold)
+
+class RuleCatalog:
+    """Catálogo de regras agrupadas por métrica e ordenadas por limite
+
+    Encontrar as regras cruzadas entre dois valores de uma métrica é uma busca
+    binária, independente do número de regras cadastradas.
+    """
+
+    def __init__(self, rules):
+        self.rules = list(rules)
+        titles = [rule.title for rule in self.rules]
+        if len(titles) != len(set(titles)):
+            raise ValueError("Títulos de conquistas duplicados no catálogo")
+
+        self._by_metric = defaultdict(list)
+        for rule in sorted(self.rules, key=lambda rule: rule.threshold):
+            self._by_metric[rule.metric].append(rule)
+        self._thresholds = {
+            metric: [rule.threshold for rule in rules]
+            for metric, rules in self._by_metric.items()
+        }
+
+    @classmethod
+    def from_file(cls, path: str):
+        """Carregar o catálogo de um arquivo JSON ``{"rules": [...]}``"""
+        with open(path, encoding="utf-8") as rules_file:
+            data = json.load(rules_file)
+        return cls(AchievementRule(**rule) for rule in data["rules"])
+
+    def has_metric(self, metric: str) -> bool:
+        return metric in self._by_metric
+
+    def crossed(self, metric: str, old_value: int, new_value: int):
+        """Regras com ``old_value < threshold <= new_value``"""
+        thresholds = self._thresholds.get(metric)
+        if not thresholds or new_value <= old_value:
+            return []
+        start = bisect_right(thresholds, old_value)
+        end = bisect_right(thresholds, new_value)
+        return self._by_metric[metric][start:end]
+
+    def satisfied(self, metric: str, value: int):
+        """Regras com ``threshold <= value``"""
+        thresholds = self._thresholds.get(metric)
+        if not thresholds:
+            return []
+        return self._by_metric[metric][:bisect_right(thresholds, value)]
+
+_catalog = None
+
+def get_rule_catalog() -> RuleCatalog:
+    """Catálogo carregado uma única vez (ACHIEVEMENT_RULES_PATH ou o arquivo padrão)"""
+    global _catalog
+    if _catalog is None:
+        _catalog = RuleCatalog.from_file(os.getenv("ACHIEVEMENT_RULES_PATH", DEFAULT_RULES_PATH))
+    return _catalog
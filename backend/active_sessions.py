@@ -0,0 +1,294 @@
+import asyncio
+import json
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+from sqlalchemy.util import await_only
+
+from .schemas import PomodoroSessionResponse
+
+# Estados em que uma sessão fica no registro
+ACTIVE_STATUSES = ('running', 'paused')
+
+class ActiveSession:
+    """Registro compacto de uma sessão em andamento ou pausada"""
+    __slots__ = ('id', 'user_id', 'project_id', 'status', 'mode', 'start_time', 'work_duration', 'break_duration')
+
+    def __init__(self, id, user_id, project_id, status, mode, start_time, work_duration, break_duration):
+        self.id = id
+        self.user_id = user_id
+        self.project_id = project_id
+        self.status = status
+        self.mode = mode
+        self.start_time = start_time
+        self.work_duration = work_duration
+        self.break_duration = break_duration
+
+    @classmethod
+    def from_session(cls, session):
+        return cls(*(getattr(session, name) for name in cls.__slots__))
+
+    def to_dict(self):
+        data = {name: getattr(self, name) for name in self.__slots__}
+        data['start_time'] = self.start_time.isoformat()
+        return data
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**{**data, 'start_time': datetime.fromisoformat(data['start_time'])})
+
+    def to_response(self, **overrides):
+        """Resposta da API a partir do registro (sem consultar o banco)"""
+        fields = {name: getattr(self, name) for name in self.__slots__}
+        fields.update(overrides)
+        return PomodoroSessionResponse(**fields)
+
+class _UserSessions:
+    """Sessões de um usuário no registro em memória"""
+    __slots__ = ('since', 'loaded', 'session_ids')
+
+    def __init__(self, since: float, loaded: bool = False):
+        self.since = since
+        self.loaded = loaded
+        self.session_ids = set()
+
+class MemoryActiveSessionStore:
+    """Registro em memória (um por processo)
+
+    Cada usuário sai do registro, com as suas sessões, ``ttl`` segundos após
+    ser carregado do banco; assim as transições feitas em outro worker são
+    vistas na próxima leitura. No máximo ``max_users`` usuários são mantidos
+    (os menos usados recentemente saem primeiro).
+    """
+
+    def __init__(self, max_users: int = 10000, ttl: float = 30):
+        self.max_users = max_users
+        self.ttl = ttl
+        self._sessions = {}
+        self._users = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _user(self, user_id: int, create: bool = False):
+        """Entrada do usuário (com a trava), descartando-a se expirada"""
+        entry = self._users.get(user_id)
+        if entry is not None and time.monotonic() - entry.since >= self.ttl:
+            self._evict(user_id)
+            entry = None
+        if entry is None and create:
+            entry = self._users[user_id] = _UserSessions(time.monotonic())
+            while len(self._users) > self.max_users:
+                self._evict(next(iter(self._users)))
+        if entry is not None:
+            self._users.move_to_end(user_id)
+        return entry
+
+    def _evict(self, user_id: int):
+        entry = self._users.pop(user_id, None)
+        if entry is not None:
+            for session_id in entry.session_ids:
+                self._sessions.pop(session_id, None)
+
+    def get(self, session_id: int):
+        with self._lock:
+            record = self._sessions.get(session_id)
+            if record is None or self._user(record.user_id) is None:
+                return None
+            return record
+
+    def put(self, record: ActiveSession):
+        with self._lock:
+            self._sessions[record.id] = record
+            self._user(record.user_id, create=True).session_ids.add(record.id)
+
+    def delete(self, session_id: int):
+        with self._lock:
+            record = self._sessions.pop(session_id, None)
+            if record is not None and record.user_id in self._users:
+                self._users[record.user_id].session_ids.discard(session_id)
+
+    def for_user(self, user_id: int):
+        """Sessões ativas do usuário, ou None se o usuário não foi carregado ou expirou"""
+        with self._lock:
+            entry = self._user(user_id)
+            if entry is None or not entry.loaded:
+                return None
+            return [self._sessions[session_id] for session_id in entry.session_ids]
+
+    def load_user(self, user_id: int, records):
+        with self._lock:
+            self._evict(user_id)
+            entry = self._user(user_id, create=True)
+            entry.loaded = True
+            entry.session_ids = {record.id for record in records}
+            self._sessions.update((record.id, record) for record in records)
+
+    def clear(self):
+        with self._lock:
+            self._sessions.clear()
+            self._users.clear()
+
+class RedisActiveSessionStore:
+    """Registro compartilhado entre workers via Redis (dependência opcional)
+
+    Dentro de ``AsyncSession.run_sync`` (e de ``greenlet_spawn`` nos serviços
+    assíncronos) os comandos são aguardados no próprio event loop com o
+    cliente ``redis.asyncio`` (``await_only``); nas threads usam o cliente
+    síncrono.
+
+    A marca de usuário carregado expira após ``ttl`` segundos, como no
+    backend ``memory``, e as sessões e conjuntos por usuário após ``max_age``
+    segundos; assim um worker que caiu no meio de uma transição (ou uma
+    alteração feita direto no banco) não deixa o registro desatualizado.
+    """
+
+    def __init__(self, url: str, ttl: float = 30, max_age: float = 24 * 3600, prefix: str = "productivity:active:"):
+        try:
+            import redis
+            import redis.asyncio
+        except ImportError as exc:
+            raise RuntimeError("ACTIVE_SESSIONS_BACKEND=redis requer o pacote 'redis'") from exc
+
+        self.client = redis.Redis.from_url(url)
+        self.async_client = redis.asyncio.Redis.from_url(url)
+        self.ttl = max(1, math.ceil(ttl))
+        self.max_age = max(1, math.ceil(max_age))
+        self.prefix = prefix
+
+    def _execute(self, command):
+        """``command(cliente)`` com o cliente adequado ao contexto de execução"""
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return command(self.client)
+        return await_only(command(self.async_client))
+
+    def _put(self, pipeline, record: ActiveSession):
+        pipeline.set(f"{self.prefix}session:{record.id}", json.dumps(record.to_dict()), ex=self.max_age)
+        pipeline.sadd(f"{self.prefix}user:{record.user_id}", record.id)
+        pipeline.expire(f"{self.prefix}user:{record.user_id}", self.max_age)
+
+    def get(self, session_id: int):
+        value = self._execute(lambda client: client.get(f"{self.prefix}session:{session_id}"))
+        return ActiveSession.from_dict(json.loads(value)) if value else None
+
+    def put(self, record: ActiveSession):
+        def command(client):
+            pipeline = client.pipeline()
+            self._put(pipeline, record)
+            return pipeline.execute()
+        self._execute(command)
+
+    def delete(self, session_id: int):
+        record = self.get(session_id)
+        if record is not None:
+            def command(client):
+                pipeline = client.pipeline()
+                pipeline.delete(f"{self.prefix}session:{session_id}")
+                pipeline.srem(f"{self.prefix}user:{record.user_id}", session_id)
+                return pipeline.execute()
+            self._execute(command)
+
+    def for_user(self, user_id: int):
+        def members(client):
+            pipeline = client.pipeline(transaction=False)
+            pipeline.exists(f"{self.prefix}loaded:{user_id}")
+            pipeline.smembers(f"{self.prefix}user:{user_id}")
+            return pipeline.execute()
+        loaded, session_ids = self._execute(members)
+        if not loaded:
+            return None
+        if not session_ids:
+            return []
+        keys = [f"{self.prefix}session:{int(session_id)}" for session_id in session_ids]
+        values = self._execute(lambda client: client.mget(keys))
+        return [ActiveSession.from_dict(json.loads(value)) for value in values if value]
+
+    def load_user(self, user_id: int, records):
+        def command(client):
+            pipeline = client.pipeline()
+            pipeline.delete(f"{self.prefix}user:{user_id}")
+            for record in records:
+                self._put(pipeline, record)
+            pipeline.set(f"{self.prefix}loaded:{user_id}", 1, ex=self.ttl)
+            return pipeline.execute()
+        self._execute(command)
+
+    def clear(self):
+        keys = list(self.client.scan_iter(f"{self.prefix}*"))
+        if keys:
+            self.client.delete(*keys)
+
+class ActiveSessionRegistry:
+    """Sessões em andamento/pausadas por id e por usuário, servidas sem consultar o banco
+
+    Sessões concluídas ou interrompidas são removidas na transição; sessões
+    abandonadas há mais de ``max_age`` deixam de ser listadas e são removidas.
+    Em caso de falta, quem chama consulta o banco e repovoa o registro.
+    """
+
+    def __init__(self, store, max_age: timedelta = timedelta(hours=24)):
+        self.store = store
+        self.max_age = max_age
+
+    def get(self, session_id: int):
+        return self.store.get(session_id)
+
+    def track(self, session):
+        """Registrar (ou atualizar) uma sessão; sessões finalizadas são removidas"""
+        if session.status in ACTIVE_STATUSES:
+            self.store.put(ActiveSession.from_session(session))
+        else:
+            self.store.delete(session.id)
+
+    def update(self, session_id: int, **fields):
+        record = self.store.get(session_id)
+        if record is not None:
+            for name, value in fields.items():
+                setattr(record, name, value)
+            self.track(record)
+
+    def discard(self, session_id: int):
+        self.store.delete(session_id)
+
+    def for_user(self, user_id: int):
+        """Sessões ativas do usuário, ou None se for preciso carregar do banco"""
+        records = self.store.for_user(user_id)
+        if records is None:
+            return None
+        oldest = datetime.utcnow() - self.max_age
+        for record in [record for record in records if record.start_time < oldest]:
+            self.store.delete(record.id)
+        return sorted(
+            (record for record in records if record.start_time >= oldest),
+            key=lambda record: (record.start_time, record.id)
+        )
+
+    def load_user(self, user_id: int, sessions):
+        """Repovoar o registro do usuário a partir das sessões ativas lidas do banco"""
+        self.store.load_user(user_id, [ActiveSession.from_session(session) for session in sessions])
+        return self.for_user(user_id)
+
+    def clear(self):
+        self.store.clear()
+
+def create_active_session_registry():
+    """Criar o registro a partir das variáveis de ambiente"""
+    max_age = timedelta(hours=float(os.getenv("ACTIVE_SESSION_MAX_AGE_HOURS", "24")))
+    if os.getenv("ACTIVE_SESSIONS_BACKEND", "memory") == "redis":
+        store = RedisActiveSessionStore(
+            os.getenv("ACTIVE_SESSIONS_URL", "redis://localhost:6379/0"),
+            ttl=float(os.getenv("ACTIVE_SESSIONS_TTL", "30")),
+            max_age=max_age.total_seconds()
+        )
+    else:
+        store = MemoryActiveSessionStore(
+            max_users=int(os.getenv("ACTIVE_SESSIONS_MAX_USERS", "10000")),
+            ttl=float(os.getenv("ACTIVE_SESSIONS_TTL", "30"))
+        )
+    return ActiveSessionRegistry(store, max_age=max_age)
+
+active_sessions = create_active_session_registry()
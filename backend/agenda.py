@@ -0,0 +1,250 @@
+"""Consultas por intervalo na agenda (eventos do usuário).
+
+Um evento ``[start_time, end_time)`` sobrepõe a janela ``[start, end)`` quando
+``start_time < end`` e ``end_time > start``. No banco essa condição é resolvida
+pelos índices ``(owner_id, start_time, end_time)`` e
+``(owner_id, end_time, start_time)`` (ver ``CRUDEvent.get_user_events``).
+
+Eventos recorrentes são guardados como uma única linha por série (ver
+``backend/recurrence.py``) e expandidos apenas na janela consultada.
+
+Cada processo mantém em memória a agenda de cada usuário: as séries com as
+suas exceções, as janelas já expandidas (LRU) e, para detectar conflitos e
+encontrar horários livres, um índice de intervalos dos eventos simples. A
+agenda é carregada do banco no primeiro uso e invalidada quando os eventos do
+usuário mudam; com vários workers, as alterações feitas em outro processo são
+vistas após ``AGENDA_CACHE_TTL`` segundos.
+"""
+import os
+import threading
+import time
+from bisect import bisect_left
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+from sqlalchemy import select
+from sqlalchemy.orm import selectinload
+
+from .models import Event
+from .recurrence import RecurrenceRule, Series
+
+# Janela em que as ocorrências de uma nova série são verificadas contra conflitos
+CONFLICT_HORIZON = timedelta(days=30)
+
+def gaps(busy, start: datetime, end: datetime, duration: timedelta, limit: int = None):
+    """Janelas livres de pelo menos ``duration`` entre os intervalos ocupados
+
+    ``busy`` são tuplas (início, fim, ...) ordenadas pelo início.
+    """
+    slots = []
+    cursor = start
+    for busy_start, busy_end, *_ in busy:
+        if busy_start - cursor >= duration:
+            slots.append((cursor, busy_start))
+            if limit and len(slots) >= limit:
+                return slots
+        cursor = max(cursor, busy_end)
+    if end - cursor >= duration:
+        slots.append((cursor, end))
+    return slots[:limit] if limit else slots
+
+class IntervalIndex:
+    """Árvore de intervalos estática sobre os eventos ordenados por início
+
+    A árvore é implícita: o nó da faixa ``[lo, hi)`` é o elemento do meio e
+    ``_max_end`` guarda o maior fim de cada subárvore, o que permite podar
+    ramos que terminam antes da janela. Consultas custam O(log n + k).
+    """
+
+    def __init__(self, intervals=()):
+        # Tuplas (início, fim, id)
+        self._items = sorted(intervals)
+        self._starts = [item[0] for item in self._items]
+        self._max_end = [None] * len(self._items)
+        self._build(0, len(self._items))
+
+    def __len__(self):
+        return len(self._items)
+
+    def _build(self, lo: int, hi: int):
+        if lo >= hi:
+            return None
+        mid = (lo + hi) // 2
+        max_end = self._items[mid][1]
+        for child in (self._build(lo, mid), self._build(mid + 1, hi)):
+            if child is not None and child > max_end:
+                max_end = child
+        self._max_end[mid] = max_end
+        return max_end
+
+    def overlapping(self, start: datetime, end: datetime):
+        """Intervalos que sobrepõem ``[start, end)``, em ordem de início"""
+        limit = bisect_left(self._starts, end)
+        found = []
+
+        def visit(lo, hi):
+            if lo >= hi or lo >= limit:
+                return
+            mid = (lo + hi) // 2
+            if self._max_end[mid] <= start:
+                return
+            visit(lo, mid)
+            if mid < limit:
+                item = self._items[mid]
+                if item[1] > start:
+                    found.append(item)
+                visit(mid + 1, hi)
+
+        visit(0, len(self._items))
+        return found
+
+    def free_slots(self, start: datetime, end: datetime, duration: timedelta, limit: int = None):
+        """Janelas livres de pelo menos ``duration`` dentro de ``[start, end)``"""
+        return gaps(self.overlapping(start, end), start, end, duration, limit)
+
+class UserAgenda:
+    """Agenda de um usuário: séries recorrentes e índice dos eventos simples"""
+
+    def __init__(self, series, max_windows: int = 32):
+        self.series = series
+        self.index = None
+        self.max_windows = max_windows
+        self._windows = OrderedDict()
+        self._lock = threading.Lock()
+
+    def occurrences(self, start: datetime, end: datetime):
+        """Ocorrências das séries em ``[start, end)``, expandidas uma vez por janela"""
+        key = (start, end)
+        with self._lock:
+            found = self._windows.get(key)
+            if found is not None:
+                self._windows.move_to_end(key)
+                return found
+
+        found = [occurrence for series in self.series for occurrence in series.occurrences(start, end)]
+        found.sort(key=lambda occurrence: (occurrence.start_time, occurrence.id))
+        with self._lock:
+            self._windows[key] = found
+            while len(self._windows) > self.max_windows:
+                self._windows.popitem(last=False)
+        return found
+
+    def busy(self, start: datetime, end: datetime):
+        """Intervalos ocupados (início, fim, id) que sobrepõem ``[start, end)``"""
+        intervals = self.index.overlapping(start, end)
+        intervals.extend(
+            (occurrence.start_time, occurrence.end_time, occurrence.id)
+            for occurrence in self.occurrences(start, end)
+        )
+        intervals.sort()
+        return intervals
+
+class AgendaCache:
+    """Agendas por usuário (LRU com expiração, uma por processo)"""
+
+    def __init__(self, max_users: int = 1000, ttl: float = 60, max_windows: int = 32):
+        self.max_users = max_users
+        self.ttl = ttl
+        self.max_windows = max_windows
+        self._entries = OrderedDict()
+        self._generations = {}
+        self._lock = threading.Lock()
+
+    async def get(self, db, user_id: int, events: bool = True) -> UserAgenda:
+        """Agenda do usuário, carregada do banco se ausente ou expirada
+
+        Com ``events=False`` o índice dos eventos simples não é carregado
+        (basta para expandir as séries).
+        """
+        with self._lock:
+            agenda = None
+            entry = self._entries.get(user_id)
+            if entry is not None and time.monotonic() - entry[0] < self.ttl:
+                self._entries.move_to_end(user_id)
+                agenda = entry[1]
+                if agenda.index is not None or not events:
+                    return agenda
+            generation = self._generations.get(user_id, 0)
+
+        if agenda is None:
+            result = await db.execute(
+                select(Event)
+                .options(selectinload(Event.exceptions))
+                .where(Event.owner_id == user_id, Event.recurrence_rule.isnot(None))
+                # A sessão pode já ter a série carregada com exceções antigas
+                .execution_options(populate_existing=True)
+            )
+            agenda = UserAgenda(
+                [Series(event, event.exceptions) for event in result.scalars()],
+                max_windows=self.max_windows
+            )
+        if events:
+            result = await db.execute(
+                select(Event.start_time, Event.end_time, Event.id)
+                .where(
+                    Event.owner_id == user_id,
+                    Event.start_time.isnot(None),
+                    Event.recurrence_rule.is_(None)
+                )
+                .order_by(Event.start_time)
+            )
+            agenda.index = IntervalIndex(
+                (row.start_time, row.end_time or row.start_time, row.id) for row in result
+            )
+
+        with self._lock:
+            # Não guardar uma agenda carregada antes de uma invalidação
+            if self._generations.get(user_id, 0) == generation:
+                if entry is None or entry[1] is not agenda:
+                    entry = (time.monotonic(), agenda)
+                self._entries[user_id] = entry
+                self._entries.move_to_end(user_id)
+                while len(self._entries) > self.max_users:
+                    self._entries.popitem(last=False)
+        return agenda
+
+    def invalidate(self, user_id: int):
+        with self._lock:
+            self._entries.pop(user_id, None)
+            self._generations[user_id] = self._generations.get(user_id, 0) + 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._generations.clear()
+
+agenda_cache = AgendaCache(
+    max_users=int(os.getenv("AGENDA_CACHE_USERS", "1000")),
+    ttl=float(os.getenv("AGENDA_CACHE_TTL", "60")),
+    max_windows=int(os.getenv("AGENDA_CACHE_WINDOWS", "32"))
+)
+
+async def find_conflicts(db, user_id: int, start: datetime, end: datetime, recurrence_rule: str = None):
+    """Eventos do usuário que sobrepõem ``[start, end)`` como (início, fim, id)
+
+    Para uma nova série (``recurrence_rule``), verifica as suas ocorrências
+    nos primeiros ``CONFLICT_HORIZON``.
+    """
+    agenda = await agenda_cache.get(db, user_id)
+    if recurrence_rule is None:
+        return agenda.busy(start, end)
+
+    duration = end - start
+    horizon = start + CONFLICT_HORIZON
+    busy = agenda.busy(start, horizon + duration)
+    conflicts = []
+    for occurrence_start in RecurrenceRule.parse(recurrence_rule).starts(start):
+        if occurrence_start >= horizon:
+            break
+        occurrence_end = occurrence_start + duration
+        conflicts.extend(
+            interval for interval in busy
+            if interval[0] < occurrence_end and interval[1] > occurrence_start
+        )
+    return conflicts
+
+async def free_slots(db, user_id: int, start: datetime, end: datetime,
+                     duration: timedelta = timedelta(minutes=25), limit: int = None):
+    """Horários livres onde cabe um bloco de ``duration`` (padrão: um Pomodoro)"""
+    agenda = await agenda_cache.get(db, user_id)
+    return gaps(agenda.busy(start, end), start, end, duration, limit)
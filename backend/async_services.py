@@ -0,0 +1,137 @@
+import asyncio
+from datetime import datetime
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.util import greenlet_spawn
+
+from . import write_behind
+from .active_sessions import active_sessions
+from .models import PomodoroSession
+from .pagination import DEFAULT_PAGE_SIZE
+from .schemas import PomodoroSessionResponse
+from .services import AchievementService, DashboardService, PomodoroService, StatisticsService
+
+# Os serviços assíncronos executam a mesma lógica dos serviços síncronos
+# através de AsyncSession.run_sync: o código ORM roda em um greenlet e todo
+# I/O de banco passa pelo driver assíncrono (aiosqlite/asyncpg), liberando o
+# event loop enquanto espera o banco em vez de ocupar uma thread do pool.
+# Fora de run_sync, o registro de sessões ativas é acessado via greenlet_spawn
+# para que o backend Redis use o cliente assíncrono.
+
+class AsyncPomodoroService:
+    @staticmethod
+    async def start_session(db: AsyncSession, user_id: int, project_id: int = None, work_duration: int = 25, break_duration: int = 5):
+        """Iniciar nova sessão de Pomodoro"""
+        buffer = write_behind.write_buffer
+        if buffer is not None:
+            # Modo write-behind: aguarda o próximo group commit para obter o id
+            started_at = datetime.utcnow()
+            session_id = await asyncio.wrap_future(
+                buffer.submit_start(user_id, project_id, work_duration, break_duration, started_at)
+            )
+            session = PomodoroSessionResponse(
+                id=session_id,
+                user_id=user_id,
+                project_id=project_id,
+                work_duration=work_duration,
+                break_duration=break_duration,
+                status='running',
+                mode='work',
+                start_time=started_at
+            )
+            await greenlet_spawn(active_sessions.track, session)
+            return session
+
+        return await db.run_sync(
+            PomodoroService.start_session,
+            user_id=user_id,
+            project_id=project_id,
+            work_duration=work_duration,
+            break_duration=break_duration
+        )
+
+    @staticmethod
+    async def _buffer_transition(db: AsyncSession, session_id: int, kind: str, **fields):
+        """Enfileirar uma transição no buffer write-behind e devolver a visão mesclada"""
+        buffer = write_behind.write_buffer
+        record = await greenlet_spawn(active_sessions.get, session_id)
+        if record is not None:
+            session = record.to_response()
+        else:
+            session = await db.get(PomodoroSession, session_id)
+            if session is None:
+                return None
+        current = buffer.merged(session)
+        if kind == 'complete' and current.is_completed:
+            # Conclusão repetida não altera nada (como no modo síncrono)
+            return current
+        buffer.submit_transition(current.user_id, session_id, kind, **fields)
+        merged = buffer.merged(session)
+        await greenlet_spawn(active_sessions.track, merged)
+        return merged
+
+    @staticmethod
+    async def complete_session(db: AsyncSession, session_id: int, mode: str = 'work', total_time: int = 25):
+        """Completar sessão de Pomodoro"""
+        if write_behind.write_buffer is not None:
+            return await AsyncPomodoroService._buffer_transition(db, session_id, 'complete', mode=mode, total_time=total_time)
+        return await db.run_sync(PomodoroService.complete_session, session_id=session_id, mode=mode, total_time=total_time)
+
+    @staticmethod
+    async def pause_session(db: AsyncSession, session_id: int):
+        """Pausar sessão de Pomodoro"""
+        if write_behind.write_buffer is not None:
+            return await AsyncPomodoroService._buffer_transition(db, session_id, 'pause')
+        return await db.run_sync(PomodoroService.pause_session, session_id)
+
+    @staticmethod
+    async def stop_session(db: AsyncSession, session_id: int):
+        """Interromper sessão de Pomodoro"""
+        if write_behind.write_buffer is not None:
+            return await AsyncPomodoroService._buffer_transition(db, session_id, 'stop')
+        return await db.run_sync(PomodoroService.stop_session, session_id)
+
+    @staticmethod
+    async def get_active_sessions(db: AsyncSession, user_id: int):
+        """Sessões em andamento ou pausadas do usuário"""
+        records = await greenlet_spawn(active_sessions.for_user, user_id)
+        if records is not None:
+            # Caminho quente: respondido do registro, sem abrir conexão
+            return [record.to_response() for record in records]
+        return await db.run_sync(PomodoroService.get_active_sessions, user_id)
+
+    @staticmethod
+    async def list_sessions(db: AsyncSession, user_id: int, cursor: str = None, limit: int = DEFAULT_PAGE_SIZE):
+        """Listar sessões do usuário paginadas por cursor"""
+        page = await db.run_sync(PomodoroService.list_sessions, user_id, cursor, limit)
+        if write_behind.write_buffer is not None:
+            page['items'] = [write_behind.write_buffer.merged(session) for session in page['items']]
+        return page
+
+    @staticmethod
+    async def ingest_sessions(db: AsyncSession, user_id: int, sessions):
+        """Registrar em lote sessões concluídas offline"""
+        return await db.run_sync(PomodoroService.ingest_sessions, user_id, sessions)
+
+class AsyncStatisticsService:
+    @staticmethod
+    async def calculate_productivity(db: AsyncSession, user_id: int, source: str = 'rollups'):
+        """Calcular estatísticas de produtividade"""
+        return await db.run_sync(StatisticsService.calculate_productivity, user_id, source)
+
+class AsyncAchievementService:
+    @staticmethod
+    async def check_pomodoro_achievements(db: AsyncSession, user_id: int):
+        """Verificar e desbloquear conquistas de Pomodoro"""
+        return await db.run_sync(AchievementService.check_pomodoro_achievements, user_id)
+
+    @staticmethod
+    async def get_unlocked_achievements(db: AsyncSession, user_id: int):
+        """Listar as conquistas desbloqueadas do usuário"""
+        return await db.run_sync(AchievementService.get_unlocked_achievements, user_id)
+
+class AsyncDashboardService:
+    @staticmethod
+    async def get_dashboard_data(db: AsyncSession, user_id: int):
+        """Calcular os totais do dashboard"""
+        return await db.run_sync(DashboardService.get_dashboard_data, user_id)
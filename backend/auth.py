@@ -0,0 +1,188 @@
+"""Autenticação por JWT (Bearer) com caches por processo.
+
+Cada requisição autenticada precisaria decodificar o token e buscar o usuário
+no banco. Para tirar esse custo das rotas mais usadas (timer do Pomodoro):
+
+- as claims decodificadas ficam num cache LRU com expiração, indexado pelo
+  hash SHA-256 do token (o token em si não é guardado) e nunca além do
+  ``exp`` do próprio token;
+- o usuário resolvido fica num cache pequeno por processo, invalidado quando
+  o ``User`` é alterado ou removido pelo ORM (ou por ``invalidate_user``).
+  Alterações feitas em outro worker são vistas após ``USER_CACHE_TTL``.
+"""
+import hashlib
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+from fastapi import Depends, HTTPException, Query, WebSocket, WebSocketException, status
+from fastapi.security import OAuth2PasswordBearer
+from jose import JWTError, jwt
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .database import AsyncSessionLocal, get_async_db
+from .models import User
+
+logger = logging.getLogger(__name__)
+
+ALGORITHM = "HS256"
+ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "60"))
+
+SECRET_KEY = os.getenv("SECRET_KEY")
+if not SECRET_KEY:
+    logger.warning("SECRET_KEY não definida: usando a chave de desenvolvimento (não use em produção)")
+    SECRET_KEY = "dev-secret-key-change-me"
+
+oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/token")
+
+class TTLCache:
+    """LRU limitado com expiração por entrada (um por processo)"""
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if time.monotonic() >= expires_at:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl: float = None):
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def pop(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+token_cache = TTLCache(
+    max_size=int(os.getenv("TOKEN_CACHE_SIZE", "10000")),
+    ttl=float(os.getenv("TOKEN_CACHE_TTL", "300"))
+)
+user_cache = TTLCache(
+    max_size=int(os.getenv("USER_CACHE_SIZE", "1000")),
+    ttl=float(os.getenv("USER_CACHE_TTL", "60"))
+)
+
+class CurrentUser:
+    """Dados do usuário autenticado (cópia desanexada da sessão do banco)"""
+    __slots__ = ('id', 'username', 'email', 'is_active')
+
+    def __init__(self, id: int, username: str, email: str, is_active: bool):
+        self.id = id
+        self.username = username
+        self.email = email
+        self.is_active = is_active
+
+def create_access_token(data: dict, expires_delta: timedelta = None) -> str:
+    """JWT assinado com as claims de ``data`` (``sub`` = id do usuário)"""
+    claims = dict(data)
+    claims["exp"] = datetime.utcnow() + (expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
+    return jwt.encode(claims, SECRET_KEY, algorithm=ALGORITHM)
+
+def _credentials_error():
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Credenciais inválidas",
+        headers={"WWW-Authenticate": "Bearer"}
+    )
+
+def verify_token(token: str) -> int:
+    """Id do usuário do token (decodificado uma vez por ``TOKEN_CACHE_TTL``)
+
+    Lança ``HTTPException`` 401 para tokens inválidos ou expirados.
+    """
+    key = hashlib.sha256(token.encode()).digest()
+    cached = token_cache.get(key)
+    if cached is not None:
+        return cached
+
+    try:
+        claims = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        user_id = int(claims["sub"])
+        expires_in = claims["exp"] - time.time()
+    except (JWTError, KeyError, TypeError, ValueError):
+        raise _credentials_error()
+    token_cache.set(key, user_id, ttl=expires_in)
+    return user_id
+
+async def load_user(db: AsyncSession, user_id: int):
+    """Usuário pelo id, do cache do processo ou do banco (None se não existir)"""
+    user = user_cache.get(user_id)
+    if user is not None:
+        return user
+    result = await db.execute(
+        select(User.id, User.username, User.email, User.is_active).where(User.id == user_id)
+    )
+    row = result.first()
+    if row is None:
+        return None
+    user = CurrentUser(row.id, row.username, row.email, bool(row.is_active))
+    user_cache.set(user_id, user)
+    return user
+
+def invalidate_user(user_id: int):
+    """Descartar o usuário do cache (ex.: após um UPDATE fora do ORM)"""
+    user_cache.pop(user_id)
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _user_changed(mapper, connection, target):
+    invalidate_user(target.id)
+
+async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)) -> CurrentUser:
+    """Dependency do usuário autenticado (sem acesso ao banco quando em cache)"""
+    user = await load_user(db, verify_token(token))
+    if user is None or not user.is_active:
+        raise _credentials_error()
+    return user
+
+async def get_websocket_user(websocket: WebSocket, token: str = Query(None)) -> CurrentUser:
+    """Usuário autenticado de um WebSocket (``?token=`` ou cabeçalho Authorization)
+
+    Navegadores não enviam cabeçalhos no handshake, por isso o token também
+    é aceito na query string.
+    """
+    if token is None:
+        scheme, _, credentials = websocket.headers.get("authorization", "").partition(" ")
+        token = credentials if scheme.lower() == "bearer" else None
+    try:
+        if not token:
+            raise _credentials_error()
+        user_id = verify_token(token)
+        user = user_cache.get(user_id)
+        if user is None:
+            # Sessão própria: a conexão fica aberta e não deve segurar uma sessão do banco
+            async with AsyncSessionLocal() as db:
+                user = await load_user(db, user_id)
+        if user is None or not user.is_active:
+            raise _credentials_error()
+    except HTTPException:
+        raise WebSocketException(code=status.WS_1008_POLICY_VIOLATION)
+    return user
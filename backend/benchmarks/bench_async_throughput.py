@@ -0,0 +1,165 @@
+"""Teste de carga: rotas síncronas (threadpool) vs. assíncronas (event loop).
+
+Sobe o mesmo app com uvicorn (mesmo número de workers) e dispara requisições
+concorrentes contra as versões síncrona e assíncrona de cada rota.
+
+Com SQLite local o custo por requisição é dominado por CPU (ORM e
+serialização), então as duas versões ficam próximas; o ganho do caminho
+assíncrono aparece quando o banco está na rede (use --database-url).
+
+Uso (a partir da raiz do projeto):
+    python -m backend.benchmarks.bench_async_throughput --workers 1 --concurrency 200
+    python -m backend.benchmarks.bench_async_throughput --database-url postgresql://...
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+from fastapi import Depends, FastAPI
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from backend.async_services import AsyncPomodoroService, AsyncStatisticsService
+from backend.database import get_async_db, get_db
+from backend.services import PomodoroService, StatisticsService
+
+BENCH_USER_ID = 1
+
+app = FastAPI()
+
+@app.get("/sync/statistics")
+def sync_statistics(db: Session = Depends(get_db)):
+    return StatisticsService.calculate_productivity(db, BENCH_USER_ID)
+
+@app.get("/async/statistics")
+async def async_statistics(db: AsyncSession = Depends(get_async_db)):
+    return await AsyncStatisticsService.calculate_productivity(db, BENCH_USER_ID)
+
+@app.post("/sync/cycle")
+def sync_cycle(db: Session = Depends(get_db)):
+    session = PomodoroService.start_session(db, user_id=BENCH_USER_ID)
+    PomodoroService.complete_session(db, session_id=session.id)
+    return {"id": session.id}
+
+@app.post("/async/cycle")
+async def async_cycle(db: AsyncSession = Depends(get_async_db)):
+    session = await AsyncPomodoroService.start_session(db, user_id=BENCH_USER_ID)
+    await AsyncPomodoroService.complete_session(db, session_id=session.id)
+    return {"id": session.id}
+
+def seed_database(database_url: str, sessions: int):
+    """Criar o schema e um usuário com histórico de sessões"""
+    from backend.database import Base, create_engine_from_env
+    from backend.services import RollupService
+    from backend.benchmarks.bench_statistics import seed
+
+    engine = create_engine_from_env(database_url)
+    Base.metadata.create_all(bind=engine)
+    seed(engine, sessions, users=1)
+    db = Session(bind=engine)
+    RollupService.rebuild(db)
+    db.close()
+    engine.dispose()
+
+async def _request(reader, writer, method: str, path: str):
+    writer.write(f"{method} {path} HTTP/1.1\r\nHost: bench\r\nContent-Length: 0\r\n\r\n".encode())
+    await writer.drain()
+    headers = await reader.readuntil(b"\r\n\r\n")
+    status = int(headers.split(b" ", 2)[1])
+    length = 0
+    for line in headers.split(b"\r\n"):
+        if line.lower().startswith(b"content-length:"):
+            length = int(line.split(b":", 1)[1])
+    await reader.readexactly(length)
+    return status
+
+async def load(port: int, method: str, path: str, concurrency: int, duration: float):
+    """Disparar requisições com ``concurrency`` conexões keep-alive por ``duration`` segundos"""
+    latencies = []
+    errors = 0
+    deadline = time.perf_counter() + duration
+
+    async def client():
+        nonlocal errors
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            if await _request(reader, writer, method, path) != 200:
+                errors += 1
+            latencies.append(time.perf_counter() - started)
+        writer.close()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(latencies[len(latencies) // 2] * 1000, 2),
+        "p99_ms": round(latencies[int(len(latencies) * 0.99)] * 1000, 2),
+    }
+
+def _wait_for_port(port: int, timeout: float = 30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.5).close()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError("Servidor de benchmark não iniciou")
+
+def main():
+    parser = argparse.ArgumentParser(description="Throughput síncrono vs. assíncrono")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--sessions", type=int, default=10000, help="Histórico do usuário de teste")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--database-url", default=None,
+                        help="Banco a usar (ex.: PostgreSQL); padrão: SQLite temporário")
+    parser.add_argument("--json", dest="json_path", default=None)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = args.database_url or f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        seed_database(database_url, args.sessions)
+
+        env = dict(os.environ, DATABASE_URL=database_url, DB_SLOW_QUERY_MS="0")
+        server = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "backend.benchmarks.bench_async_throughput:app",
+             "--port", str(args.port), "--workers", str(args.workers), "--log-level", "warning"],
+            env=env
+        )
+        try:
+            _wait_for_port(args.port)
+            results = {"workers": args.workers, "concurrency": args.concurrency}
+            for name, method, path in (
+                ("sync_statistics", "GET", "/sync/statistics"),
+                ("async_statistics", "GET", "/async/statistics"),
+                ("sync_cycle", "POST", "/sync/cycle"),
+                ("async_cycle", "POST", "/async/cycle"),
+            ):
+                results[name] = asyncio.run(load(args.port, method, path, args.concurrency, args.duration))
+                result = results[name]
+                print(f"{name:<18} {result['rps']:>9.1f} req/s  p50 {result['p50_ms']:>8.2f} ms  "
+                      f"p99 {result['p99_ms']:>8.2f} ms  erros {result['errors']}")
+        finally:
+            server.terminate()
+            server.wait()
+
+    if args.json_path:
+        with open(args.json_path, "w") as output:
+            json.dump(results, output, indent=2)
+
+if __name__ == "__main__":
+    main()
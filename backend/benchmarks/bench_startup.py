@@ -0,0 +1,118 @@
+"""Tempo de inicialização do backend: importações e tempo até a primeira requisição.
+
+Para cada execução, sobe ``backend.main:app`` com uvicorn em um banco SQLite
+temporário já migrado e mede o tempo entre criar o processo e receber a
+primeira resposta 200 em ``GET /``. Também mostra os módulos que mais pesam
+na importação do app (``python -X importtime``).
+
+Uso (a partir da raiz do projeto):
+    python -m backend.benchmarks.bench_startup --runs 5
+    python -m backend.benchmarks.bench_startup --fast-startup --json startup.json
+"""
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+
+from backend.server import PROJECT_ROOT, run_migrations
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def import_breakdown(env, top: int = 15):
+    """Tempo cumulativo de importação dos módulos mais caros de ``backend.main``"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import backend.main"],
+        cwd=PROJECT_ROOT, env=env, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Falha ao importar backend.main:\n{result.stderr[-2000:]}")
+
+    modules = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        cumulative_us, package = line.split("|")[1:]
+        name = package.strip()
+        # Módulos de primeiro nível (sem indentação) e os do próprio backend
+        if package[1:] == package[1:].lstrip() or name.startswith("backend."):
+            modules[name] = int(cumulative_us) / 1000
+    total_ms = modules.get("backend.main", 0.0)
+    ranked = sorted(modules.items(), key=lambda item: item[1], reverse=True)[:top]
+    return {"total_ms": round(total_ms, 1), "modules_ms": {name: round(ms, 1) for name, ms in ranked}}
+
+def time_to_first_request(env, timeout: float = 60):
+    """Segundos entre iniciar o servidor e a primeira resposta 200"""
+    port = _free_port()
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "backend.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=PROJECT_ROOT, env=env
+    )
+    try:
+        deadline = started + timeout
+        while time.perf_counter() < deadline:
+            if server.poll() is not None:
+                raise RuntimeError("Servidor encerrou durante a inicialização")
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/", timeout=1) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - started
+            except (urllib.error.URLError, ConnectionError, OSError):
+                time.sleep(0.01)
+        raise RuntimeError("Servidor de benchmark não respondeu")
+    finally:
+        server.terminate()
+        server.wait()
+
+def main():
+    parser = argparse.ArgumentParser(description="Tempo de inicialização do backend")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--fast-startup", action="store_true", help="Executar com FAST_STARTUP=1")
+    parser.add_argument("--json", dest="json_path", default=None)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        env = dict(os.environ, DATABASE_URL=database_url, DB_SLOW_QUERY_MS="0", STARTUP_REPORT="0")
+        if args.fast_startup:
+            env["FAST_STARTUP"] = "1"
+
+        os.environ["DATABASE_URL"] = database_url
+        run_migrations()
+
+        imports = import_breakdown(env)
+        print(f"Importação de backend.main: {imports['total_ms']:.1f} ms")
+        for name, elapsed in imports["modules_ms"].items():
+            print(f"  {name:<40} {elapsed:>8.1f} ms")
+
+        samples = [time_to_first_request(env) for _ in range(args.runs)]
+
+    results = {
+        "fast_startup": args.fast_startup,
+        "imports": imports,
+        "time_to_first_request_ms": {
+            "median": round(statistics.median(samples) * 1000, 1),
+            "min": round(min(samples) * 1000, 1),
+            "max": round(max(samples) * 1000, 1),
+        }
+    }
+    ttfr = results["time_to_first_request_ms"]
+    print(f"Tempo até a primeira requisição: mediana {ttfr['median']:.1f} ms  "
+          f"(mín {ttfr['min']:.1f} ms, máx {ttfr['max']:.1f} ms, {args.runs} execuções)")
+
+    if args.json_path:
+        with open(args.json_path, "w") as output:
+            json.dump(results, output, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""Benchmark das estatísticas: seis consultas vs. leitura única vs. rollups.
+
+Uso (a partir da raiz do projeto):
+    python -m backend.benchmarks.bench_statistics --sessions 1000000
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, event, extract, func, insert
+from sqlalchemy.orm import sessionmaker
+
+from backend.database import Base
+from backend.models import PomodoroSession, Project, User
+from backend.services import RollupService, StatisticsService
+
+def legacy_calculate_productivity(db, user_id):
+    """Implementação anterior: seis consultas sobre pomodoro_sessions"""
+    db.query(func.sum(PomodoroSession.total_work_time)).filter(PomodoroSession.user_id == user_id).scalar()
+    db.query(func.count(PomodoroSession.id)).filter(PomodoroSession.user_id == user_id).scalar()
+    db.query(Project.id, Project.title, func.sum(PomodoroSession.total_work_time))\
+        .join(PomodoroSession, Project.id == PomodoroSession.project_id)\
+        .filter(PomodoroSession.user_id == user_id)\
+        .group_by(Project.id, Project.title)\
+        .order_by(func.sum(PomodoroSession.total_work_time).desc())\
+        .first()
+    db.query(func.date(PomodoroSession.start_time).label('date'), func.sum(PomodoroSession.total_work_time), func.count(PomodoroSession.id))\
+        .filter(PomodoroSession.user_id == user_id)\
+        .group_by(func.date(PomodoroSession.start_time)).order_by('date').limit(30).all()
+    for part in ('week', 'month'):
+        db.query(extract('year', PomodoroSession.start_time).label('year'), extract(part, PomodoroSession.start_time).label(part),
+                 func.sum(PomodoroSession.total_work_time), func.count(PomodoroSession.id))\
+            .filter(PomodoroSession.user_id == user_id)\
+            .group_by('year', part).order_by('year', part).limit(12).all()
+
+def seed(engine, sessions, users=1, projects=5, seed_value=42, chunk_size=50000):
+    """Popular o banco com sessões concluídas distribuídas em ~3 anos"""
+    rng = random.Random(seed_value)
+    Session = sessionmaker(bind=engine)
+    db = Session()
+    for user_index in range(users):
+        db.add(User(id=user_index + 1, username=f"bench{user_index}", email=f"bench{user_index}@example.com"))
+        for project_index in range(projects):
+            db.add(Project(user_id=user_index + 1, title=f"Projeto {project_index}"))
+    db.commit()
+    project_ids = [row.id for row in db.query(Project.id).all()]
+    db.close()
+
+    origin = datetime(2023, 1, 1)
+    rows = []
+    with engine.begin() as connection:
+        for _ in range(sessions):
+            work_time = rng.choice((15, 25, 25, 25, 50)) * 60
+            rows.append({
+                'user_id': rng.randint(1, users),
+                'project_id': rng.choice(project_ids + [None]),
+                'start_time': origin + timedelta(minutes=rng.randint(0, 3 * 365 * 24 * 60)),
+                'work_duration': 25,
+                'break_duration': 5,
+                'status': 'completed',
+                'mode': 'work',
+                'total_work_time': work_time,
+                'is_completed': True
+            })
+            if len(rows) >= chunk_size:
+                connection.execute(insert(PomodoroSession), rows)
+                rows = []
+        if rows:
+            connection.execute(insert(PomodoroSession), rows)
+
+def measure(engine, func_, repeat):
+    """Executar ``func_`` e medir tempo médio e número de consultas"""
+    statements = []
+
+    def count_statement(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    Session = sessionmaker(bind=engine)
+    event.listen(engine, "before_cursor_execute", count_statement)
+    try:
+        timings = []
+        for _ in range(repeat):
+            db = Session()
+            started = time.perf_counter()
+            func_(db)
+            timings.append(time.perf_counter() - started)
+            db.close()
+    finally:
+        event.remove(engine, "before_cursor_execute", count_statement)
+
+    return {
+        'queries': len(statements) // repeat,
+        'mean_ms': round(sum(timings) / len(timings) * 1000, 2),
+        'min_ms': round(min(timings) * 1000, 2)
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de StatisticsService")
+    parser.add_argument("--sessions", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--json", dest="json_path", default=None, help="Gravar resultados em JSON")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        Base.metadata.create_all(bind=engine)
+
+        print(f"🔄 Gerando {args.sessions} sessões...")
+        seed(engine, args.sessions)
+        db = sessionmaker(bind=engine)()
+        RollupService.rebuild(db)
+        db.close()
+
+        results = {
+            'sessions': args.sessions,
+            'legacy_six_queries': measure(engine, lambda db: legacy_calculate_productivity(db, 1), args.repeat),
+            'single_pass': measure(engine, lambda db: StatisticsService.calculate_productivity(db, 1, source='sessions'), args.repeat),
+            'rollups': measure(engine, lambda db: StatisticsService.calculate_productivity(db, 1), args.repeat)
+        }
+        engine.dispose()
+
+    for name in ('legacy_six_queries', 'single_pass', 'rollups'):
+        result = results[name]
+        print(f"{name:<20} {result['queries']:>3} consultas  {result['mean_ms']:>10.2f} ms (min {result['min_ms']:.2f} ms)")
+
+    if args.json_path:
+        with open(args.json_path, 'w') as output:
+            json.dump(results, output, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,223 @@
+"""Gerador determinístico de dados sintéticos para os benchmarks.
+
+Cria usuários, projetos, tarefas, eventos (com uma série recorrente por
+usuário) e sessões de Pomodoro com distribuições realistas (poucos usuários
+muito ativos, sessões concentradas em dias úteis e horário comercial, parte
+das sessões interrompidas) e reconstrói rollups e progresso das conquistas. A mesma escala e semente
+sempre produzem o mesmo banco.
+
+Uso (a partir da raiz do projeto):
+    python -m backend.benchmarks.datagen --scale 100k --database-url sqlite:///bench.db
+"""
+import argparse
+import random
+import time
+from bisect import bisect_left
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, insert, select, update
+from sqlalchemy.orm import Session
+
+from backend.database import Base, create_engine_from_env
+from backend.models import Event, PomodoroSession, Project, Task, User, UserProjectStats
+from backend.services import RollupService
+
+# Número de sessões de cada escala
+SCALES = {
+    "1k": 1_000,
+    "100k": 100_000,
+    "10m": 10_000_000,
+}
+
+# Usuário com o maior histórico (usado nos cenários dos benchmarks)
+BENCH_USER_ID = 1
+
+ORIGIN = datetime(2024, 1, 1)
+HISTORY_DAYS = 2 * 365
+
+def _user_count(sessions: int) -> int:
+    """Cerca de 2000 sessões por usuário (mínimo de um)"""
+    return max(1, sessions // 2000)
+
+def _session_start(rng: random.Random) -> datetime:
+    """Início em dia útil e horário comercial (com alguma atividade fora dele)"""
+    day = ORIGIN + timedelta(days=rng.randrange(HISTORY_DAYS))
+    if day.weekday() >= 5 and rng.random() < 0.7:
+        day -= timedelta(days=day.weekday() - 4)
+    hour = min(23, max(0, int(rng.gauss(13, 3))))
+    return day + timedelta(hours=hour, minutes=rng.randrange(60))
+
+def _session_row(rng: random.Random, user_id: int, project_ids) -> dict:
+    work_duration = rng.choice((25, 25, 25, 50, 15))
+    start_time = _session_start(rng)
+    outcome = rng.random()
+    if outcome < 0.9:
+        return {
+            'user_id': user_id,
+            'project_id': rng.choice(project_ids) if project_ids and rng.random() < 0.8 else None,
+            'start_time': start_time,
+            'end_time': start_time + timedelta(minutes=work_duration),
+            'work_duration': work_duration,
+            'break_duration': 5,
+            'status': 'completed',
+            'mode': 'work',
+            'total_work_time': work_duration * 60,
+            'is_completed': True
+        }
+    elapsed = rng.randrange(1, work_duration)
+    return {
+        'user_id': user_id,
+        'project_id': rng.choice(project_ids) if project_ids and rng.random() < 0.8 else None,
+        'start_time': start_time,
+        'end_time': start_time + timedelta(minutes=elapsed),
+        'work_duration': work_duration,
+        'break_duration': 5,
+        'status': 'interrupted',
+        'mode': 'work',
+        'total_work_time': 0,
+        'is_completed': False
+    }
+
+def generate(engine, scale: str = "1k", seed: int = 42, sessions: int = None, chunk_size: int = 50_000):
+    """Popular um banco vazio (com o schema já criado)
+
+    ``sessions`` substitui o número de sessões da escala. Retorna um resumo
+    com as contagens geradas.
+    """
+    rng = random.Random(seed)
+    sessions = sessions if sessions is not None else SCALES[scale]
+    users = _user_count(sessions)
+
+    # Distribuição de cauda longa: o usuário 1 é o mais ativo
+    weights = sorted((rng.paretovariate(1.5) for _ in range(users)), reverse=True)
+    cumulative = []
+    total_weight = 0.0
+    for weight in weights:
+        total_weight += weight
+        cumulative.append(total_weight)
+
+    projects_by_user = {}
+    counts = {'users': users, 'projects': 0, 'tasks': 0, 'events': 0, 'sessions': 0}
+    with engine.begin() as connection:
+        connection.execute(insert(User), [
+            {'id': user_id, 'username': f"bench{user_id}", 'email': f"bench{user_id}@example.com", 'is_active': True}
+            for user_id in range(1, users + 1)
+        ])
+
+        project_rows = []
+        for user_id in range(1, users + 1):
+            for index in range(rng.randint(3, 8)):
+                project_rows.append({
+                    'user_id': user_id,
+                    'title': f"Projeto {index}",
+                    'status': 'active' if rng.random() < 0.8 else 'completed',
+                    'start_date': ORIGIN + timedelta(days=rng.randrange(HISTORY_DAYS)),
+                    'total_pomodoro_sessions': 0,
+                    'total_work_time': 0
+                })
+        connection.execute(insert(Project), project_rows)
+        counts['projects'] = len(project_rows)
+        for row in connection.execute(select(Project.id, Project.user_id)):
+            projects_by_user.setdefault(row.user_id, []).append(row.id)
+
+        task_rows = []
+        event_rows = []
+        for user_id in range(1, users + 1):
+            project_ids = projects_by_user.get(user_id, [])
+            for index in range(rng.randint(10, 40)):
+                created_at = ORIGIN + timedelta(days=rng.randrange(HISTORY_DAYS), minutes=rng.randrange(24 * 60))
+                done = rng.random() < 0.6
+                task_rows.append({
+                    'owner_id': user_id,
+                    'project_id': rng.choice(project_ids) if project_ids and rng.random() < 0.7 else None,
+                    'title': f"Tarefa {index}",
+                    'status': 'completed' if done else 'pending',
+                    'priority': rng.randint(1, 3),
+                    'created_at': created_at,
+                    'completed_at': created_at + timedelta(days=rng.randint(0, 14)) if done else None
+                })
+            for index in range(rng.randint(10, 60)):
+                start_time = _session_start(rng)
+                event_rows.append({
+                    'owner_id': user_id,
+                    'title': f"Evento {index}",
+                    'start_time': start_time,
+                    'end_time': start_time + timedelta(minutes=rng.choice((30, 60, 90, 120))),
+                    'is_all_day': rng.random() < 0.05
+                })
+            if len(task_rows) + len(event_rows) >= chunk_size:
+                connection.execute(insert(Task), task_rows)
+                connection.execute(insert(Event), event_rows)
+                counts['tasks'] += len(task_rows)
+                counts['events'] += len(event_rows)
+                task_rows, event_rows = [], []
+        if task_rows:
+            connection.execute(insert(Task), task_rows)
+        if event_rows:
+            connection.execute(insert(Event), event_rows)
+        counts['tasks'] += len(task_rows)
+        counts['events'] += len(event_rows)
+
+        # Uma série recorrente por usuário (daily em dias úteis durante todo o histórico)
+        connection.execute(insert(Event), [
+            {
+                'owner_id': user_id,
+                'title': "Daily",
+                'start_time': ORIGIN + timedelta(hours=9, minutes=30),
+                'end_time': ORIGIN + timedelta(hours=9, minutes=45),
+                'is_all_day': False,
+                'recurrence_rule': "FREQ=WEEKLY;BYDAY=MO,TU,WE,TH,FR"
+            }
+            for user_id in range(1, users + 1)
+        ])
+        counts['events'] += users
+
+    rows = []
+    for _ in range(sessions):
+        user_id = min(users, bisect_left(cumulative, rng.random() * total_weight) + 1)
+        rows.append(_session_row(rng, user_id, projects_by_user.get(user_id, [])))
+        if len(rows) >= chunk_size:
+            with engine.begin() as connection:
+                connection.execute(insert(PomodoroSession), rows)
+            counts['sessions'] += len(rows)
+            rows = []
+    if rows:
+        with engine.begin() as connection:
+            connection.execute(insert(PomodoroSession), rows)
+        counts['sessions'] += len(rows)
+
+    # Rollups e progresso das conquistas
+    db = Session(bind=engine)
+    try:
+        RollupService.rebuild(db)
+    finally:
+        db.close()
+
+    # Contadores dos projetos a partir do rollup por projeto
+    def project_total(column):
+        return select(column).where(UserProjectStats.project_id == Project.id).scalar_subquery()
+
+    with engine.begin() as connection:
+        connection.execute(update(Project).values(
+            total_pomodoro_sessions=func.coalesce(project_total(UserProjectStats.total_sessions), 0),
+            total_work_time=func.coalesce(project_total(UserProjectStats.total_work_time) / 60, 0)
+        ))
+    return counts
+
+def main():
+    parser = argparse.ArgumentParser(description="Gerar dados sintéticos para benchmarks")
+    parser.add_argument("--scale", choices=sorted(SCALES), default="1k")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--database-url", required=True, help="Banco vazio a popular")
+    args = parser.parse_args()
+
+    engine = create_engine_from_env(args.database_url)
+    Base.metadata.create_all(bind=engine)
+    print(f"🔄 Gerando escala {args.scale} (semente {args.seed})...")
+    started = time.perf_counter()
+    counts = generate(engine, args.scale, args.seed)
+    engine.dispose()
+    print(f"✅ {counts} em {time.perf_counter() - started:.1f}s")
+
+if __name__ == "__main__":
+    main()
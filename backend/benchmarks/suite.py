@@ -0,0 +1,302 @@
+"""Suíte de benchmarks do backend com comparação contra um baseline.
+
+Gera (ou reutiliza) um banco sintético na escala pedida e executa cenários
+cronometrados em processo (serviços síncronos) e via HTTP (app completo com
+uvicorn). Os resultados vão para JSON; com um baseline salvo, cenários mais
+lentos que a tolerância ou com mais consultas SQL fazem a execução falhar
+(código de saída 1).
+
+Uso (a partir da raiz do projeto):
+    python -m backend.benchmarks.suite --scale 1k --update-baseline
+    python -m backend.benchmarks.suite --scale 100k --tolerance 0.25
+    python -m backend.benchmarks.suite --scale 10m --db-path /tmp/bench-10m.db --skip-http
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+
+from sqlalchemy import event
+from sqlalchemy.orm import sessionmaker
+
+from backend.benchmarks.datagen import BENCH_USER_ID, SCALES, generate
+from backend.database import Base, create_engine_from_env
+from backend.services import AchievementService, DashboardService, PomodoroService, StatisticsService
+
+BASELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines")
+
+# Cenários em processo: nome -> função(db) executada a cada repetição
+def _pomodoro_complete(db):
+    session = PomodoroService.start_session(db, user_id=BENCH_USER_ID)
+    PomodoroService.complete_session(db, session.id, total_time=25)
+
+def _pomodoro_pause_stop(db):
+    session = PomodoroService.start_session(db, user_id=BENCH_USER_ID)
+    PomodoroService.pause_session(db, session.id)
+    PomodoroService.stop_session(db, session.id)
+
+IN_PROCESS_SCENARIOS = {
+    "pomodoro_start_complete": _pomodoro_complete,
+    "pomodoro_start_pause_stop": _pomodoro_pause_stop,
+    "statistics_rollups": lambda db: StatisticsService.calculate_productivity(db, BENCH_USER_ID),
+    "statistics_single_pass": lambda db: StatisticsService.calculate_productivity(db, BENCH_USER_ID, source='sessions'),
+    "achievements_check": lambda db: AchievementService.check_pomodoro_achievements(db, BENCH_USER_ID),
+    "dashboard": lambda db: DashboardService.get_dashboard_data(db, BENCH_USER_ID),
+}
+
+def _summary(timings, queries=None):
+    timings = sorted(timings)
+    result = {
+        "runs": len(timings),
+        "mean_ms": round(statistics.fmean(timings) * 1000, 3),
+        "p50_ms": round(timings[len(timings) // 2] * 1000, 3),
+        "p95_ms": round(timings[min(len(timings) - 1, int(len(timings) * 0.95))] * 1000, 3),
+    }
+    if queries is not None:
+        result["queries"] = queries
+    return result
+
+def run_in_process(engine, repeat: int, warmup: int = 2):
+    """Executar os cenários em processo, medindo tempo e consultas por execução"""
+    Session = sessionmaker(bind=engine, autocommit=False, autoflush=False)
+    statements = []
+
+    def count_statement(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    results = {}
+    for name, scenario in IN_PROCESS_SCENARIOS.items():
+        for _ in range(warmup):
+            db = Session()
+            scenario(db)
+            db.close()
+
+        timings = []
+        event.listen(engine, "before_cursor_execute", count_statement)
+        try:
+            statements.clear()
+            for _ in range(repeat):
+                db = Session()
+                started = time.perf_counter()
+                scenario(db)
+                timings.append(time.perf_counter() - started)
+                db.close()
+        finally:
+            event.remove(engine, "before_cursor_execute", count_statement)
+        results[name] = _summary(timings, queries=len(statements) // repeat)
+    return results
+
+def http_app():
+    """App completo com o usuário do benchmark autenticado (uvicorn --factory)"""
+    from backend.auth import get_current_user
+    from backend.main import app
+
+    app.dependency_overrides[get_current_user] = lambda: SimpleNamespace(id=BENCH_USER_ID)
+    return app
+
+async def _http(reader, writer, method: str, path: str, body: dict = None):
+    payload = json.dumps(body).encode() if body is not None else b""
+    headers = f"{method} {path} HTTP/1.1\r\nHost: bench\r\nContent-Length: {len(payload)}\r\n"
+    if body is not None:
+        headers += "Content-Type: application/json\r\n"
+    writer.write(headers.encode() + b"\r\n" + payload)
+    await writer.drain()
+    head = await reader.readuntil(b"\r\n\r\n")
+    status = int(head.split(b" ", 2)[1])
+    length = 0
+    for line in head.split(b"\r\n"):
+        if line.lower().startswith(b"content-length:"):
+            length = int(line.split(b":", 1)[1])
+    content = await reader.readexactly(length)
+    if status >= 400:
+        raise RuntimeError(f"{method} {path} respondeu {status}: {content[:200]!r}")
+    return content
+
+async def _http_pomodoro_cycle(reader, writer):
+    session = json.loads(await _http(reader, writer, "POST", "/api/pomodoro/session", {"work_duration": 25, "break_duration": 5, "mode": "work"}))
+    await _http(reader, writer, "PATCH", f"/api/pomodoro/session/{session['id']}/complete?mode=work&total_time=25")
+
+HTTP_SCENARIOS = {
+    "http_dashboard": lambda reader, writer: _http(reader, writer, "GET", "/dashboard"),
+    "http_statistics": lambda reader, writer: _http(reader, writer, "GET", "/api/statistics"),
+    "http_achievements_check": lambda reader, writer: _http(reader, writer, "POST", "/api/achievements/check-pomodoro"),
+    "http_pomodoro_start_complete": _http_pomodoro_cycle,
+    "http_agenda_year": lambda reader, writer: _http(
+        reader, writer, "GET", "/api/events/range?start=2024-01-01T00:00:00&end=2025-01-01T00:00:00"
+    ),
+    "http_agenda_free_slots": lambda reader, writer: _http(
+        reader, writer, "GET", "/api/events/free-slots?start=2024-03-04T08:00:00&end=2024-03-09T18:00:00"
+    ),
+}
+
+async def _run_http_scenario(port: int, scenario, requests: int, concurrency: int):
+    timings = []
+    remaining = requests
+
+    async def client():
+        nonlocal remaining
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        try:
+            while remaining > 0:
+                remaining -= 1
+                started = time.perf_counter()
+                await scenario(reader, writer)
+                timings.append(time.perf_counter() - started)
+        finally:
+            writer.close()
+
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    return timings
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def _wait_for_port(port: int, server, timeout: float = 60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError("Servidor de benchmark encerrou durante a inicialização")
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.5).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError("Servidor de benchmark não iniciou")
+
+def run_http(database_url: str, requests: int, concurrency: int):
+    """Executar os cenários HTTP contra o app completo em um processo uvicorn"""
+    port = _free_port()
+    env = dict(os.environ, DATABASE_URL=database_url, DB_SLOW_QUERY_MS="0", N_PLUS_ONE_THRESHOLD="0")
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "backend.benchmarks.suite:http_app", "--factory",
+         "--port", str(port), "--log-level", "warning"],
+        env=env
+    )
+    try:
+        _wait_for_port(port, server)
+        results = {}
+        for name, scenario in HTTP_SCENARIOS.items():
+            asyncio.run(_run_http_scenario(port, scenario, concurrency, concurrency))  # aquecimento
+            timings = asyncio.run(_run_http_scenario(port, scenario, requests, concurrency))
+            results[name] = _summary(timings)
+        return results
+    finally:
+        server.terminate()
+        server.wait()
+
+def compare(results, baseline, tolerance: float = 0.2, noise_ms: float = 0.5):
+    """Regressões de ``results`` em relação ao ``baseline``
+
+    Um cenário regride quando a mediana passa de ``(1 + tolerance)`` vezes a
+    do baseline (e de ``noise_ms`` em valor absoluto) ou quando executa mais
+    consultas SQL.
+    """
+    regressions = []
+    for name, current in results["scenarios"].items():
+        previous = baseline.get("scenarios", {}).get(name)
+        if previous is None:
+            continue
+        limit = previous["p50_ms"] * (1 + tolerance)
+        if current["p50_ms"] > limit and current["p50_ms"] - previous["p50_ms"] > noise_ms:
+            regressions.append(f"{name}: p50 {current['p50_ms']:.3f} ms > {previous['p50_ms']:.3f} ms (+{tolerance:.0%})")
+        if "queries" in current and "queries" in previous and current["queries"] > previous["queries"]:
+            regressions.append(f"{name}: {current['queries']} consultas > {previous['queries']}")
+    return regressions
+
+def _prepare_database(args):
+    """Banco da escala pedida; reutilizado quando ``--db-path`` já foi gerado com a mesma semente"""
+    db_path = args.db_path or os.path.join(args.tmp, f"bench-{args.scale}.db")
+    meta_path = db_path + ".meta.json"
+    database_url = f"sqlite:///{db_path}"
+    meta = {"scale": args.scale, "seed": args.seed}
+
+    if os.path.exists(meta_path):
+        with open(meta_path) as source:
+            if json.load(source) == meta and os.path.exists(db_path):
+                print(f"♻️  Reutilizando {db_path}")
+                return database_url
+    for path in (db_path, db_path + "-wal", db_path + "-shm"):
+        if os.path.exists(path):
+            os.remove(path)
+
+    engine = create_engine_from_env(database_url)
+    Base.metadata.create_all(bind=engine)
+    print(f"🔄 Gerando escala {args.scale} ({SCALES[args.scale]} sessões, semente {args.seed})...")
+    started = time.perf_counter()
+    counts = generate(engine, args.scale, args.seed)
+    engine.dispose()
+    print(f"✅ {counts} em {time.perf_counter() - started:.1f}s")
+
+    with open(meta_path, "w") as output:
+        json.dump(meta, output)
+    return database_url
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Suíte de benchmarks do backend")
+    parser.add_argument("--scale", choices=sorted(SCALES), default="1k")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--repeat", type=int, default=50, help="Execuções de cada cenário em processo")
+    parser.add_argument("--requests", type=int, default=500, help="Requisições de cada cenário HTTP")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--skip-http", action="store_true")
+    parser.add_argument("--db-path", default=None, help="Arquivo SQLite a reutilizar entre execuções")
+    parser.add_argument("--json", dest="json_path", default=None, help="Resultados (padrão: bench-<escala>.json)")
+    parser.add_argument("--baseline", default=None, help="Baseline (padrão: benchmarks/baselines/<escala>.json)")
+    parser.add_argument("--update-baseline", action="store_true", help="Gravar os resultados como novo baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Aumento relativo tolerado da mediana")
+    args = parser.parse_args(argv)
+
+    baseline_path = args.baseline or os.path.join(BASELINE_DIR, f"{args.scale}.json")
+    json_path = args.json_path or f"bench-{args.scale}.json"
+
+    with tempfile.TemporaryDirectory() as tmp:
+        args.tmp = tmp
+        database_url = _prepare_database(args)
+
+        engine = create_engine_from_env(database_url, echo=False)
+        scenarios = run_in_process(engine, args.repeat)
+        engine.dispose()
+        if not args.skip_http:
+            scenarios.update(run_http(database_url, args.requests, args.concurrency))
+
+    results = {"scale": args.scale, "seed": args.seed, "python": sys.version.split()[0], "scenarios": scenarios}
+    for name, result in scenarios.items():
+        queries = f"  {result['queries']:>3} consultas" if "queries" in result else ""
+        print(f"{name:<32} p50 {result['p50_ms']:>9.3f} ms  p95 {result['p95_ms']:>9.3f} ms{queries}")
+
+    with open(json_path, "w") as output:
+        json.dump(results, output, indent=2)
+
+    if args.update_baseline:
+        os.makedirs(os.path.dirname(baseline_path), exist_ok=True)
+        with open(baseline_path, "w") as output:
+            json.dump(results, output, indent=2)
+        print(f"💾 Baseline gravado em {baseline_path}")
+        return 0
+
+    if not os.path.exists(baseline_path):
+        # Sem baseline não há como detectar regressões: falhar em vez de passar em silêncio
+        print(f"❌ Sem baseline em {baseline_path} (use --update-baseline)")
+        return 1
+
+    with open(baseline_path) as source:
+        regressions = compare(results, json.load(source), args.tolerance)
+    if regressions:
+        print("❌ Regressões de desempenho:")
+        for regression in regressions:
+            print(f"  {regression}")
+        return 1
+    print("✅ Sem regressões em relação ao baseline")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
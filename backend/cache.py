@@ -0,0 +1,267 @@
+import asyncio
+import hashlib
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from fastapi import Response
+from sqlalchemy.util import await_only
+
+logger = logging.getLogger(__name__)
+
+def _on_event_loop() -> bool:
+    """Se o código síncrono está rodando na thread do event loop (ex.: run_sync)"""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+class CacheStats:
+    """Contadores de acerto, falta e remoção do cache"""
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def as_dict(self):
+        return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions}
+
+class MemoryCacheBackend:
+    """Cache LRU em memória com expiração por TTL (um por processo)"""
+
+    def __init__(self, max_entries: int = 1024, ttl: float = 300):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.stats = CacheStats()
+        self._entries = OrderedDict()
+        self._versions = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats.misses += 1
+                return None
+            value, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                self.stats.evictions += 1
+                self.stats.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats.hits += 1
+            return value
+
+    def set(self, key: str, value: bytes):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats.evictions += 1
+
+    def get_versions(self, *names: str):
+        with self._lock:
+            return [self._versions.get(name, 0) for name in names]
+
+    def incr_version(self, name: str) -> int:
+        with self._lock:
+            self._versions[name] = self._versions.get(name, 0) + 1
+            return self._versions[name]
+
+    # Sem E/S: as variantes assíncronas apenas delegam
+    async def aget(self, key: str):
+        return self.get(key)
+
+    async def aset(self, key: str, value: bytes):
+        self.set(key, value)
+
+    async def aget_versions(self, *names: str):
+        return self.get_versions(*names)
+
+class RedisCacheBackend:
+    """Cache compartilhado entre workers via Redis (dependência opcional)
+
+    As rotas assíncronas usam o cliente ``redis.asyncio`` e não bloqueiam o
+    event loop. As invalidações vêm de código síncrono: dentro de
+    ``AsyncSession.run_sync`` são aguardadas no próprio loop (``await_only``)
+    e nas threads (rotas síncronas, write-behind) usam o cliente síncrono.
+
+    Cada entrada tem uma marca com o dobro do TTL; uma falta com a marca
+    presente é uma entrada expirada ou removida pelo Redis e conta como
+    remoção.
+    """
+
+    def __init__(self, url: str, ttl: float = 300, prefix: str = "productivity:"):
+        try:
+            import redis
+            import redis.asyncio
+        except ImportError as exc:
+            raise RuntimeError("RESPONSE_CACHE_BACKEND=redis requer o pacote 'redis'") from exc
+
+        self.client = redis.Redis.from_url(url)
+        self.async_client = redis.asyncio.Redis.from_url(url)
+        self.ttl = ttl
+        self.prefix = prefix
+        self.stats = CacheStats()
+
+    def _keys(self, key: str):
+        return self.prefix + key, self.prefix + "stored:" + key
+
+    def _count(self, value, stored):
+        if value is not None:
+            self.stats.hits += 1
+            return value
+        self.stats.misses += 1
+        if stored is not None:
+            self.stats.evictions += 1
+        return None
+
+    def get(self, key: str):
+        return self._count(*self.client.mget(self._keys(key)))
+
+    async def aget(self, key: str):
+        return self._count(*await self.async_client.mget(self._keys(key)))
+
+    def _pipeline_set(self, pipeline, key: str, value: bytes):
+        entry, stored = self._keys(key)
+        pipeline.set(entry, value, ex=int(self.ttl))
+        pipeline.set(stored, 1, ex=int(self.ttl) * 2)
+        return pipeline.execute()
+
+    def set(self, key: str, value: bytes):
+        self._pipeline_set(self.client.pipeline(transaction=False), key, value)
+
+    async def aset(self, key: str, value: bytes):
+        await self._pipeline_set(self.async_client.pipeline(transaction=False), key, value)
+
+    def get_versions(self, *names: str):
+        return [int(value or 0) for value in self.client.mget([self.prefix + "version:" + name for name in names])]
+
+    async def aget_versions(self, *names: str):
+        values = await self.async_client.mget([self.prefix + "version:" + name for name in names])
+        return [int(value or 0) for value in values]
+
+    def incr_version(self, name: str) -> int:
+        key = self.prefix + "version:" + name
+        if _on_event_loop():
+            # Serviços chamados via run_sync: aguardar no loop sem bloqueá-lo
+            return await_only(self.async_client.incr(key))
+        return self.client.incr(key)
+
+class ResponseCache:
+    """Cache de respostas por usuário, versionado pelos dados do usuário
+
+    Cada escrita relevante incrementa a versão do usuário; as chaves e ETags
+    incluem essa versão, então entradas antigas simplesmente deixam de ser
+    encontradas e nenhuma resposta desatualizada é servida.
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+
+    def version(self, user_id: int) -> str:
+        """Versão atual dos dados do usuário (inclui a geração global)"""
+        return "%d.%d" % tuple(self.backend.get_versions("global", f"user:{user_id}"))
+
+    async def aversion(self, user_id: int) -> str:
+        """``version`` para as rotas assíncronas"""
+        return "%d.%d" % tuple(await self.backend.aget_versions("global", f"user:{user_id}"))
+
+    def invalidate_user(self, user_id: int):
+        """Marcar os dados do usuário como alterados (chamar após o commit)"""
+        self.backend.incr_version(f"user:{user_id}")
+
+    def invalidate_all(self):
+        """Invalidar as respostas de todos os usuários"""
+        self.backend.incr_version("global")
+
+    def etag(self, namespace: str, user_id: int, version: str = None) -> str:
+        """ETag da resposta ``namespace`` para a versão atual do usuário"""
+        version = version or self.version(user_id)
+        digest = hashlib.sha1(f"{namespace}:{user_id}:{version}".encode()).hexdigest()[:16]
+        return f'W/"{digest}"'
+
+    async def get_or_compute(self, namespace: str, user_id: int, compute, version: str = None):
+        """Obter a resposta serializada do cache ou calculá-la com ``await compute()``
+
+        Retorna ``(conteúdo, etag)``; ``compute`` deve produzir bytes.
+        """
+        version = version or await self.aversion(user_id)
+        key = f"{namespace}:{user_id}:{version}"
+
+        content = await self.backend.aget(key)
+        if content is None:
+            content = await compute()
+            await self.backend.aset(key, content)
+        return content, self.etag(namespace, user_id, version)
+
+    def stats(self):
+        return self.backend.stats.as_dict()
+
+    def render(self) -> str:
+        """Contadores do cache (deste processo) no formato texto do Prometheus"""
+        descriptions = {
+            'hits': "Respostas encontradas no cache",
+            'misses': "Respostas ausentes no cache (calculadas)",
+            'evictions': "Entradas removidas por expiração ou limite de tamanho",
+        }
+        lines = []
+        for name, value in self.stats().items():
+            lines.append(f"# HELP response_cache_{name}_total {descriptions[name]}")
+            lines.append(f"# TYPE response_cache_{name}_total counter")
+            lines.append(f"response_cache_{name}_total {value}")
+        return "\n".join(lines) + "\n"
+
+def create_response_cache():
+    """Criar o cache de respostas a partir das variáveis de ambiente"""
+    ttl = float(os.getenv("RESPONSE_CACHE_TTL", "300"))
+    if os.getenv("RESPONSE_CACHE_BACKEND", "memory") == "redis":
+        backend = RedisCacheBackend(os.getenv("RESPONSE_CACHE_URL", "redis://localhost:6379/0"), ttl=ttl)
+    else:
+        backend = MemoryCacheBackend(
+            max_entries=int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "1024")),
+            ttl=ttl
+        )
+        if int(os.getenv("WEB_CONCURRENCY", "1")) > 1:
+            # As versões ficam em cada processo: uma escrita em outro worker não
+            # invalida as respostas deste
+            logger.warning(
+                "RESPONSE_CACHE_BACKEND=memory com WEB_CONCURRENCY=%s: workers podem servir "
+                "estatísticas desatualizadas por até %ss; use RESPONSE_CACHE_BACKEND=redis",
+                os.getenv("WEB_CONCURRENCY"), ttl
+            )
+    return ResponseCache(backend)
+
+response_cache = create_response_cache()
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Verificar se o cabeçalho If-None-Match contém a ETag"""
+    if not if_none_match:
+        return False
+    candidates = [value.strip() for value in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates
+
+async def cached_json_response(request, namespace: str, user_id: int, compute):
+    """Resposta JSON cacheada com suporte a ETag / If-None-Match
+
+    ``compute`` é uma função assíncrona chamada só em caso de falta no cache
+    e deve produzir bytes.
+    """
+    # "no-cache" faz o navegador revalidar sempre com If-None-Match
+    version = await response_cache.aversion(user_id)
+    etag = response_cache.etag(namespace, user_id, version)
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "private, no-cache"})
+
+    content, etag = await response_cache.get_or_compute(namespace, user_id, compute, version)
+    return Response(
+        content=content,
+        media_type="application/json",
+        headers={"ETag": etag, "Cache-Control": "private, no-cache"}
+    )
@@ -1,8 +1,12 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy import update, delete
-from .models import User, Task, Event
-from .schemas import UserCreate, TaskCreate, EventCreate
+from .agenda import agenda_cache
+from .models import User, Task, Event, EventException
+from .recurrence import RecurrenceRule
+from .schemas import UserCreate, TaskCreate, EventCreate, EventExceptionCreate
+from .pagination import DEFAULT_PAGE_SIZE, decode_offset_cursor, encode_offset_cursor, keyset_page, keyset_query
+from .task_search import search_query
 from datetime import datetime
 
 class CRUDBase:
@@ -50,6 +54,21 @@ class CRUDUser(CRUDBase):
         result = await db.execute(select(User).filter(User.email == email))
         return result.scalar_one_or_none()
 
+    @staticmethod
+    async def get_by_username(db: AsyncSession, username: str):
+        """Obter usuário por nome de usuário"""
+        result = await db.execute(select(User).filter(User.username == username))
+        return result.scalar_one_or_none()
+
+    @staticmethod
+    async def create_with_password(db: AsyncSession, obj_in: UserCreate, hashed_password: str):
+        """Criar usuário guardando apenas o hash da senha"""
+        db_obj = User(**obj_in.dict(exclude={"password"}), hashed_password=hashed_password)
+        db.add(db_obj)
+        await db.commit()
+        await db.refresh(db_obj)
+        return db_obj
+
 class CRUDTask(CRUDBase):
     """Operações CRUD para tarefas"""
     @staticmethod
@@ -58,6 +77,31 @@ class CRUDTask(CRUDBase):
         result = await db.execute(select(Task).filter(Task.owner_id == user_id))
         return result.scalars().all()
 
+    @staticmethod
+    async def get_user_tasks_page(db: AsyncSession, user_id: int, cursor: str = None, limit: int = DEFAULT_PAGE_SIZE):
+        """Obter uma página de tarefas (mais recentes primeiro) paginada por (created_at, id)"""
+        sort_columns = (Task.created_at, Task.id)
+        query = keyset_query(select(Task).filter(Task.owner_id == user_id), sort_columns, cursor, limit)
+        result = await db.execute(query)
+        return keyset_page(result.scalars(), sort_columns, limit)
+
+    @staticmethod
+    async def search(db: AsyncSession, user_id: int, text: str, status: str = None, priority: int = None,
+                     project_id: int = None, cursor: str = None, limit: int = DEFAULT_PAGE_SIZE):
+        """Buscar tarefas por título e descrição, em ordem de relevância
+
+        Lança ``ValueError`` para consultas sem palavras ou cursores inválidos.
+        """
+        offset = decode_offset_cursor(cursor) if cursor else 0
+        query = search_query(db.bind.dialect.name, user_id, text, status, priority, project_id)
+        result = await db.execute(query.offset(offset).limit(limit + 1))
+        items = [row.Task for row in result]
+        next_cursor = None
+        if len(items) > limit:
+            items = items[:limit]
+            next_cursor = encode_offset_cursor(offset + limit)
+        return {"items": items, "next_cursor": next_cursor}
+
     @staticmethod
     async def complete_task(db: AsyncSession, task_id: int):
         """Marcar tarefa como concluída"""
@@ -72,20 +116,116 @@ class CRUDTask(CRUDBase):
 
 class CRUDEvent(CRUDBase):
     """Operações CRUD para eventos"""
+    @staticmethod
+    async def create_for_user(db: AsyncSession, obj_in: EventCreate, user_id: int):
+        """Criar evento do usuário"""
+        db_obj = Event(**obj_in.dict(), owner_id=user_id)
+        db.add(db_obj)
+        await db.commit()
+        await db.refresh(db_obj)
+        agenda_cache.invalidate(user_id)
+        return db_obj
+
+    @staticmethod
+    async def get_user_event(db: AsyncSession, user_id: int, event_id: int):
+        """Obter evento do usuário (None se não existir ou for de outro usuário)"""
+        result = await db.execute(select(Event).filter(Event.id == event_id, Event.owner_id == user_id))
+        return result.scalar_one_or_none()
+
+    @staticmethod
+    async def update(db: AsyncSession, model, obj_id, obj_in):
+        """Atualizar evento (invalida a agenda do dono)
+
+        Mudar o início ou a regra de uma série descarta as suas exceções, que
+        se referem aos inícios originais das ocorrências.
+        """
+        owner_id = (await db.execute(select(Event.owner_id).filter(Event.id == obj_id))).scalar()
+        changes = obj_in.dict(exclude_unset=True)
+        if "start_time" in changes or "recurrence_rule" in changes:
+            await db.execute(delete(EventException).where(EventException.event_id == obj_id))
+        result = await CRUDBase.update(db, model, obj_id, obj_in)
+        if owner_id is not None:
+            agenda_cache.invalidate(owner_id)
+        return result
+
+    @staticmethod
+    async def delete(db: AsyncSession, model, obj_id):
+        """Deletar evento e as exceções da série (invalida a agenda do dono)"""
+        owner_id = (await db.execute(select(Event.owner_id).filter(Event.id == obj_id))).scalar()
+        await db.execute(delete(EventException).where(EventException.event_id == obj_id))
+        result = await CRUDBase.delete(db, model, obj_id)
+        if owner_id is not None:
+            agenda_cache.invalidate(owner_id)
+        return result
+
+    @staticmethod
+    async def set_occurrence_exception(db: AsyncSession, event: Event, obj_in: EventExceptionCreate):
+        """Cancelar ou mover uma ocorrência da série
+
+        Lança ``ValueError`` se o evento não for recorrente ou se
+        ``original_start`` não for uma ocorrência da série.
+        """
+        if not event.recurrence_rule:
+            raise ValueError("O evento não é recorrente")
+        rule = RecurrenceRule.parse(event.recurrence_rule)
+        if next(rule.starts(event.start_time, after=obj_in.original_start), None) != obj_in.original_start:
+            raise ValueError("original_start não é uma ocorrência da série")
+
+        result = await db.execute(select(EventException).filter(
+            EventException.event_id == event.id,
+            EventException.original_start == obj_in.original_start
+        ))
+        exception = result.scalar_one_or_none()
+        if exception is None:
+            exception = EventException(event_id=event.id)
+            db.add(exception)
+        for name, value in obj_in.dict().items():
+            setattr(exception, name, value)
+        await db.commit()
+        await db.refresh(exception)
+        agenda_cache.invalidate(event.owner_id)
+        return exception
+
     @staticmethod
     async def get_user_events(db: AsyncSession, user_id: int, start_date: datetime = None, end_date: datetime = None):
-        """Obter eventos de um usuário, opcionalmente filtrados por data"""
-        query = select(Event).filter(Event.owner_id == user_id)
-        
-        if start_date:
-            query = query.filter(Event.start_time >= start_date)
-        
+        """Obter eventos simples de um usuário que sobrepõem a janela [start_date, end_date)
+
+        Eventos que começam antes da janela e terminam dentro dela (ou a
+        atravessam) também são incluídos. As duas condições são avaliadas
+        nos índices compostos de ``Event``, sem ler as linhas descartadas.
+        """
+        query = select(Event).filter(Event.owner_id == user_id, Event.recurrence_rule.is_(None))
+
         if end_date:
-            query = query.filter(Event.end_time <= end_date)
-        
-        result = await db.execute(query)
+            query = query.filter(Event.start_time < end_date)
+
+        if start_date:
+            query = query.filter(Event.end_time > start_date)
+
+        result = await db.execute(query.order_by(Event.start_time, Event.id))
         return result.scalars().all()
 
+    @staticmethod
+    async def get_user_occurrences(db: AsyncSession, user_id: int, start_date: datetime, end_date: datetime):
+        """Eventos simples e ocorrências das séries na janela, em ordem de início
+
+        As séries são expandidas em memória (ver ``backend.agenda``), então o
+        custo depende do número de séries, não do número de ocorrências.
+        """
+        events = await CRUDEvent.get_user_events(db, user_id, start_date, end_date)
+        agenda = await agenda_cache.get(db, user_id, events=False)
+        occurrences = list(events) + agenda.occurrences(start_date, end_date)
+        occurrences.sort(key=lambda item: (item.start_time, item.id))
+        return occurrences
+
+    @staticmethod
+    async def get_user_events_page(db: AsyncSession, user_id: int, cursor: str = None, limit: int = DEFAULT_PAGE_SIZE):
+        """Obter uma página de eventos (mais recentes primeiro) paginada por (start_time, id)"""
+        sort_columns = (Event.start_time, Event.id)
+        query = keyset_query(select(Event).filter(Event.owner_id == user_id), sort_columns, cursor, limit)
+        result = await db.execute(query)
+        return keyset_page(result.scalars(), sort_columns, limit)
+
 # Instâncias para uso
 crud_user = CRUDUser()
 crud_task = CRUDTask()
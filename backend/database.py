@@ -1,24 +1,152 @@
-from sqlalchemy import create_engine
+import logging
+import os
+import time
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
-from sqlalchemy.pool import NullPool
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool, StaticPool
+
+logger = logging.getLogger(__name__)
+
+# Configuração do banco de dados (padrão: SQLite local)
+DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./productivity.db")
+
+def _env_bool(name: str, default: bool = False) -> bool:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+def _apply_sqlite_pragmas(engine):
+    """Aplicar os PRAGMAs de desempenho a cada nova conexão SQLite"""
+    pragmas = {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "mmap_size": int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024))),
+        # Valor negativo = tamanho em KiB
+        "cache_size": -int(os.getenv("SQLITE_CACHE_SIZE_KB", "65536")),
+        "busy_timeout": int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000")),
+        "temp_store": "MEMORY",
+    }
+
+    @event.listens_for(engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+def _log_slow_queries(engine, threshold_ms: float):
+    """Registrar no log as consultas mais lentas que ``threshold_ms``"""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def start_timer(conn, cursor, statement, parameters, context, executemany):
+        context._query_start_time = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def check_duration(conn, cursor, statement, parameters, context, executemany):
+        elapsed_ms = (time.perf_counter() - context._query_start_time) * 1000
+        if elapsed_ms >= threshold_ms:
+            logger.warning("Consulta lenta (%.1f ms): %s", elapsed_ms, statement)
+
+# Drivers assíncronos usados para cada dialeto
+ASYNC_DRIVERS = {
+    "sqlite": "aiosqlite",
+    "postgresql": "asyncpg",
+}
+
+def to_async_url(url):
+    """Converter uma URL síncrona para o driver assíncrono equivalente"""
+    url = make_url(url)
+    backend_name = url.get_backend_name()
+    if backend_name not in ASYNC_DRIVERS:
+        raise ValueError(f"Sem driver assíncrono configurado para '{backend_name}'")
+    return url.set(drivername=f"{backend_name}+{ASYNC_DRIVERS[backend_name]}")
+
+def _engine_options(url, is_async: bool = False):
+    """Opções de pool e logging comuns aos engines síncrono e assíncrono"""
+    options = {
+        "echo": _env_bool("DB_ECHO"),  # Log de todas as queries apenas sob demanda
+        "pool_pre_ping": True,
+    }
 
-# Configuração do banco de dados SQLite
-DATABASE_URL = "sqlite:///./productivity.db"
+    if url.get_backend_name() == "sqlite":
+        options["connect_args"] = {"check_same_thread": False}
+        if url.database in (None, "", ":memory:"):
+            # Banco em memória: uma única conexão compartilhada
+            options["poolclass"] = StaticPool
+            options.pop("pool_pre_ping")
+        else:
+            options.update(
+                poolclass=AsyncAdaptedQueuePool if is_async else QueuePool,
+                pool_size=int(os.getenv("DB_POOL_SIZE", "5")),
+                max_overflow=int(os.getenv("DB_MAX_OVERFLOW", "10")),
+                pool_timeout=float(os.getenv("DB_POOL_TIMEOUT", "30")),
+            )
+    else:
+        options.update(
+            pool_size=int(os.getenv("DB_POOL_SIZE", "10")),
+            max_overflow=int(os.getenv("DB_MAX_OVERFLOW", "20")),
+            pool_timeout=float(os.getenv("DB_POOL_TIMEOUT", "30")),
+            pool_recycle=int(os.getenv("DB_POOL_RECYCLE", "1800")),
+        )
+    return options
+
+def _install_engine_events(url, sync_engine):
+    """Registrar PRAGMAs do SQLite e log de consultas lentas"""
+    if url.get_backend_name() == "sqlite":
+        _apply_sqlite_pragmas(sync_engine)
+
+    slow_query_ms = float(os.getenv("DB_SLOW_QUERY_MS", "200"))
+    if slow_query_ms > 0:
+        _log_slow_queries(sync_engine, slow_query_ms)
+
+def create_engine_from_env(url: str = None, **overrides):
+    """Criar o engine a partir das variáveis de ambiente
+
+    Variáveis: DATABASE_URL, DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT,
+    DB_POOL_RECYCLE, DB_ECHO, DB_SLOW_QUERY_MS e, para SQLite,
+    SQLITE_MMAP_SIZE, SQLITE_CACHE_SIZE_KB e SQLITE_BUSY_TIMEOUT_MS.
+    """
+    url = make_url(url or DATABASE_URL)
+    options = _engine_options(url)
+    options.update(overrides)
+    engine = create_engine(url, **options)
+    _install_engine_events(url, engine)
+    return engine
+
+def create_async_engine_from_env(url: str = None, **overrides):
+    """Criar o engine assíncrono (aiosqlite/asyncpg) com as mesmas configurações"""
+    url = to_async_url(url or DATABASE_URL)
+    options = _engine_options(url, is_async=True)
+    options.update(overrides)
+    engine = create_async_engine(url, **options)
+    _install_engine_events(url, engine.sync_engine)
+    return engine
 
 # Criação do engine síncrono
-engine = create_engine(
-    DATABASE_URL, 
-    echo=True,  # Mostra as queries SQL
-    poolclass=NullPool  # Evita problemas de concorrência
-)
+engine = create_engine_from_env()
 
 # Criação do SessionLocal para gerenciar sessões
 SessionLocal = sessionmaker(
-    bind=engine, 
-    autocommit=False, 
+    bind=engine,
+    autocommit=False,
     autoflush=False
 )
 
+# Criação do engine assíncrono (conexões abertas apenas no primeiro uso)
+async_engine = create_async_engine_from_env()
+
+AsyncSessionLocal = sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    autocommit=False,
+    autoflush=False,
+    expire_on_commit=False
+)
+
 # Base para os modelos
 Base = declarative_base()
 
@@ -29,3 +157,8 @@ def get_db():
         yield db
     finally:
         db.close()
+
+async def get_async_db():
+    """Dependency para obter sessão assíncrona de banco de dados"""
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -0,0 +1,366 @@
+"""Exportação colunar do histórico (Parquet, Arrow IPC ou CSV).
+
+As exportações rodam como jobs em segundo plano (threads fora do event loop)
+e leem cada tabela em lotes de ``EXPORT_CHUNK_SIZE`` linhas com um cursor no
+servidor, então a memória usada não depende do volume exportado. O estado de
+cada job fica em ``<EXPORT_DIR>/<id>/job.json``, visível para todos os workers
+da mesma máquina. Jobs cancelados no desligamento e jobs que ficaram pendentes
+ou em andamento após a queda de um processo terminam como ``failed``.
+
+Uso pela linha de comando (a partir da raiz do projeto):
+    python -m backend.exports --format parquet            # todos os usuários
+    python -m backend.exports --format csv --user-id 1
+"""
+import argparse
+import csv
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
+
+from sqlalchemy import Boolean, Date, DateTime, Integer, func, select
+
+from .models import PomodoroSession, Project, Task
+
+logger = logging.getLogger(__name__)
+
+# Tabelas exportáveis e a coluna que identifica o usuário
+EXPORT_TABLES = {
+    "pomodoro_sessions": (PomodoroSession, PomodoroSession.user_id),
+    "projects": (Project, Project.user_id),
+    "tasks": (Task, Task.owner_id),
+}
+
+FORMATS = ("parquet", "arrow", "csv")
+ACTIVE_STATUSES = ("pending", "running")
+EXTENSIONS = {"parquet": "parquet", "arrow": "arrow", "csv": "csv"}
+
+def _pyarrow():
+    """Importar pyarrow sob demanda (dependência opcional)"""
+    try:
+        import pyarrow
+        import pyarrow.ipc
+        import pyarrow.parquet
+    except ImportError:
+        return None
+    return pyarrow
+
+def resolve_format(requested: str) -> str:
+    """Formato efetivo: sem pyarrow, Parquet e Arrow caem para CSV"""
+    if requested not in FORMATS:
+        raise ValueError(f"Formato inválido: {requested} (use {', '.join(FORMATS)})")
+    if requested != "csv" and _pyarrow() is None:
+        logger.warning("pyarrow não instalado: exportando em CSV em vez de %s", requested)
+        return "csv"
+    return requested
+
+def _arrow_schema(pa, model):
+    types = {Integer: pa.int64(), Boolean: pa.bool_(), DateTime: pa.timestamp("us"), Date: pa.date32()}
+    fields = []
+    for column in model.__table__.columns:
+        arrow_type = next((value for kind, value in types.items() if isinstance(column.type, kind)), pa.string())
+        fields.append(pa.field(column.name, arrow_type))
+    return pa.schema(fields)
+
+class _CsvWriter:
+    def __init__(self, path, columns):
+        self._file = open(path, "w", newline="", encoding="utf-8")
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(columns)
+
+    def write(self, rows):
+        self._writer.writerows(
+            [value.isoformat() if isinstance(value, (datetime, date)) else value for value in row]
+            for row in rows
+        )
+
+    def close(self):
+        self._file.close()
+
+class _ArrowWriter:
+    """Grava cada lote como um record batch (Parquet: um row group por lote)"""
+
+    def __init__(self, path, model, file_format):
+        pa = _pyarrow()
+        self._pa = pa
+        self._schema = _arrow_schema(pa, model)
+        if file_format == "parquet":
+            self._writer = pa.parquet.ParquetWriter(path, self._schema, compression="zstd")
+        else:
+            self._sink = pa.OSFile(path, "wb")
+            self._writer = pa.ipc.new_file(self._sink, self._schema)
+        self._format = file_format
+
+    def write(self, rows):
+        columns = list(zip(*rows))
+        batch = self._pa.record_batch(
+            [self._pa.array(values, type=field.type) for values, field in zip(columns, self._schema)],
+            schema=self._schema
+        )
+        if self._format == "parquet":
+            self._writer.write_table(self._pa.Table.from_batches([batch]))
+        else:
+            self._writer.write_batch(batch)
+
+    def close(self):
+        self._writer.close()
+        if self._format == "arrow":
+            self._sink.close()
+
+class ExportCancelled(Exception):
+    """Exportação interrompida pelo desligamento do gerenciador"""
+
+class ExportJob:
+    """Estado de uma exportação (persistido em job.json)"""
+
+    def __init__(self, id, user_id, format, tables, status="pending", rows_total=0, rows_written=0,
+                 files=None, error=None, created_at=None, finished_at=None):
+        self.id = id
+        self.user_id = user_id
+        self.format = format
+        self.tables = tables
+        self.status = status
+        self.rows_total = rows_total
+        self.rows_written = rows_written
+        self.files = files or {}
+        self.error = error
+        self.created_at = created_at or datetime.utcnow().isoformat()
+        self.finished_at = finished_at
+
+    @property
+    def progress(self) -> float:
+        if self.status == "completed":
+            return 1.0
+        return round(self.rows_written / self.rows_total, 4) if self.rows_total else 0.0
+
+    def to_dict(self):
+        data = dict(vars(self))
+        data['progress'] = self.progress
+        return data
+
+    @classmethod
+    def from_dict(cls, data):
+        data = dict(data)
+        data.pop('progress', None)
+        return cls(**data)
+
+class ExportManager:
+    """Fila de exportações executadas em threads"""
+
+    def __init__(self, session_factory, export_dir: str, max_workers: int = 1,
+                 chunk_size: int = 50_000, ttl_hours: float = 24, stale_minutes: float = 60):
+        self.session_factory = session_factory
+        self.export_dir = export_dir
+        self.chunk_size = chunk_size
+        self.ttl_hours = ttl_hours
+        self.stale_minutes = stale_minutes
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="export")
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+
+    def _job_dir(self, job_id: str) -> str:
+        return os.path.join(self.export_dir, job_id)
+
+    def _save(self, job: ExportJob):
+        path = os.path.join(self._job_dir(job.id), "job.json")
+        with open(path + ".tmp", "w") as output:
+            json.dump(job.to_dict(), output)
+        os.replace(path + ".tmp", path)
+
+    def _fail(self, job: ExportJob, error: str):
+        job.status = "failed"
+        job.error = error
+        job.finished_at = datetime.utcnow().isoformat()
+        self._save(job)
+
+    def get(self, job_id: str):
+        """Job pelo id (de qualquer worker), ou None"""
+        try:
+            uuid.UUID(job_id)
+            with open(os.path.join(self._job_dir(job_id), "job.json")) as source:
+                return ExportJob.from_dict(json.load(source))
+        except (ValueError, OSError):
+            return None
+
+    def file_path(self, job: ExportJob, table: str):
+        """Caminho do arquivo exportado de ``table``, ou None se não existir"""
+        filename = job.files.get(table)
+        return os.path.join(self._job_dir(job.id), filename) if filename else None
+
+    def submit(self, user_id: int = None, file_format: str = "parquet", tables=None) -> ExportJob:
+        """Agendar a exportação (``user_id=None`` exporta todos os usuários)"""
+        tables = list(tables or EXPORT_TABLES)
+        unknown = [table for table in tables if table not in EXPORT_TABLES]
+        if unknown:
+            raise ValueError(f"Tabelas inválidas: {', '.join(unknown)}")
+
+        self.purge_expired()
+        job = ExportJob(uuid.uuid4().hex, user_id, resolve_format(file_format), tables)
+        os.makedirs(self._job_dir(job.id))
+        self._save(job)
+        snapshot = ExportJob.from_dict(job.to_dict())
+        future = self._executor.submit(self._run, job)
+        future.add_done_callback(lambda future: self._on_done(job, future))
+        return snapshot
+
+    def _on_done(self, job: ExportJob, future):
+        if future.cancelled():
+            # Cancelado na fila pelo desligamento: _run nunca rodou
+            self._fail(job, "Exportação cancelada no desligamento do servidor")
+
+    def _run(self, job: ExportJob):
+        db = self.session_factory()
+        try:
+            job.status = "running"
+            job.rows_total = sum(self._count(db, table, job.user_id) for table in job.tables)
+            self._save(job)
+            for table in job.tables:
+                job.files[table] = self._export_table(db, job, table)
+            job.status = "completed"
+        except ExportCancelled:
+            logger.warning("Exportação %s interrompida no desligamento", job.id)
+            job.status = "failed"
+            job.error = "Exportação interrompida no desligamento do servidor"
+        except Exception as exc:
+            logger.exception("Falha na exportação %s", job.id)
+            job.status = "failed"
+            job.error = str(exc)
+        finally:
+            db.close()
+            job.finished_at = datetime.utcnow().isoformat()
+            self._save(job)
+
+    @staticmethod
+    def _query(table: str, user_id: int = None):
+        model, owner_column = EXPORT_TABLES[table]
+        stmt = select(*model.__table__.columns).order_by(model.id)
+        return stmt.where(owner_column == user_id) if user_id is not None else stmt
+
+    @staticmethod
+    def _count(db, table: str, user_id: int = None) -> int:
+        model, owner_column = EXPORT_TABLES[table]
+        stmt = select(func.count(model.id))
+        if user_id is not None:
+            stmt = stmt.where(owner_column == user_id)
+        return db.execute(stmt).scalar()
+
+    def _export_table(self, db, job: ExportJob, table: str) -> str:
+        model, _ = EXPORT_TABLES[table]
+        filename = f"{table}.{EXTENSIONS[job.format]}"
+        path = os.path.join(self._job_dir(job.id), filename)
+        if job.format == "csv":
+            writer = _CsvWriter(path + ".part", [column.name for column in model.__table__.columns])
+        else:
+            writer = _ArrowWriter(path + ".part", model, job.format)
+
+        try:
+            result = db.execute(self._query(table, job.user_id).execution_options(yield_per=self.chunk_size))
+            for partition in result.partitions(self.chunk_size):
+                if self._stopping.is_set():
+                    raise ExportCancelled()
+                writer.write(partition)
+                job.rows_written += len(partition)
+                self._save(job)
+        finally:
+            writer.close()
+        os.replace(path + ".part", path)
+        return filename
+
+    def purge_expired(self):
+        """Remover exportações mais antigas que ``ttl_hours``"""
+        if not os.path.isdir(self.export_dir):
+            return
+        cutoff = time.time() - self.ttl_hours * 3600
+        with self._lock:
+            for name in os.listdir(self.export_dir):
+                path = os.path.join(self.export_dir, name)
+                if os.path.isdir(path) and os.path.getmtime(path) < cutoff:
+                    shutil.rmtree(path, ignore_errors=True)
+
+    def fail_stale(self) -> int:
+        """Marcar como ``failed`` os jobs pendentes ou em andamento parados há mais de ``stale_minutes``
+
+        São jobs de um processo que morreu antes de concluí-los; um job ativo
+        regrava o job.json a cada lote. Retorna quantos jobs foram marcados.
+        """
+        if not os.path.isdir(self.export_dir):
+            return 0
+        cutoff = time.time() - self.stale_minutes * 60
+        stale = 0
+        for name in os.listdir(self.export_dir):
+            try:
+                if os.path.getmtime(os.path.join(self._job_dir(name), "job.json")) >= cutoff:
+                    continue
+            except OSError:
+                continue
+            job = self.get(name)
+            if job is not None and job.status in ACTIVE_STATUSES:
+                self._fail(job, "Exportação interrompida: o processo foi encerrado antes de concluí-la")
+                stale += 1
+        if stale:
+            logger.warning("%d exportações interrompidas marcadas como falhas", stale)
+        return stale
+
+    def shutdown(self, wait: bool = True):
+        """Encerrar o executor; sem ``wait``, os jobs na fila são cancelados e os
+        em andamento param no próximo lote (ambos terminam como ``failed``)"""
+        if not wait:
+            self._stopping.set()
+        self._executor.shutdown(wait=wait, cancel_futures=not wait)
+
+_manager = None
+
+def get_export_manager() -> ExportManager:
+    """Gerenciador criado no primeiro uso a partir das variáveis de ambiente
+
+    Variáveis: EXPORT_DIR, EXPORT_WORKERS, EXPORT_CHUNK_SIZE, EXPORT_TTL_HOURS
+    e EXPORT_STALE_MINUTES. Ao ser criado, marca como falhas os jobs
+    interrompidos por um processo anterior.
+    """
+    global _manager
+    if _manager is None:
+        from .database import SessionLocal
+
+        _manager = ExportManager(
+            SessionLocal,
+            export_dir=os.path.abspath(os.getenv("EXPORT_DIR", "./exports")),
+            max_workers=int(os.getenv("EXPORT_WORKERS", "1")),
+            chunk_size=int(os.getenv("EXPORT_CHUNK_SIZE", "50000")),
+            ttl_hours=float(os.getenv("EXPORT_TTL_HOURS", "24")),
+            stale_minutes=float(os.getenv("EXPORT_STALE_MINUTES", "60"))
+        )
+        _manager.fail_stale()
+    return _manager
+
+def shutdown_export_manager():
+    """Cancelar as exportações na fila e interromper as em andamento (ficam ``failed``)"""
+    global _manager
+    if _manager is not None:
+        _manager.shutdown(wait=False)
+        _manager = None
+
+def main():
+    parser = argparse.ArgumentParser(description="Exportar o histórico em formato colunar")
+    parser.add_argument("--format", choices=FORMATS, default="parquet")
+    parser.add_argument("--user-id", type=int, default=None, help="Exportar apenas um usuário")
+    parser.add_argument("--tables", nargs="+", choices=sorted(EXPORT_TABLES), default=None)
+    args = parser.parse_args()
+
+    manager = get_export_manager()
+    job = manager.submit(args.user_id, args.format, args.tables)
+    print(f"🔄 Exportando {', '.join(job.tables)} em {job.format} (job {job.id})...")
+    manager.shutdown(wait=True)
+
+    job = manager.get(job.id)
+    if job.status != "completed":
+        print(f"❌ Exportação falhou: {job.error}")
+        raise SystemExit(1)
+    print(f"✅ {job.rows_written} linhas exportadas para {manager._job_dir(job.id)}")
+
+if __name__ == "__main__":
+    main()
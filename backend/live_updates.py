@@ -0,0 +1,210 @@
+import asyncio
+import json
+import logging
+import os
+import threading
+from contextlib import asynccontextmanager
+from datetime import date, datetime
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from sqlalchemy.util import await_only
+
+logger = logging.getLogger(__name__)
+
+# Tipos de mensagem enviados aos clientes
+SESSION = "session"
+STATISTICS = "statistics"
+ACHIEVEMENT = "achievement"
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Tipo não serializável: {type(value).__name__}")
+
+def encode_message(message_type: str, data) -> str:
+    return json.dumps({"type": message_type, "data": data}, default=_json_default)
+
+class QueueSubscription:
+    """Assinatura do broker em memória"""
+
+    def __init__(self, queue: asyncio.Queue):
+        self.queue = queue
+
+    async def get(self, timeout: float):
+        """Próxima mensagem, ou None se nada chegar em ``timeout`` segundos"""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+class RedisSubscription:
+    """Assinatura de um canal Redis"""
+
+    def __init__(self, pubsub):
+        self.pubsub = pubsub
+
+    async def get(self, timeout: float):
+        # Confirmações de inscrição também devolvem None: esperar até o prazo
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while True:
+            message = await self.pubsub.get_message(timeout=max(0, deadline - loop.time()))
+            if message is not None:
+                return message["data"].decode()
+            if loop.time() >= deadline:
+                return None
+
+class InProcessBroker:
+    """Fan-out em memória das mensagens de cada usuário (um por processo)
+
+    Cada assinante tem uma fila limitada no seu event loop; ``publish`` pode
+    ser chamado de qualquer thread. Se um cliente lento enche a fila, as
+    mensagens mais antigas são descartadas.
+    """
+
+    def __init__(self, max_queue: int = 100):
+        self.max_queue = max_queue
+        self._subscribers = {}
+        self._lock = threading.Lock()
+
+    def publish(self, user_id: int, payload: str):
+        with self._lock:
+            subscribers = list(self._subscribers.get(user_id, ()))
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(self._put, queue, payload)
+            except RuntimeError:
+                # Event loop já encerrado
+                pass
+
+    @staticmethod
+    def _put(queue: asyncio.Queue, payload: str):
+        if queue.full():
+            queue.get_nowait()
+        queue.put_nowait(payload)
+
+    @asynccontextmanager
+    async def subscribe(self, user_id: int):
+        """Assinar as mensagens do usuário enquanto o contexto estiver aberto"""
+        subscriber = (asyncio.get_running_loop(), asyncio.Queue(self.max_queue))
+        with self._lock:
+            self._subscribers.setdefault(user_id, set()).add(subscriber)
+        try:
+            yield QueueSubscription(subscriber[1])
+        finally:
+            with self._lock:
+                self._subscribers[user_id].discard(subscriber)
+                if not self._subscribers[user_id]:
+                    del self._subscribers[user_id]
+
+    def wants(self, user_id: int) -> bool:
+        """Se há algum cliente conectado para o usuário neste processo"""
+        return user_id in self._subscribers
+
+    def subscriber_count(self, user_id: int = None) -> int:
+        with self._lock:
+            if user_id is not None:
+                return len(self._subscribers.get(user_id, ()))
+            return sum(len(subscribers) for subscribers in self._subscribers.values())
+
+class RedisBroker:
+    """Fan-out entre workers via Redis pub/sub (dependência opcional)
+
+    ``publish`` é chamado pelo ``after_commit`` da sessão: dentro de
+    ``AsyncSession.run_sync`` o PUBLISH é aguardado no próprio event loop
+    (``await_only``); nas threads usa o cliente síncrono.
+    """
+
+    def __init__(self, url: str, prefix: str = "productivity:live:"):
+        try:
+            import redis
+            import redis.asyncio
+        except ImportError as exc:
+            raise RuntimeError("LIVE_UPDATES_BACKEND=redis requer o pacote 'redis'") from exc
+
+        self.url = url
+        self.prefix = prefix
+        self.client = redis.Redis.from_url(url)
+        self.async_client = redis.asyncio.Redis.from_url(url)
+        self._async_module = redis.asyncio
+
+    def publish(self, user_id: int, payload: str):
+        channel = f"{self.prefix}{user_id}"
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            self.client.publish(channel, payload)
+        else:
+            await_only(self.async_client.publish(channel, payload))
+
+    def wants(self, user_id: int) -> bool:
+        # Os assinantes podem estar em outros workers
+        return True
+
+    @asynccontextmanager
+    async def subscribe(self, user_id: int):
+        client = self._async_module.Redis.from_url(self.url)
+        pubsub = client.pubsub(ignore_subscribe_messages=True)
+        await pubsub.subscribe(f"{self.prefix}{user_id}")
+        try:
+            yield RedisSubscription(pubsub)
+        finally:
+            await pubsub.unsubscribe()
+            # aclose() a partir do redis 5.0.1
+            await getattr(client, "aclose", client.close)()
+
+def create_broker():
+    """Criar o broker a partir das variáveis de ambiente"""
+    if os.getenv("LIVE_UPDATES_BACKEND", "memory") == "redis":
+        return RedisBroker(os.getenv("LIVE_UPDATES_URL", "redis://localhost:6379/0"))
+    return InProcessBroker(max_queue=int(os.getenv("LIVE_UPDATES_QUEUE_SIZE", "100")))
+
+broker = create_broker()
+
+# Intervalo dos heartbeats que mantêm a conexão aberta em proxies
+HEARTBEAT_SECONDS = float(os.getenv("LIVE_UPDATES_HEARTBEAT", "15"))
+
+async def sse_stream(user_id: int, heartbeat: float = HEARTBEAT_SECONDS):
+    """Fluxo Server-Sent Events com as mensagens do usuário"""
+    async with broker.subscribe(user_id) as subscription:
+        yield b"retry: 3000\n\n"
+        while True:
+            payload = await subscription.get(heartbeat)
+            if payload is None:
+                yield b": ping\n\n"
+            else:
+                yield f"data: {payload}\n\n".encode()
+
+async def websocket_stream(websocket, user_id: int, heartbeat: float = HEARTBEAT_SECONDS):
+    """Encaminhar as mensagens do usuário por um WebSocket já aceito até a desconexão"""
+    async with broker.subscribe(user_id) as subscription:
+        while True:
+            payload = await subscription.get(heartbeat)
+            await websocket.send_text(payload if payload is not None else encode_message("ping", None))
+
+def notify(db: Session, user_id: int, message_type: str, data):
+    """Enviar uma mensagem ao usuário assim que a transação atual for confirmada
+
+    Fora de uma transação a mensagem é publicada imediatamente; em caso de
+    rollback ela é descartada.
+    """
+    if not broker.wants(user_id):
+        return
+    payload = encode_message(message_type, data)
+    if db.in_transaction():
+        db.info.setdefault("live_updates", []).append((user_id, payload))
+    else:
+        broker.publish(user_id, payload)
+
+@event.listens_for(Session, "after_commit")
+def _publish_after_commit(session):
+    for user_id, payload in session.info.pop("live_updates", ()):
+        try:
+            broker.publish(user_id, payload)
+        except Exception:
+            logger.exception("Falha ao publicar atualização para o usuário %s", user_id)
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_rollback(session):
+    session.info.pop("live_updates", None)
@@ -1,13 +1,30 @@
-from fastapi import FastAPI, Depends
+from datetime import datetime
+
+from backend.startup import startup_report
+
+from fastapi import FastAPI, Depends, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from backend.database import engine, Base, get_db
+startup_report.mark("import fastapi/sqlalchemy")
+
+from backend.async_services import AsyncDashboardService
+from backend.cache import cached_json_response, response_cache
+from backend.database import get_db, get_async_db, _env_bool
+from backend.metrics import MetricsMiddleware, metrics_registry
 from backend.routes import router
-from backend.models import User, Project, PomodoroSession, Achievement
+from backend.models import User, Project, Achievement
+from backend.schemas import DashboardResponse
 from backend.auth import create_access_token, get_current_user
+from backend.write_behind import configure_write_buffer, shutdown_write_buffer
+
+startup_report.mark("import backend")
 
-Base.metadata.create_all(bind=engine)
+# Conquistas, exportações e hash de senhas são importados no primeiro uso
+
+# O schema é gerenciado apenas pelas migrações (alembic upgrade head)
 
 app = FastAPI(
     title="Productivity App Backend",
@@ -24,9 +41,70 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Latência, consultas SQL por rota e detector de N+1 (METRICS_ENABLED=0 desliga)
+if _env_bool("METRICS_ENABLED", True):
+    app.add_middleware(MetricsMiddleware)
+
 # Incluir rotas
 app.include_router(router, prefix="/api")
 
+startup_report.mark("create app")
+
+@app.on_event("startup")
+def load_achievement_rules():
+    """Carregar (e validar) o catálogo de conquistas uma única vez
+
+    Com FAST_STARTUP=1 o catálogo é carregado na primeira avaliação.
+    """
+    if not _env_bool("FAST_STARTUP"):
+        from backend.achievements import get_rule_catalog
+
+        with startup_report.phase("achievement catalog"):
+            get_rule_catalog()
+
+@app.on_event("startup")
+def start_write_behind():
+    """Ligar o buffer write-behind de sessões (POMODORO_WRITE_BEHIND=1)"""
+    with startup_report.phase("write-behind buffer"):
+        configure_write_buffer()
+
+@app.on_event("startup")
+def recover_exports():
+    """Marcar como falhas as exportações interrompidas por um processo anterior
+
+    Com FAST_STARTUP=1 isso acontece quando o gerenciador é criado, na
+    primeira exportação.
+    """
+    if not _env_bool("FAST_STARTUP"):
+        from backend.exports import get_export_manager
+
+        with startup_report.phase("export recovery"):
+            get_export_manager()
+
+@app.on_event("startup")
+def report_startup():
+    """Relatório do tempo de inicialização (STARTUP_REPORT=1)"""
+    startup_report.emit()
+
+@app.on_event("shutdown")
+def stop_write_behind():
+    """Gravar as transições pendentes antes de encerrar"""
+    shutdown_write_buffer()
+
+@app.on_event("shutdown")
+def stop_exports():
+    """Cancelar as exportações pendentes e interromper as em andamento"""
+    from backend.exports import shutdown_export_manager
+
+    shutdown_export_manager()
+
+@app.on_event("shutdown")
+def stop_password_hasher():
+    """Encerrar o pool de processos do bcrypt"""
+    from backend.passwords import shutdown_password_hasher
+
+    shutdown_password_hasher()
+
 @app.get("/")
 def read_root():
     return {
@@ -41,6 +119,16 @@ def read_root():
         ]
     }
 
+@app.get("/metrics", include_in_schema=False)
+def read_metrics():
+    """Métricas por rota, do cache de respostas e do hash de senhas no formato texto do Prometheus (por processo)"""
+    from backend.passwords import get_password_hasher
+
+    return PlainTextResponse(
+        metrics_registry.render() + response_cache.render() + get_password_hasher().render(),
+        media_type="text/plain; version=0.0.4"
+    )
+
 # Endpoints de inicialização e setup
 @app.post("/setup")
 def setup_initial_data(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
@@ -70,46 +158,45 @@ def setup_initial_data(db: Session = Depends(get_db), current_user: User = Depen
         db.add_all(default_projects)
         db.commit()
     
-    # Configurar conquistas iniciais
-    achievements = [
-        Achievement(
+    # Configurar conquistas iniciais (bloqueadas até a primeira sessão)
+    existing_achievement = db.query(Achievement.id).filter(
+        Achievement.user_id == current_user.id,
+        Achievement.title == "Bem-vindo ao Pomodoro"
+    ).first()
+
+    if not existing_achievement:
+        db.add(Achievement(
             user_id=current_user.id,
             title="Bem-vindo ao Pomodoro",
             description="Complete sua primeira sessão de Pomodoro",
             achievement_type="onboarding",
-            total_sessions_required=1
-        )
-    ]
-    
-    db.add_all(achievements)
-    db.commit()
+            is_unlocked=False
+        ))
+        db.commit()
+    response_cache.invalidate_user(current_user.id)
     
     return {"message": "Dados iniciais configurados com sucesso"}
 
 # Endpoint de estatísticas gerais
-@app.get("/dashboard")
-def get_dashboard_data(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+@app.get("/dashboard", response_model=DashboardResponse)
+async def get_dashboard_data(request: Request, db: AsyncSession = Depends(get_async_db), current_user: User = Depends(get_current_user)):
     """
     Recupera dados gerais para o dashboard
     - Total de projetos
     - Total de sessões Pomodoro
     - Tempo total trabalhado
     - Conquistas desbloqueadas
+    - Tempo de foco e sessões de hoje, sequência atual e maior sequência
+
+    A resposta é cacheada por versão dos dados do usuário (e por dia, por
+    causa dos totais de hoje) e suporta ETag.
     """
-    total_projects = db.query(Project).filter(Project.user_id == current_user.id).count()
-    total_sessions = db.query(PomodoroSession).filter(PomodoroSession.user_id == current_user.id).count()
-    total_work_time = db.query(PomodoroSession.total_work_time).filter(PomodoroSession.user_id == current_user.id).sum() or 0
-    total_achievements = db.query(Achievement).filter(
-        Achievement.user_id == current_user.id, 
-        Achievement.is_unlocked == True
-    ).count()
-    
-    return {
-        "total_projects": total_projects,
-        "total_pomodoro_sessions": total_sessions,
-        "total_work_time_minutes": total_work_time // 60,  # Converter segundos para minutos
-        "total_achievements": total_achievements
-    }
+    async def compute():
+        dashboard = await AsyncDashboardService.get_dashboard_data(db, current_user.id)
+        return dashboard.json().encode()
+
+    namespace = f"dashboard:{datetime.utcnow().date()}"
+    return await cached_json_response(request, namespace, current_user.id, compute)
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,243 @@
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter
+from contextvars import ContextVar
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+# Limites (segundos) dos buckets do histograma de latência
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Limites dos buckets do histograma de consultas por requisição
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+class RequestStats:
+    """Consultas SQL executadas durante uma requisição"""
+    __slots__ = ('queries', 'db_time', 'rows', 'statements')
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.rows = 0
+        self.statements = Counter()
+
+_current_request = ContextVar("request_stats", default=None)
+
+class _CountingCursor:
+    """Cursor DBAPI que conta as linhas lidas pelo SQLAlchemy"""
+
+    def __init__(self, cursor, stats: RequestStats):
+        self._cursor = cursor
+        self._stats = stats
+
+    def fetchone(self):
+        row = self._cursor.fetchone()
+        if row is not None:
+            self._stats.rows += 1
+        return row
+
+    def fetchmany(self, *args, **kwargs):
+        rows = self._cursor.fetchmany(*args, **kwargs)
+        self._stats.rows += len(rows)
+        return rows
+
+    def fetchall(self):
+        rows = self._cursor.fetchall()
+        self._stats.rows += len(rows)
+        return rows
+
+    def __iter__(self):
+        for row in self._cursor:
+            self._stats.rows += 1
+            yield row
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _start_query(conn, cursor, statement, parameters, context, executemany):
+    if _current_request.get() is not None:
+        context._metrics_started = time.perf_counter()
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _finish_query(conn, cursor, statement, parameters, context, executemany):
+    stats = _current_request.get()
+    if stats is None or not hasattr(context, '_metrics_started'):
+        return
+    stats.queries += 1
+    stats.db_time += time.perf_counter() - context._metrics_started
+    stats.statements[statement] += 1
+    if cursor.description is None:
+        # INSERT/UPDATE/DELETE: linhas afetadas
+        stats.rows += max(cursor.rowcount, 0)
+    elif context.cursor is cursor:
+        context.cursor = _CountingCursor(cursor, stats)
+
+class Histogram:
+    """Histograma cumulativo no formato do Prometheus"""
+    __slots__ = ('buckets', 'counts', 'count', 'sum')
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        index = bisect_left(self.buckets, value)
+        if index < len(self.counts):
+            self.counts[index] += 1
+        self.count += 1
+        self.sum += value
+
+    def samples(self):
+        """Pares (le, contagem acumulada), incluindo +Inf"""
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            yield _format_number(bound), cumulative
+        yield "+Inf", self.count
+
+class RouteMetrics:
+    __slots__ = ('latency', 'queries', 'db_time', 'rows', 'status')
+
+    def __init__(self):
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.queries = Histogram(QUERY_BUCKETS)
+        self.db_time = 0.0
+        self.rows = 0
+        self.status = Counter()
+
+def _format_number(value) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+class MetricsRegistry:
+    """Métricas agregadas por rota (um registro por processo)"""
+
+    def __init__(self):
+        self._routes = {}
+        self._lock = threading.Lock()
+
+    def observe(self, method: str, route: str, status: int, elapsed: float, stats: RequestStats):
+        with self._lock:
+            metrics = self._routes.get((method, route))
+            if metrics is None:
+                metrics = self._routes[(method, route)] = RouteMetrics()
+            metrics.latency.observe(elapsed)
+            metrics.queries.observe(stats.queries)
+            metrics.db_time += stats.db_time
+            metrics.rows += stats.rows
+            metrics.status[status] += 1
+
+    def clear(self):
+        with self._lock:
+            self._routes.clear()
+
+    def get(self, method: str, route: str):
+        return self._routes.get((method, route))
+
+    def render(self) -> str:
+        """Métricas no formato texto do Prometheus"""
+        lines = []
+
+        def family(name, kind, help_text):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        with self._lock:
+            routes = sorted(self._routes.items())
+
+            family("http_requests_total", "counter", "Requisições HTTP por rota e status")
+            for (method, route), metrics in routes:
+                for status, count in sorted(metrics.status.items()):
+                    lines.append(f'http_requests_total{{method="{method}",route="{_escape(route)}",status="{status}"}} {count}')
+
+            for name, attribute, help_text in (
+                ("http_request_duration_seconds", "latency", "Latência das requisições HTTP"),
+                ("http_request_db_queries", "queries", "Consultas SQL por requisição"),
+            ):
+                family(name, "histogram", help_text)
+                for (method, route), metrics in routes:
+                    histogram = getattr(metrics, attribute)
+                    labels = f'method="{method}",route="{_escape(route)}"'
+                    for bound, count in histogram.samples():
+                        lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {count}')
+                    lines.append(f"{name}_sum{{{labels}}} {_format_number(float(histogram.sum))}")
+                    lines.append(f"{name}_count{{{labels}}} {histogram.count}")
+
+            family("http_request_db_seconds_total", "counter", "Tempo total gasto em consultas SQL")
+            for (method, route), metrics in routes:
+                lines.append(f'http_request_db_seconds_total{{method="{method}",route="{_escape(route)}"}} {_format_number(metrics.db_time)}')
+
+            family("http_request_db_rows_total", "counter", "Linhas lidas ou alteradas pelas consultas SQL")
+            for (method, route), metrics in routes:
+                lines.append(f'http_request_db_rows_total{{method="{method}",route="{_escape(route)}"}} {metrics.rows}')
+
+        return "\n".join(lines) + "\n"
+
+metrics_registry = MetricsRegistry()
+
+class MetricsMiddleware:
+    """Middleware ASGI que mede latência e consultas SQL de cada requisição
+
+    Requisições com mais de ``query_threshold`` consultas são registradas no
+    log com a consulta mais repetida (provável N+1).
+    """
+
+    def __init__(self, app, registry: MetricsRegistry = None, query_threshold: int = None):
+        self.app = app
+        self.registry = registry or metrics_registry
+        if query_threshold is None:
+            query_threshold = int(os.getenv("N_PLUS_ONE_THRESHOLD", "20"))
+        self.query_threshold = query_threshold
+        self._route_paths = None
+
+    def _route_path(self, scope) -> str:
+        """Modelo da rota (ex.: /api/pomodoro/session/{session_id}/pause)"""
+        endpoint = scope.get("endpoint")
+        if endpoint is None:
+            return "unmatched"
+        if self._route_paths is None:
+            self._route_paths = {
+                route.endpoint: route.path
+                for route in scope["app"].routes if hasattr(route, "endpoint")
+            }
+        return self._route_paths.get(endpoint, scope["path"])
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _current_request.set(stats)
+        status = 500
+        started = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            _current_request.reset(token)
+            route = self._route_path(scope)
+            self.registry.observe(scope["method"], route, status, elapsed, stats)
+            if self.query_threshold and stats.queries > self.query_threshold:
+                statement, repeats = stats.statements.most_common(1)[0]
+                logger.warning(
+                    "Possível N+1: %s %s executou %d consultas (%d× %s)",
+                    scope["method"], route, stats.queries, repeats, " ".join(statement.split())[:200]
+                )
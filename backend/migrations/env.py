@@ -1,9 +1,9 @@
 import os
 import sys
 
-# Adicionar diretório do backend ao path do Python
-backend_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
-sys.path.insert(0, backend_dir)
+# Adicionar a raiz do projeto ao path do Python (pacote "backend")
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, project_root)
 
 from logging.config import fileConfig
 from sqlalchemy import engine_from_config
@@ -11,10 +11,8 @@ from sqlalchemy import pool
 from alembic import context
 
 # Importar modelos para garantir que sejam carregados
-from models import Base
-
-# Configuração síncrona do banco de dados
-DATABASE_URL = "sqlite:///./productivity.db"
+from backend.database import Base, DATABASE_URL
+import backend.models  # noqa: F401
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -0,0 +1,39 @@
+"""Criar a tabela de usuários
+
+Revision ID: 000
+Revises: 
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '000'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    # Bancos criados antes pelo create_all já têm a tabela; as demais
+    # migrações declaram chaves estrangeiras para users.id
+    if sa.inspect(op.get_bind()).has_table('users'):
+        return
+    op.create_table(
+        'users',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('username', sa.String(), nullable=True),
+        sa.Column('email', sa.String(), nullable=True),
+        sa.Column('hashed_password', sa.String(), nullable=True),
+        sa.Column('is_active', sa.Boolean(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_users_id', 'users', ['id'])
+    op.create_index('ix_users_username', 'users', ['username'], unique=True)
+    op.create_index('ix_users_email', 'users', ['email'], unique=True)
+
+def downgrade():
+    op.drop_index('ix_users_email', table_name='users')
+    op.drop_index('ix_users_username', table_name='users')
+    op.drop_index('ix_users_id', table_name='users')
+    op.drop_table('users')
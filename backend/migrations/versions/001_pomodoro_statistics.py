@@ -1,7 +1,7 @@
 """Adicionar tabelas de Pomodoro, Projetos e Conquistas
 
 Revision ID: 001
-Revises: 
+Revises: 000
 Create Date: 2025-02-11
 
 """
@@ -11,7 +11,7 @@ from sqlalchemy.sql import func
 
 # revision identifiers, used by Alembic.
 revision = '001'
-down_revision = None
+down_revision = '000'
 branch_labels = None
 depends_on = None
 
@@ -0,0 +1,64 @@
+"""Adicionar tabelas de rollup de produtividade
+
+Revision ID: 002
+Revises: 001
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '002'
+down_revision = '001'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    # Rollup diário por usuário
+    op.create_table(
+        'user_daily_stats',
+        sa.Column('user_id', sa.Integer(), sa.ForeignKey('users.id'), nullable=False),
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('total_work_time', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('total_sessions', sa.Integer(), nullable=False, server_default='0'),
+        sa.PrimaryKeyConstraint('user_id', 'day')
+    )
+
+    # Rollup semanal (semana ISO) por usuário
+    op.create_table(
+        'user_weekly_stats',
+        sa.Column('user_id', sa.Integer(), sa.ForeignKey('users.id'), nullable=False),
+        sa.Column('iso_year', sa.Integer(), nullable=False),
+        sa.Column('iso_week', sa.Integer(), nullable=False),
+        sa.Column('total_work_time', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('total_sessions', sa.Integer(), nullable=False, server_default='0'),
+        sa.PrimaryKeyConstraint('user_id', 'iso_year', 'iso_week')
+    )
+
+    # Rollup mensal por usuário
+    op.create_table(
+        'user_monthly_stats',
+        sa.Column('user_id', sa.Integer(), sa.ForeignKey('users.id'), nullable=False),
+        sa.Column('year', sa.Integer(), nullable=False),
+        sa.Column('month', sa.Integer(), nullable=False),
+        sa.Column('total_work_time', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('total_sessions', sa.Integer(), nullable=False, server_default='0'),
+        sa.PrimaryKeyConstraint('user_id', 'year', 'month')
+    )
+
+    # Rollup por usuário e projeto
+    op.create_table(
+        'user_project_stats',
+        sa.Column('user_id', sa.Integer(), sa.ForeignKey('users.id'), nullable=False),
+        sa.Column('project_id', sa.Integer(), sa.ForeignKey('projects.id'), nullable=False),
+        sa.Column('total_work_time', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('total_sessions', sa.Integer(), nullable=False, server_default='0'),
+        sa.PrimaryKeyConstraint('user_id', 'project_id')
+    )
+
+def downgrade():
+    op.drop_table('user_project_stats')
+    op.drop_table('user_monthly_stats')
+    op.drop_table('user_weekly_stats')
+    op.drop_table('user_daily_stats')
@@ -0,0 +1,59 @@
+"""Progresso incremental de conquistas e unicidade (user_id, title)
+
+Revision ID: 003
+Revises: 002
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '003'
+down_revision = '002'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    # Remover conquistas duplicadas antes do índice único, mantendo a desbloqueada
+    # (a mais antiga entre as desbloqueadas) para não perder conquistas do usuário
+    op.execute("""
+        DELETE FROM achievements
+        WHERE id IN (
+            SELECT id FROM (
+                SELECT id, ROW_NUMBER() OVER (
+                    PARTITION BY user_id, title
+                    ORDER BY is_unlocked DESC, achieved_at IS NULL, achieved_at, id
+                ) AS position
+                FROM achievements
+            ) ranked
+            WHERE position > 1
+        )
+    """)
+    op.create_index('uq_achievements_user_title', 'achievements', ['user_id', 'title'], unique=True)
+
+    # Contadores de progresso por usuário
+    op.create_table(
+        'user_progress',
+        sa.Column('user_id', sa.Integer(), sa.ForeignKey('users.id'), nullable=False),
+        sa.Column('total_sessions', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('total_work_time', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('current_streak', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('longest_streak', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('last_session_day', sa.Date(), nullable=True),
+        sa.PrimaryKeyConstraint('user_id')
+    )
+
+    # Preencher os totais a partir das sessões concluídas
+    # (as sequências de dias são calculadas por "python -m backend.rebuild_rollups")
+    op.execute("""
+        INSERT INTO user_progress (user_id, total_sessions, total_work_time, current_streak, longest_streak)
+        SELECT user_id, COUNT(id), COALESCE(SUM(total_work_time), 0), 0, 0
+        FROM pomodoro_sessions
+        WHERE is_completed = true
+        GROUP BY user_id
+    """)
+
+def downgrade():
+    op.drop_table('user_progress')
+    op.drop_index('uq_achievements_user_title', table_name='achievements')
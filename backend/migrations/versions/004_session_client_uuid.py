@@ -0,0 +1,29 @@
+"""Identificador do cliente em sessões de Pomodoro (importação idempotente)
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '004'
+down_revision = '003'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.add_column('pomodoro_sessions', sa.Column('client_uuid', sa.String(36), nullable=True))
+    op.create_index(
+        'uq_pomodoro_sessions_user_client_uuid',
+        'pomodoro_sessions',
+        ['user_id', 'client_uuid'],
+        unique=True
+    )
+
+def downgrade():
+    op.drop_index('uq_pomodoro_sessions_user_client_uuid', table_name='pomodoro_sessions')
+    with op.batch_alter_table('pomodoro_sessions') as batch_op:
+        batch_op.drop_column('client_uuid')
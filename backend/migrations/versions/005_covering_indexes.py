@@ -0,0 +1,53 @@
+"""Índices compostos e de cobertura para estatísticas, dashboard e conquistas
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '005'
+down_revision = '004'
+branch_labels = None
+depends_on = None
+
+RUNNING = sa.text("status = 'running'")
+
+def upgrade():
+    # Estatísticas, rebuild dos rollups e totais do dashboard: leitura só do índice
+    op.create_index(
+        'idx_pomodoro_sessions_user_completed_start',
+        'pomodoro_sessions',
+        ['user_id', 'is_completed', 'start_time', 'project_id', 'total_work_time']
+    )
+    # Totais por projeto
+    op.create_index(
+        'idx_pomodoro_sessions_user_project_work',
+        'pomodoro_sessions',
+        ['user_id', 'project_id', 'total_work_time']
+    )
+    # Sessões em andamento (índice parcial no PostgreSQL e no SQLite)
+    op.create_index(
+        'idx_pomodoro_sessions_running',
+        'pomodoro_sessions',
+        ['user_id', 'start_time'],
+        postgresql_where=RUNNING,
+        sqlite_where=RUNNING
+    )
+    op.create_index('idx_achievements_user_unlocked', 'achievements', ['user_id', 'is_unlocked'])
+
+    # Índices de coluna única agora cobertos pelo prefixo dos compostos
+    op.drop_index('idx_pomodoro_sessions_user', table_name='pomodoro_sessions')
+    op.drop_index('idx_achievements_user', table_name='achievements')
+
+def downgrade():
+    op.create_index('idx_achievements_user', 'achievements', ['user_id'])
+    op.create_index('idx_pomodoro_sessions_user', 'pomodoro_sessions', ['user_id'])
+
+    op.drop_index('idx_achievements_user_unlocked', table_name='achievements')
+    op.drop_index('idx_pomodoro_sessions_running', table_name='pomodoro_sessions')
+    op.drop_index('idx_pomodoro_sessions_user_project_work', table_name='pomodoro_sessions')
+    op.drop_index('idx_pomodoro_sessions_user_completed_start', table_name='pomodoro_sessions')
@@ -0,0 +1,40 @@
+"""Índices compostos para consultas por intervalo na agenda
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '006'
+down_revision = '005'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    # Bancos criados só pelas migrações ainda não têm a tabela de eventos
+    if not sa.inspect(op.get_bind()).has_table('events'):
+        op.create_table(
+            'events',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('title', sa.String(), nullable=True, index=True),
+            sa.Column('description', sa.String(), nullable=True),
+            sa.Column('start_time', sa.DateTime(), nullable=True),
+            sa.Column('end_time', sa.DateTime(), nullable=True),
+            sa.Column('location', sa.String(), nullable=True),
+            sa.Column('is_all_day', sa.Boolean(), nullable=True),
+            sa.Column('owner_id', sa.Integer(), sa.ForeignKey('users.id'), nullable=True),
+            sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index('ix_events_id', 'events', ['id'])
+
+    # Eventos que sobrepõem uma janela: start_time < fim AND end_time > início
+    op.create_index('idx_events_owner_start_end', 'events', ['owner_id', 'start_time', 'end_time'])
+    op.create_index('idx_events_owner_end_start', 'events', ['owner_id', 'end_time', 'start_time'])
+
+def downgrade():
+    op.drop_index('idx_events_owner_end_start', table_name='events')
+    op.drop_index('idx_events_owner_start_end', table_name='events')
@@ -0,0 +1,54 @@
+"""Eventos recorrentes: regra da série e exceções de ocorrências
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '007'
+down_revision = '006'
+branch_labels = None
+depends_on = None
+
+SERIES = sa.text("recurrence_rule IS NOT NULL")
+
+def upgrade():
+    op.add_column('events', sa.Column('recurrence_rule', sa.String(), nullable=True))
+    # Séries do usuário (índice parcial no PostgreSQL e no SQLite)
+    op.create_index(
+        'idx_events_owner_series',
+        'events',
+        ['owner_id'],
+        postgresql_where=SERIES,
+        sqlite_where=SERIES
+    )
+
+    op.create_table(
+        'event_exceptions',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('event_id', sa.Integer(), sa.ForeignKey('events.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('original_start', sa.DateTime(), nullable=False),
+        sa.Column('is_cancelled', sa.Boolean(), default=False),
+        sa.Column('start_time', sa.DateTime(), nullable=True),
+        sa.Column('end_time', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_event_exceptions_id', 'event_exceptions', ['id'])
+    op.create_index(
+        'uq_event_exceptions_event_original',
+        'event_exceptions',
+        ['event_id', 'original_start'],
+        unique=True
+    )
+
+def downgrade():
+    op.drop_index('uq_event_exceptions_event_original', table_name='event_exceptions')
+    op.drop_index('ix_event_exceptions_id', table_name='event_exceptions')
+    op.drop_table('event_exceptions')
+    op.drop_index('idx_events_owner_series', table_name='events')
+    with op.batch_alter_table('events') as batch_op:
+        batch_op.drop_column('recurrence_rule')
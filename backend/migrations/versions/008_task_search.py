@@ -0,0 +1,97 @@
+"""Busca textual de tarefas: FTS5 no SQLite e tsvector com GIN no PostgreSQL
+
+Revision ID: 008
+Revises: 007
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '008'
+down_revision = '007'
+branch_labels = None
+depends_on = None
+
+SQLITE_UPGRADE = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS tasks_fts USING fts5(
+        title, description, content='tasks', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS tasks_fts_insert AFTER INSERT ON tasks BEGIN
+        INSERT INTO tasks_fts(rowid, title, description) VALUES (new.id, new.title, new.description);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS tasks_fts_delete AFTER DELETE ON tasks BEGIN
+        INSERT INTO tasks_fts(tasks_fts, rowid, title, description) VALUES ('delete', old.id, old.title, old.description);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS tasks_fts_update AFTER UPDATE OF title, description ON tasks BEGIN
+        INSERT INTO tasks_fts(tasks_fts, rowid, title, description) VALUES ('delete', old.id, old.title, old.description);
+        INSERT INTO tasks_fts(rowid, title, description) VALUES (new.id, new.title, new.description);
+    END""",
+    # Indexar as tarefas já existentes
+    "INSERT INTO tasks_fts(tasks_fts) VALUES ('rebuild')",
+]
+
+SQLITE_DOWNGRADE = [
+    "DROP TRIGGER IF EXISTS tasks_fts_update",
+    "DROP TRIGGER IF EXISTS tasks_fts_delete",
+    "DROP TRIGGER IF EXISTS tasks_fts_insert",
+    "DROP TABLE IF EXISTS tasks_fts",
+]
+
+POSTGRESQL_UPGRADE = [
+    "ALTER TABLE tasks ADD COLUMN IF NOT EXISTS search_vector tsvector",
+    """CREATE OR REPLACE FUNCTION tasks_search_vector_update() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector :=
+            setweight(to_tsvector('simple', coalesce(NEW.title, '')), 'A') ||
+            setweight(to_tsvector('simple', coalesce(NEW.description, '')), 'B');
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql""",
+    """CREATE TRIGGER tasks_search_vector_trigger
+        BEFORE INSERT OR UPDATE OF title, description ON tasks
+        FOR EACH ROW EXECUTE FUNCTION tasks_search_vector_update()""",
+    # Preencher as tarefas já existentes antes de criar o índice
+    """UPDATE tasks SET search_vector =
+        setweight(to_tsvector('simple', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(description, '')), 'B')""",
+    "CREATE INDEX IF NOT EXISTS idx_tasks_search_vector ON tasks USING GIN (search_vector)",
+]
+
+POSTGRESQL_DOWNGRADE = [
+    "DROP INDEX IF EXISTS idx_tasks_search_vector",
+    "DROP TRIGGER IF EXISTS tasks_search_vector_trigger ON tasks",
+    "DROP FUNCTION IF EXISTS tasks_search_vector_update()",
+    "ALTER TABLE tasks DROP COLUMN IF EXISTS search_vector",
+]
+
+def _execute(statements):
+    dialect = op.get_bind().dialect.name
+    for statement in statements.get(dialect, []):
+        op.execute(statement)
+
+def upgrade():
+    # Bancos criados só pelas migrações ainda não têm a tabela de tarefas
+    if not sa.inspect(op.get_bind()).has_table('tasks'):
+        op.create_table(
+            'tasks',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('title', sa.String(), nullable=True),
+            sa.Column('description', sa.String(), nullable=True),
+            sa.Column('status', sa.String(), nullable=True),
+            sa.Column('priority', sa.Integer(), nullable=True),
+            sa.Column('created_at', sa.DateTime(), nullable=True),
+            sa.Column('completed_at', sa.DateTime(), nullable=True),
+            sa.Column('owner_id', sa.Integer(), sa.ForeignKey('users.id'), nullable=True),
+            sa.Column('project_id', sa.Integer(), sa.ForeignKey('projects.id'), nullable=True),
+            sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index('ix_tasks_id', 'tasks', ['id'])
+        op.create_index('ix_tasks_title', 'tasks', ['title'])
+
+    _execute({"sqlite": SQLITE_UPGRADE, "postgresql": POSTGRESQL_UPGRADE})
+
+def downgrade():
+    _execute({"sqlite": SQLITE_DOWNGRADE, "postgresql": POSTGRESQL_DOWNGRADE})
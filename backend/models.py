@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, Date, Boolean, ForeignKey, Index, DDL, event, text
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from backend.database import Base  
@@ -37,6 +37,48 @@ class Task(Base):
     owner = relationship("User", back_populates="tasks")
     project = relationship("Project", back_populates="tasks")
 
+# Busca textual em título e descrição (ver backend/task_search.py), mantida
+# por triggers: tabela FTS5 de conteúdo externo no SQLite e coluna tsvector
+# com índice GIN no PostgreSQL. A migração 008 cria os mesmos objetos.
+TASK_SEARCH_DDL = {
+    "sqlite": [
+        """CREATE VIRTUAL TABLE IF NOT EXISTS tasks_fts USING fts5(
+            title, description, content='tasks', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2'
+        )""",
+        """CREATE TRIGGER IF NOT EXISTS tasks_fts_insert AFTER INSERT ON tasks BEGIN
+            INSERT INTO tasks_fts(rowid, title, description) VALUES (new.id, new.title, new.description);
+        END""",
+        """CREATE TRIGGER IF NOT EXISTS tasks_fts_delete AFTER DELETE ON tasks BEGIN
+            INSERT INTO tasks_fts(tasks_fts, rowid, title, description) VALUES ('delete', old.id, old.title, old.description);
+        END""",
+        """CREATE TRIGGER IF NOT EXISTS tasks_fts_update AFTER UPDATE OF title, description ON tasks BEGIN
+            INSERT INTO tasks_fts(tasks_fts, rowid, title, description) VALUES ('delete', old.id, old.title, old.description);
+            INSERT INTO tasks_fts(rowid, title, description) VALUES (new.id, new.title, new.description);
+        END""",
+    ],
+    "postgresql": [
+        "ALTER TABLE tasks ADD COLUMN IF NOT EXISTS search_vector tsvector",
+        """CREATE OR REPLACE FUNCTION tasks_search_vector_update() RETURNS trigger AS $$
+        BEGIN
+            NEW.search_vector :=
+                setweight(to_tsvector('simple', coalesce(NEW.title, '')), 'A') ||
+                setweight(to_tsvector('simple', coalesce(NEW.description, '')), 'B');
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql""",
+        """CREATE TRIGGER tasks_search_vector_trigger
+            BEFORE INSERT OR UPDATE OF title, description ON tasks
+            FOR EACH ROW EXECUTE FUNCTION tasks_search_vector_update()""",
+        "CREATE INDEX IF NOT EXISTS idx_tasks_search_vector ON tasks USING GIN (search_vector)",
+    ],
+}
+
+for _dialect, _statements in TASK_SEARCH_DDL.items():
+    for _statement in _statements:
+        event.listen(Task.__table__, "after_create", DDL(_statement).execute_if(dialect=_dialect))
+event.listen(Task.__table__, "before_drop", DDL("DROP TABLE IF EXISTS tasks_fts").execute_if(dialect="sqlite"))
+
 class Event(Base):
     """Modelo de evento para agenda"""
     __tablename__ = "events"
@@ -49,8 +91,44 @@ class Event(Base):
     location = Column(String, nullable=True)
     is_all_day = Column(Boolean, default=False)
     owner_id = Column(Integer, ForeignKey("users.id"))
+    # Regra RRULE (ver backend/recurrence.py); start_time/end_time são a primeira ocorrência
+    recurrence_rule = Column(String, nullable=True)
     
     owner = relationship("User", back_populates="events")
+    exceptions = relationship("EventException", back_populates="event", cascade="all, delete-orphan")
+
+    __table_args__ = (
+        # Consultas de sobreposição (start_time < fim e end_time > início): o
+        # planejador percorre um dos índices e filtra a outra coluna nele mesmo
+        Index("idx_events_owner_start_end", "owner_id", "start_time", "end_time"),
+        Index("idx_events_owner_end_start", "owner_id", "end_time", "start_time"),
+        # Índice parcial: só as séries recorrentes (poucas linhas por usuário)
+        Index(
+            "idx_events_owner_series",
+            "owner_id",
+            postgresql_where=text("recurrence_rule IS NOT NULL"),
+            sqlite_where=text("recurrence_rule IS NOT NULL")
+        ),
+    )
+
+class EventException(Base):
+    """Ocorrência de uma série cancelada ou movida"""
+    __tablename__ = "event_exceptions"
+
+    id = Column(Integer, primary_key=True, index=True)
+    event_id = Column(Integer, ForeignKey("events.id", ondelete="CASCADE"), nullable=False)
+    # Início original da ocorrência (identifica a ocorrência dentro da série)
+    original_start = Column(DateTime, nullable=False)
+    is_cancelled = Column(Boolean, default=False)
+    # Novo horário de uma ocorrência movida
+    start_time = Column(DateTime, nullable=True)
+    end_time = Column(DateTime, nullable=True)
+
+    event = relationship("Event", back_populates="exceptions")
+
+    __table_args__ = (
+        Index("uq_event_exceptions_event_original", "event_id", "original_start", unique=True),
+    )
 
 class PomodoroSession(Base):
     """Modelo para sessões de Pomodoro"""
@@ -72,10 +150,30 @@ class PomodoroSession(Base):
     total_break_time = Column(Integer, default=0)  
     
     is_completed = Column(Boolean, default=False)
+
+    # Identificador gerado pelo cliente (importação idempotente)
+    client_uuid = Column(String(36), nullable=True)
     
     user = relationship("User", back_populates="pomodoro_sessions")
     project = relationship("Project", back_populates="pomodoro_sessions")
 
+    __table_args__ = (
+        Index("uq_pomodoro_sessions_user_client_uuid", "user_id", "client_uuid", unique=True),
+        # Índices de cobertura: estatísticas, rebuild e dashboard leem apenas o índice
+        Index(
+            "idx_pomodoro_sessions_user_completed_start",
+            "user_id", "is_completed", "start_time", "project_id", "total_work_time"
+        ),
+        Index("idx_pomodoro_sessions_user_project_work", "user_id", "project_id", "total_work_time"),
+        # Índice parcial: só as sessões em andamento (poucas linhas por usuário)
+        Index(
+            "idx_pomodoro_sessions_running",
+            "user_id", "start_time",
+            postgresql_where=text("status = 'running'"),
+            sqlite_where=text("status = 'running'")
+        ),
+    )
+
 class Project(Base):
     """Modelo de Projeto com métricas de produtividade"""
     __tablename__ = "projects"
@@ -112,5 +210,67 @@ class Achievement(Base):
     achievement_type = Column(String)  
     
     achieved_at = Column(DateTime, default=datetime.utcnow)
+    is_unlocked = Column(Boolean, default=False)
     
     user = relationship("User", back_populates="achievements")
+
+    # Cada conquista existe uma única vez por usuário
+    __table_args__ = (
+        Index("uq_achievements_user_title", "user_id", "title", unique=True),
+        Index("idx_achievements_user_unlocked", "user_id", "is_unlocked"),
+    )
+
+class UserDailyStats(Base):
+    """Rollup diário de produtividade por usuário"""
+    __tablename__ = "user_daily_stats"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    day = Column(Date, primary_key=True)
+
+    total_work_time = Column(Integer, default=0, nullable=False)
+    total_sessions = Column(Integer, default=0, nullable=False)
+
+class UserWeeklyStats(Base):
+    """Rollup semanal (semana ISO) de produtividade por usuário"""
+    __tablename__ = "user_weekly_stats"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    iso_year = Column(Integer, primary_key=True)
+    iso_week = Column(Integer, primary_key=True)
+
+    total_work_time = Column(Integer, default=0, nullable=False)
+    total_sessions = Column(Integer, default=0, nullable=False)
+
+class UserMonthlyStats(Base):
+    """Rollup mensal de produtividade por usuário"""
+    __tablename__ = "user_monthly_stats"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    year = Column(Integer, primary_key=True)
+    month = Column(Integer, primary_key=True)
+
+    total_work_time = Column(Integer, default=0, nullable=False)
+    total_sessions = Column(Integer, default=0, nullable=False)
+
+class UserProjectStats(Base):
+    """Rollup de produtividade por usuário e projeto"""
+    __tablename__ = "user_project_stats"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    project_id = Column(Integer, ForeignKey("projects.id"), primary_key=True)
+
+    total_work_time = Column(Integer, default=0, nullable=False)
+    total_sessions = Column(Integer, default=0, nullable=False)
+
+class UserProgress(Base):
+    """Contadores de progresso por usuário usados na avaliação de conquistas"""
+    __tablename__ = "user_progress"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+
+    total_sessions = Column(Integer, default=0, nullable=False)
+    total_work_time = Column(Integer, default=0, nullable=False)  # segundos
+
+    current_streak = Column(Integer, default=0, nullable=False)  # dias consecutivos
+    longest_streak = Column(Integer, default=0, nullable=False)
+    last_session_day = Column(Date, nullable=True)
@@ -0,0 +1,115 @@
+import base64
+import json
+from datetime import date, datetime
+
+from sqlalchemy import Date, DateTime, and_, literal, or_, tuple_
+
+# Tamanhos de página aceitos pelas rotas de listagem
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+# Linhas buscadas por ida ao banco nas exportações em streaming
+STREAM_BATCH_SIZE = 1000
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Tipo não serializável: {type(value).__name__}")
+
+def encode_cursor(values) -> str:
+    """Cursor opaco com os valores de ordenação do último item da página"""
+    payload = json.dumps(list(values), default=_json_default, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str, sort_columns):
+    """Decodificar um cursor, convertendo cada valor para o tipo da coluna
+
+    ``None`` só é aceito em colunas que admitem NULL. Lança ``ValueError``
+    para cursores inválidos.
+    """
+    try:
+        padding = "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(cursor + padding))
+    except (ValueError, TypeError) as exc:
+        raise ValueError("Cursor inválido") from exc
+
+    if not isinstance(values, list) or len(values) != len(sort_columns):
+        raise ValueError("Cursor inválido")
+
+    decoded = []
+    for column, value in zip(sort_columns, values):
+        if value is None:
+            if not column.nullable:
+                raise ValueError("Cursor inválido")
+        elif isinstance(column.type, DateTime):
+            value = datetime.fromisoformat(value)
+        elif isinstance(column.type, Date):
+            value = date.fromisoformat(value)
+        decoded.append(value)
+    return decoded
+
+def encode_offset_cursor(offset: int) -> str:
+    """Cursor opaco com a posição da próxima página (resultados ordenados por relevância)"""
+    return encode_cursor([offset])
+
+def decode_offset_cursor(cursor: str) -> int:
+    """Posição guardada no cursor; lança ``ValueError`` para cursores inválidos"""
+    try:
+        padding = "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(cursor + padding))
+    except (ValueError, TypeError) as exc:
+        raise ValueError("Cursor inválido") from exc
+    if not isinstance(values, list) or len(values) != 1 or not isinstance(values[0], int) or values[0] < 0:
+        raise ValueError("Cursor inválido")
+    return values[0]
+
+def _after_cursor(sort_columns, values):
+    """Linhas depois do cursor na ordem decrescente, com NULLs por último"""
+    column, value = sort_columns[0], values[0]
+    if len(sort_columns) == 1:
+        return column < literal(value, column.type)
+    rest = _after_cursor(sort_columns[1:], values[1:])
+    if value is None:
+        return and_(column.is_(None), rest)
+    value = literal(value, column.type)
+    after = or_(column < value, and_(column == value, rest))
+    return or_(after, column.is_(None)) if column.nullable else after
+
+def keyset_query(stmt, sort_columns, cursor: str = None, limit: int = DEFAULT_PAGE_SIZE):
+    """Aplicar paginação por chave (mais recentes primeiro) a um select
+
+    ``sort_columns`` deve terminar em uma coluna única e não nula (ex.:
+    ``id``) para que a ordem seja total e o cursor estável mesmo com inserções
+    entre páginas. Linhas com NULL em uma coluna que o admite (ex.: evento sem
+    ``start_time``) vêm depois das demais, ordenadas pelas colunas seguintes.
+    Busca ``limit + 1`` linhas para saber se existe próxima página.
+    """
+    if cursor:
+        values = decode_cursor(cursor, sort_columns)
+        if any(column.nullable for column in sort_columns):
+            stmt = stmt.where(_after_cursor(sort_columns, values))
+        else:
+            # Comparação de tuplas: usa diretamente o índice composto
+            stmt = stmt.where(
+                tuple_(*sort_columns) < tuple_(*(literal(value, column.type) for column, value in zip(sort_columns, values)))
+            )
+    order = [column.desc().nulls_last() if column.nullable else column.desc() for column in sort_columns]
+    return stmt.order_by(*order).limit(limit + 1)
+
+def keyset_page(rows, sort_columns, limit: int):
+    """Montar a página a partir das ``limit + 1`` linhas buscadas"""
+    rows = list(rows)
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(getattr(rows[-1], column.key) for column in sort_columns)
+    return {"items": rows, "next_cursor": next_cursor}
+
+async def stream_ndjson(db, stmt, batch_size: int = STREAM_BATCH_SIZE):
+    """Gerar as linhas de ``stmt`` como NDJSON usando um cursor no servidor
+
+    A memória usada é proporcional a ``batch_size``, não ao total de linhas.
+    """
+    result = await db.stream(stmt.execution_options(yield_per=batch_size))
+    async for partition in result.mappings().partitions(batch_size):
+        yield "".join(json.dumps(dict(row), default=_json_default) + "\n" for row in partition).encode()
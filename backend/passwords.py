@@ -0,0 +1,187 @@
+"""Hash e verificação de senhas fora do event loop.
+
+O bcrypt custa ~100 ms de CPU por operação; executado no worker, um pico de
+logins atrasaria todas as outras requisições (timer, estatísticas). As
+operações rodam num pool de processos limitado e, quando há mais de
+``PASSWORD_HASH_MAX_PENDING`` operações pendentes, novas tentativas são
+recusadas (``PasswordHasherBusy``, respondido como 503) em vez de enfileiradas
+sem limite. Se um processo do pool morrer (ex.: OOM killer), o pool é recriado
+e a operação é repetida uma vez.
+
+No login, hashes com custo diferente de ``BCRYPT_ROUNDS`` (ou de esquemas
+obsoletos) são refeitos com o custo configurado.
+
+Este módulo é importado pelos processos do pool, por isso só depende da
+biblioteca padrão e do passlib.
+"""
+import asyncio
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from passlib.context import CryptContext
+
+logger = logging.getLogger(__name__)
+
+_contexts = {}
+
+def _context(rounds: int) -> CryptContext:
+    """Contexto do passlib que exige exatamente ``rounds`` (um por processo)"""
+    context = _contexts.get(rounds)
+    if context is None:
+        context = _contexts[rounds] = CryptContext(
+            schemes=["bcrypt"],
+            deprecated="auto",
+            bcrypt__default_rounds=rounds,
+            bcrypt__min_rounds=rounds,
+            bcrypt__max_rounds=rounds
+        )
+    return context
+
+def _hash(password: str, rounds: int) -> str:
+    return _context(rounds).hash(password)
+
+def _verify_and_update(password: str, hashed_password: str, rounds: int):
+    """(senha correta, novo hash ou None) — executado no pool"""
+    try:
+        return _context(rounds).verify_and_update(password, hashed_password)
+    except ValueError:
+        # Hash inválido ou de esquema desconhecido
+        return False, None
+
+class PasswordHasherBusy(Exception):
+    """Operações pendentes acima do limite configurado"""
+
+class PasswordHasher:
+    """Pool limitado de processos para bcrypt
+
+    ``workers=0`` usa uma thread em vez de processos (ambientes sem
+    multiprocessing).
+    """
+
+    def __init__(self, workers: int = 2, max_pending: int = 64, rounds: int = 12):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.rounds = rounds
+        self._executor = None
+        self._lock = threading.Lock()
+        self.pending = 0
+        self.counts = {"hash": 0, "verify": 0, "rehash": 0, "rejected": 0}
+        self.seconds = {"hash": 0.0, "verify": 0.0}
+
+    def _get_executor(self):
+        # Criado no primeiro uso: cada worker do servidor tem o seu pool
+        if self._executor is None:
+            if self.workers > 0:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="password-hash")
+        return self._executor
+
+    def _replace_broken(self, broken):
+        """Descartar o pool quebrado (se outra operação ainda não o fez) e obter um novo"""
+        with self._lock:
+            if self._executor is broken:
+                logger.warning("Pool de hash de senhas quebrado (processo encerrado); recriando")
+                broken.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+            return self._get_executor()
+
+    @property
+    def queue_depth(self) -> int:
+        """Operações esperando um processo livre"""
+        return max(0, self.pending - max(self.workers, 1))
+
+    async def _run(self, operation: str, function, *args):
+        with self._lock:
+            if self.pending >= self.max_pending:
+                self.counts["rejected"] += 1
+                raise PasswordHasherBusy(f"{self.pending} operações de senha pendentes")
+            self.pending += 1
+            executor = self._get_executor()
+        started = time.perf_counter()
+        try:
+            try:
+                return await asyncio.wrap_future(executor.submit(function, *args))
+            except BrokenProcessPool:
+                executor = self._replace_broken(executor)
+                return await asyncio.wrap_future(executor.submit(function, *args))
+        finally:
+            with self._lock:
+                self.pending -= 1
+                self.counts[operation] += 1
+                self.seconds[operation] += time.perf_counter() - started
+
+    async def hash(self, password: str) -> str:
+        return await self._run("hash", _hash, password, self.rounds)
+
+    async def verify(self, password: str, hashed_password: str):
+        """(senha correta, novo hash ou None se o hash já usa o custo configurado)"""
+        valid, new_hash = await self._run("verify", _verify_and_update, password, hashed_password, self.rounds)
+        if new_hash is not None:
+            with self._lock:
+                self.counts["rehash"] += 1
+        return valid, new_hash
+
+    def render(self) -> str:
+        """Métricas no formato texto do Prometheus"""
+        with self._lock:
+            lines = [
+                "# HELP password_hash_pending Operações de senha em execução ou na fila",
+                "# TYPE password_hash_pending gauge",
+                f"password_hash_pending {self.pending}",
+                "# HELP password_hash_queue_depth Operações de senha esperando um processo livre",
+                "# TYPE password_hash_queue_depth gauge",
+                f"password_hash_queue_depth {self.queue_depth}",
+                "# HELP password_hash_operations_total Operações de senha concluídas, rehashes e recusas",
+                "# TYPE password_hash_operations_total counter",
+            ]
+            lines.extend(
+                f'password_hash_operations_total{{operation="{operation}"}} {count}'
+                for operation, count in self.counts.items()
+            )
+            lines.append("# HELP password_hash_seconds_total Tempo total (fila + execução) das operações de senha")
+            lines.append("# TYPE password_hash_seconds_total counter")
+            lines.extend(
+                f'password_hash_seconds_total{{operation="{operation}"}} {seconds!r}'
+                for operation, seconds in self.seconds.items()
+            )
+        return "\n".join(lines) + "\n"
+
+    def shutdown(self, wait: bool = True):
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait, cancel_futures=not wait)
+            self._executor = None
+
+_hasher = None
+
+def get_password_hasher() -> PasswordHasher:
+    """Pool criado no primeiro uso a partir das variáveis de ambiente
+
+    Variáveis: PASSWORD_HASH_WORKERS, PASSWORD_HASH_MAX_PENDING e BCRYPT_ROUNDS.
+    Por padrão os workers do servidor (WEB_CONCURRENCY) dividem metade dos
+    núcleos entre os seus pools.
+    """
+    global _hasher
+    if _hasher is None:
+        web_workers = max(1, int(os.getenv("WEB_CONCURRENCY", "1")))
+        default_workers = max(1, (os.cpu_count() or 2) // (2 * web_workers))
+        workers = int(os.getenv("PASSWORD_HASH_WORKERS", str(default_workers)))
+        _hasher = PasswordHasher(
+            workers=workers,
+            max_pending=int(os.getenv("PASSWORD_HASH_MAX_PENDING", str(max(workers, 1) * 16))),
+            rounds=int(os.getenv("BCRYPT_ROUNDS", "12"))
+        )
+    return _hasher
+
+def shutdown_password_hasher():
+    global _hasher
+    if _hasher is not None:
+        _hasher.shutdown(wait=False)
+        _hasher = None
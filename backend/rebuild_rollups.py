@@ -0,0 +1,31 @@
+"""Reconstruir as tabelas de rollup de produtividade.
+
+Uso (a partir da raiz do projeto):
+    python -m backend.rebuild_rollups            # todos os usuários
+    python -m backend.rebuild_rollups --user-id 1
+"""
+import argparse
+import time
+
+from backend.database import SessionLocal
+from backend.services import RollupService
+
+def main():
+    parser = argparse.ArgumentParser(description="Reconstruir rollups de produtividade")
+    parser.add_argument("--user-id", type=int, default=None, help="Reconstruir apenas um usuário")
+    parser.add_argument("--batch-size", type=int, default=10000, help="Linhas lidas por lote")
+    args = parser.parse_args()
+
+    print("🔄 Reconstruindo rollups de produtividade...")
+    started = time.perf_counter()
+    db = SessionLocal()
+    try:
+        total = RollupService.rebuild(db, user_id=args.user_id, batch_size=args.batch_size)
+    finally:
+        db.close()
+
+    elapsed = time.perf_counter() - started
+    print(f"✅ {total} sessões processadas em {elapsed:.2f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+"""Regras de recorrência de eventos (subconjunto do RRULE da RFC 5545).
+
+Formato aceito: ``FREQ=DAILY|WEEKLY|MONTHLY`` com ``INTERVAL``, ``COUNT``,
+``UNTIL`` (``AAAAMMDDTHHMMSS`` ou ISO 8601) e ``BYDAY`` (apenas semanal,
+ex.: ``BYDAY=MO,WE,FR``). Uma série é guardada como um único evento; as
+ocorrências são geradas sob demanda apenas na janela consultada, saltando
+direto para o início da janela nas frequências diária e semanal.
+"""
+import calendar
+from datetime import datetime, timedelta
+
+FREQUENCIES = ("DAILY", "WEEKLY", "MONTHLY")
+WEEKDAYS = ("MO", "TU", "WE", "TH", "FR", "SA", "SU")
+MAX_COUNT = 10_000
+MAX_INTERVAL = 1000
+
+def _parse_until(value: str) -> datetime:
+    value = value.rstrip("Z")
+    for pattern in ("%Y%m%dT%H%M%S", "%Y%m%d"):
+        try:
+            return datetime.strptime(value, pattern)
+        except ValueError:
+            pass
+    return datetime.fromisoformat(value)
+
+class RecurrenceRule:
+    """Regra de recorrência já validada"""
+    __slots__ = ('freq', 'interval', 'count', 'until', 'byday')
+
+    def __init__(self, freq: str, interval: int = 1, count: int = None, until: datetime = None, byday=None):
+        self.freq = freq
+        self.interval = interval
+        self.count = count
+        self.until = until
+        self.byday = tuple(sorted(set(byday))) if byday else None
+
+    @classmethod
+    def parse(cls, text: str) -> "RecurrenceRule":
+        """Interpretar uma regra RRULE; lança ``ValueError`` se inválida"""
+        parts = {}
+        text = text.strip()
+        if text.upper().startswith("RRULE:"):
+            text = text[len("RRULE:"):]
+        for part in text.split(";"):
+            if not part:
+                continue
+            name, separator, value = part.partition("=")
+            if not separator or not value:
+                raise ValueError(f"Parte inválida na regra de recorrência: {part}")
+            parts[name.upper()] = value.upper()
+
+        freq = parts.pop("FREQ", None)
+        if freq not in FREQUENCIES:
+            raise ValueError(f"FREQ deve ser {', '.join(FREQUENCIES)}")
+        try:
+            interval = int(parts.pop("INTERVAL", "1"))
+            count = int(parts["COUNT"]) if "COUNT" in parts else None
+            until = _parse_until(parts["UNTIL"]) if "UNTIL" in parts else None
+        except ValueError:
+            raise ValueError("INTERVAL, COUNT ou UNTIL inválido") from None
+        parts.pop("COUNT", None)
+        parts.pop("UNTIL", None)
+
+        if not 1 <= interval <= MAX_INTERVAL:
+            raise ValueError(f"INTERVAL deve estar entre 1 e {MAX_INTERVAL}")
+        if count is not None and not 1 <= count <= MAX_COUNT:
+            raise ValueError(f"COUNT deve estar entre 1 e {MAX_COUNT}")
+
+        byday = None
+        if "BYDAY" in parts:
+            if freq != "WEEKLY":
+                raise ValueError("BYDAY só é aceito com FREQ=WEEKLY")
+            names = parts.pop("BYDAY").split(",")
+            if any(name not in WEEKDAYS for name in names):
+                raise ValueError(f"BYDAY deve usar {', '.join(WEEKDAYS)}")
+            byday = [WEEKDAYS.index(name) for name in names]
+        if parts:
+            raise ValueError(f"Partes não suportadas: {', '.join(sorted(parts))}")
+        return cls(freq, interval, count, until, byday)
+
+    def __str__(self):
+        parts = [f"FREQ={self.freq}"]
+        if self.interval != 1:
+            parts.append(f"INTERVAL={self.interval}")
+        if self.byday:
+            parts.append("BYDAY=" + ",".join(WEEKDAYS[day] for day in self.byday))
+        if self.count is not None:
+            parts.append(f"COUNT={self.count}")
+        if self.until is not None:
+            parts.append(f"UNTIL={self.until:%Y%m%dT%H%M%S}")
+        return ";".join(parts)
+
+    def starts(self, dtstart: datetime, after: datetime = None):
+        """Gerar os inícios das ocorrências (em ordem) a partir de ``after``
+
+        Respeita COUNT e UNTIL contando desde ``dtstart``; nas frequências
+        diária e semanal o primeiro período é calculado sem percorrer os
+        anteriores.
+        """
+        generator = {"DAILY": self._daily, "WEEKLY": self._weekly, "MONTHLY": self._monthly}[self.freq]
+        for ordinal, start in generator(dtstart, after):
+            if self.count is not None and ordinal >= self.count:
+                return
+            if self.until is not None and start > self.until:
+                return
+            if after is None or start >= after:
+                yield start
+
+    def _daily(self, dtstart, after):
+        step = timedelta(days=self.interval)
+        ordinal = max(0, (after - dtstart) // step) if after is not None else 0
+        while True:
+            yield ordinal, dtstart + ordinal * step
+            ordinal += 1
+
+    def _weekly(self, dtstart, after):
+        days = self.byday or (dtstart.weekday(),)
+        week0 = dtstart - timedelta(days=dtstart.weekday())
+        step = timedelta(weeks=self.interval)
+        first = sum(1 for day in days if day >= dtstart.weekday())
+        period = max(0, (after - week0) // step) if after is not None else 0
+        while True:
+            week = week0 + period * step
+            for position, day in enumerate(days):
+                start = week + timedelta(days=day)
+                if period == 0:
+                    if start < dtstart:
+                        continue
+                    yield position - (len(days) - first), start
+                else:
+                    yield first + (period - 1) * len(days) + position, start
+            period += 1
+
+    def _monthly(self, dtstart, after):
+        # Meses sem o dia (ex.: 31) são pulados; com COUNT percorre desde o início
+        month = 0
+        if after is not None and self.count is None:
+            elapsed = (after.year - dtstart.year) * 12 + after.month - dtstart.month - 1
+            month = max(0, elapsed // self.interval) * self.interval
+        ordinal = 0
+        while True:
+            year, index = divmod(dtstart.month - 1 + month, 12)
+            year += dtstart.year
+            if dtstart.day <= calendar.monthrange(year, index + 1)[1]:
+                yield ordinal, dtstart.replace(year=year, month=index + 1)
+                ordinal += 1
+            month += self.interval
+
+class Occurrence:
+    """Ocorrência de uma série na janela consultada"""
+    __slots__ = ('id', 'owner_id', 'title', 'description', 'location', 'is_all_day',
+                 'start_time', 'end_time', 'recurrence_rule', 'original_start')
+
+    def __init__(self, series, start_time, end_time, original_start):
+        self.id = series.id
+        self.owner_id = series.owner_id
+        self.title = series.title
+        self.description = series.description
+        self.location = series.location
+        self.is_all_day = series.is_all_day
+        self.recurrence_rule = series.recurrence_rule
+        self.start_time = start_time
+        self.end_time = end_time
+        self.original_start = original_start
+
+class Series:
+    """Evento recorrente com as suas exceções (ocorrências canceladas ou movidas)"""
+    __slots__ = ('id', 'owner_id', 'title', 'description', 'location', 'is_all_day',
+                 'start_time', 'end_time', 'recurrence_rule', 'rule', 'exceptions')
+
+    def __init__(self, event, exceptions=()):
+        for name in self.__slots__[:-2]:
+            setattr(self, name, getattr(event, name))
+        if self.end_time is None:
+            self.end_time = self.start_time
+        self.rule = RecurrenceRule.parse(event.recurrence_rule)
+        # original_start -> (cancelada, novo início, novo fim)
+        self.exceptions = {
+            exception.original_start: (exception.is_cancelled, exception.start_time, exception.end_time)
+            for exception in exceptions
+        }
+
+    def occurrences(self, start: datetime, end: datetime):
+        """Ocorrências que sobrepõem ``[start, end)``, em ordem de início"""
+        duration = self.end_time - self.start_time
+        found = []
+        for original in self.rule.starts(self.start_time, after=start - duration):
+            if original >= end:
+                break
+            if original in self.exceptions or original + duration <= start:
+                continue
+            found.append(Occurrence(self, original, original + duration, original))
+
+        # Exceções: ocorrências movidas podem entrar na janela vindas de fora dela
+        for original, (cancelled, moved_start, moved_end) in self.exceptions.items():
+            if cancelled:
+                continue
+            moved_start = moved_start or original
+            moved_end = moved_end or moved_start + duration
+            if moved_start < end and moved_end > start:
+                found.append(Occurrence(self, moved_start, moved_end, original))
+        found.sort(key=lambda occurrence: occurrence.start_time)
+        return found
+
+def validate_rule(text: str) -> str:
+    """Regra normalizada (para guardar no banco); lança ``ValueError`` se inválida"""
+    return str(RecurrenceRule.parse(text))
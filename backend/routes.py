@@ -1,27 +1,95 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List
+import asyncio
+import os
+from datetime import datetime, timedelta
 
-from .database import get_db
-from .services import StatisticsService, AchievementService, PomodoroService
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, WebSocket, WebSocketDisconnect
+from fastapi.security import OAuth2PasswordRequestForm
+from fastapi.responses import FileResponse, StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+
+from .agenda import find_conflicts, free_slots
+from .async_services import AsyncStatisticsService, AsyncAchievementService, AsyncPomodoroService
+from .cache import cached_json_response
+from .crud import crud_event, crud_task, crud_user
+from .database import get_async_db
+from .live_updates import sse_stream, websocket_stream
+from .models import Event as EventModel, PomodoroSession
+from .pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, stream_ndjson
 from .schemas import (
+    UserCreate,
+    User,
+    Token,
     PomodoroSessionCreate, 
     PomodoroSessionResponse, 
+    PomodoroSessionBulkCreate,
+    PomodoroSessionBulkResult,
+    ExportRequest,
+    ExportJobResponse,
     StatisticsBase, 
-    AchievementResponse
+    AchievementResponse,
+    Page,
+    Task,
+    Event,
+    EventCreate,
+    EventUpdate,
+    EventOccurrence,
+    EventExceptionCreate,
+    EventExceptionResponse,
+    FreeSlot,
+    to_naive_utc
 )
-from .auth import get_current_user
+from .auth import create_access_token, get_current_user, get_websocket_user
 
 router = APIRouter()
 
+def _hasher_busy():
+    return HTTPException(status_code=503, detail="Muitas autenticações em andamento", headers={"Retry-After": "1"})
+
+@router.post("/auth/register", response_model=User, status_code=201)
+async def register(user_data: UserCreate, db: AsyncSession = Depends(get_async_db)):
+    """Cadastrar usuário (o hash da senha é calculado fora do event loop)"""
+    from .passwords import PasswordHasherBusy, get_password_hasher
+
+    if await crud_user.get_by_email(db, user_data.email) or await crud_user.get_by_username(db, user_data.username):
+        raise HTTPException(status_code=400, detail="Usuário ou email já cadastrado")
+    try:
+        hashed_password = await get_password_hasher().hash(user_data.password)
+    except PasswordHasherBusy:
+        raise _hasher_busy()
+    return await crud_user.create_with_password(db, user_data, hashed_password)
+
+@router.post("/auth/token", response_model=Token)
+async def login(form: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_async_db)):
+    """Obter token de acesso (``username`` aceita o nome de usuário ou o email)
+
+    Senhas guardadas com outro custo de bcrypt são refeitas com o configurado.
+    """
+    from .passwords import PasswordHasherBusy, get_password_hasher
+
+    user = await crud_user.get_by_username(db, form.username) or await crud_user.get_by_email(db, form.username)
+    valid = False
+    if user is not None and user.hashed_password and user.is_active:
+        try:
+            valid, new_hash = await get_password_hasher().verify(form.password, user.hashed_password)
+        except PasswordHasherBusy:
+            raise _hasher_busy()
+        if valid and new_hash:
+            user.hashed_password = new_hash
+            await db.commit()
+    if not valid:
+        raise HTTPException(status_code=401, detail="Usuário ou senha incorretos", headers={"WWW-Authenticate": "Bearer"})
+    return Token(access_token=create_access_token({"sub": str(user.id)}))
+
 @router.post("/pomodoro/session", response_model=PomodoroSessionResponse)
-def create_pomodoro_session(
+async def create_pomodoro_session(
     session_data: PomodoroSessionCreate, 
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Criar nova sessão de Pomodoro"""
-    session = PomodoroService.start_session(
+    session = await AsyncPomodoroService.start_session(
         db, 
         user_id=current_user.id, 
         project_id=session_data.project_id,
@@ -30,16 +98,115 @@ def create_pomodoro_session(
     )
     return session
 
+@router.get("/pomodoro/active", response_model=List[PomodoroSessionResponse])
+async def get_active_pomodoro_sessions(
+    db: AsyncSession = Depends(get_async_db),
+    current_user = Depends(get_current_user)
+):
+    """Sessões em andamento ou pausadas do usuário (servidas da memória)"""
+    return await AsyncPomodoroService.get_active_sessions(db, current_user.id)
+
+@router.get("/pomodoro/sessions", response_model=Page[PomodoroSessionResponse])
+async def list_pomodoro_sessions(
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_async_db),
+    current_user = Depends(get_current_user)
+):
+    """Histórico de sessões (mais recentes primeiro), paginado por cursor"""
+    try:
+        return await AsyncPomodoroService.list_sessions(db, current_user.id, cursor, limit)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+@router.get("/pomodoro/sessions/export")
+async def export_pomodoro_sessions(
+    db: AsyncSession = Depends(get_async_db),
+    current_user = Depends(get_current_user)
+):
+    """Exportar todas as sessões como NDJSON (uma sessão por linha, em streaming)"""
+    stmt = select(
+        PomodoroSession.id,
+        PomodoroSession.project_id,
+        PomodoroSession.start_time,
+        PomodoroSession.end_time,
+        PomodoroSession.work_duration,
+        PomodoroSession.break_duration,
+        PomodoroSession.status,
+        PomodoroSession.mode,
+        PomodoroSession.total_work_time,
+        PomodoroSession.is_completed
+    ).where(PomodoroSession.user_id == current_user.id)\
+     .order_by(PomodoroSession.start_time, PomodoroSession.id)
+
+    return StreamingResponse(
+        stream_ndjson(db, stmt),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": 'attachment; filename="pomodoro_sessions.ndjson"'}
+    )
+
+def _export_response(job):
+    data = job.to_dict()
+    data['files'] = {table: f"/api/exports/{job.id}/files/{table}" for table in job.files}
+    return ExportJobResponse(**data)
+
+def _export_manager():
+    # Módulo de exportação carregado só na primeira exportação
+    from .exports import get_export_manager
+
+    return get_export_manager()
+
+def _user_export_job(job_id: str, user_id: int):
+    job = _export_manager().get(job_id)
+    if job is None or job.user_id != user_id:
+        raise HTTPException(status_code=404, detail="Exportação não encontrada")
+    return job
+
+@router.post("/exports", response_model=ExportJobResponse, status_code=202)
+async def create_export(payload: ExportRequest, current_user = Depends(get_current_user)):
+    """Iniciar a exportação colunar do histórico do usuário (job em segundo plano)"""
+    try:
+        job = await asyncio.to_thread(_export_manager().submit, current_user.id, payload.format, payload.tables)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    return _export_response(job)
+
+@router.get("/exports/{job_id}", response_model=ExportJobResponse)
+async def get_export(job_id: str, current_user = Depends(get_current_user)):
+    """Status e progresso de uma exportação"""
+    return _export_response(_user_export_job(job_id, current_user.id))
+
+@router.get("/exports/{job_id}/files/{table}")
+async def download_export(job_id: str, table: str, current_user = Depends(get_current_user)):
+    """Baixar o arquivo de uma tabela exportada"""
+    job = _user_export_job(job_id, current_user.id)
+    path = _export_manager().file_path(job, table)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Arquivo não disponível")
+    return FileResponse(path, filename=os.path.basename(path), media_type="application/octet-stream")
+
+@router.post("/pomodoro/sessions/bulk", response_model=PomodoroSessionBulkResult)
+async def bulk_create_pomodoro_sessions(
+    payload: PomodoroSessionBulkCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user = Depends(get_current_user)
+):
+    """Registrar em lote sessões concluídas offline (reenvios são ignorados)"""
+    try:
+        return await AsyncPomodoroService.ingest_sessions(db, current_user.id, payload.sessions)
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+
 @router.patch("/pomodoro/session/{session_id}/complete")
-def complete_pomodoro_session(
+async def complete_pomodoro_session(
     session_id: int, 
     mode: str = 'work', 
     total_time: int = 25,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Completar sessão de Pomodoro"""
-    session = PomodoroService.complete_session(
+    session = await AsyncPomodoroService.complete_session(
         db, 
         session_id=session_id, 
         mode=mode, 
@@ -52,13 +219,13 @@ def complete_pomodoro_session(
     return session
 
 @router.patch("/pomodoro/session/{session_id}/pause")
-def pause_pomodoro_session(
+async def pause_pomodoro_session(
     session_id: int, 
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Pausar sessão de Pomodoro"""
-    session = PomodoroService.pause_session(db, session_id)
+    session = await AsyncPomodoroService.pause_session(db, session_id)
     
     if not session:
         raise HTTPException(status_code=404, detail="Sessão não encontrada")
@@ -66,13 +233,13 @@ def pause_pomodoro_session(
     return session
 
 @router.patch("/pomodoro/session/{session_id}/stop")
-def stop_pomodoro_session(
+async def stop_pomodoro_session(
     session_id: int, 
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Interromper sessão de Pomodoro"""
-    session = PomodoroService.stop_session(db, session_id)
+    session = await AsyncPomodoroService.stop_session(db, session_id)
     
     if not session:
         raise HTTPException(status_code=404, detail="Sessão não encontrada")
@@ -80,42 +247,175 @@ def stop_pomodoro_session(
     return session
 
 @router.get("/statistics", response_model=StatisticsBase)
-def get_user_statistics(
-    db: Session = Depends(get_db),
+async def get_user_statistics(
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
-    """Obter estatísticas de produtividade do usuário"""
-    statistics = StatisticsService.calculate_productivity(db, current_user.id)
-    return statistics
+    """Obter estatísticas de produtividade do usuário (cacheadas, com ETag)"""
+    async def compute():
+        statistics = await AsyncStatisticsService.calculate_productivity(db, current_user.id)
+        return statistics.json().encode()
+
+    return await cached_json_response(request, "statistics", current_user.id, compute)
 
 @router.post("/achievements/check-pomodoro", response_model=List[AchievementResponse])
-def check_pomodoro_achievements(
-    db: Session = Depends(get_db),
+async def check_pomodoro_achievements(
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Verificar e desbloquear conquistas de Pomodoro"""
-    achievements = AchievementService.check_pomodoro_achievements(db, current_user.id)
+    achievements = await AsyncAchievementService.check_pomodoro_achievements(db, current_user.id)
     return achievements
 
 @router.get("/achievements", response_model=List[AchievementResponse])
-def get_user_achievements(
-    db: Session = Depends(get_db),
+async def get_user_achievements(
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Obter todas as conquistas do usuário"""
-    achievements = db.query(Achievement).filter(
-        Achievement.user_id == current_user.id,
-        Achievement.is_unlocked == True
-    ).all()
-    
-    return [
-        AchievementResponse(
-            id=achievement.id,
-            user_id=achievement.user_id,
-            title=achievement.title,
-            description=achievement.description,
-            achievement_type=achievement.achievement_type,
-            achieved_at=achievement.achieved_at,
-            is_unlocked=True
-        ) for achievement in achievements
-    ]
+    return await AsyncAchievementService.get_unlocked_achievements(db, current_user.id)
+
+@router.get("/tasks", response_model=Page[Task])
+async def list_tasks(
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_async_db),
+    current_user = Depends(get_current_user)
+):
+    """Tarefas do usuário (mais recentes primeiro), paginadas por cursor"""
+    try:
+        return await crud_task.get_user_tasks_page(db, current_user.id, cursor, limit)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+@router.get("/tasks/search", response_model=Page[Task])
+async def search_tasks(
+    q: str = Query(..., min_length=1, max_length=200, description="Palavras buscadas (como prefixo) no título e na descrição"),
+    status: Optional[str] = None,
+    priority: Optional[int] = None,
+    project_id: Optional[int] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_async_db),
+    current_user = Depends(get_current_user)
+):
+    """Busca textual nas tarefas do usuário, em ordem de relevância e paginada por cursor"""
+    try:
+        return await crud_task.search(db, current_user.id, q, status, priority, project_id, cursor, limit)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+@router.get("/events", response_model=Page[Event])
+async def list_events(
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_async_db),
+    current_user = Depends(get_current_user)
+):
+    """Eventos do usuário (mais recentes primeiro), paginados por cursor"""
+    try:
+        return await crud_event.get_user_events_page(db, current_user.id, cursor, limit)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+@router.get("/events/range", response_model=List[EventOccurrence])
+async def list_events_in_range(
+    start: datetime,
+    end: datetime,
+    db: AsyncSession = Depends(get_async_db),
+    current_user = Depends(get_current_user)
+):
+    """Eventos e ocorrências de séries que sobrepõem a janela [start, end) (visões de calendário)"""
+    start, end = to_naive_utc(start), to_naive_utc(end)
+    if end <= start:
+        raise HTTPException(status_code=400, detail="end deve ser posterior a start")
+    return await crud_event.get_user_occurrences(db, current_user.id, start, end)
+
+@router.get("/events/free-slots", response_model=List[FreeSlot])
+async def list_free_slots(
+    start: datetime,
+    end: datetime,
+    duration: int = Query(25, ge=1, le=24 * 60, description="Duração do bloco em minutos"),
+    limit: int = Query(20, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_async_db),
+    current_user = Depends(get_current_user)
+):
+    """Horários livres na agenda onde cabe um bloco de Pomodoro"""
+    start, end = to_naive_utc(start), to_naive_utc(end)
+    if end <= start:
+        raise HTTPException(status_code=400, detail="end deve ser posterior a start")
+    slots = await free_slots(db, current_user.id, start, end, timedelta(minutes=duration), limit)
+    return [FreeSlot(start=slot_start, end=slot_end) for slot_start, slot_end in slots]
+
+@router.post("/events", response_model=Event, status_code=201)
+async def create_event(
+    event_data: EventCreate,
+    allow_conflicts: bool = False,
+    db: AsyncSession = Depends(get_async_db),
+    current_user = Depends(get_current_user)
+):
+    """Criar evento; responde 409 se sobrepuser outro (exceto com allow_conflicts)"""
+    if not allow_conflicts:
+        conflicts = await find_conflicts(
+            db, current_user.id, event_data.start_time, event_data.end_time, event_data.recurrence_rule
+        )
+        if conflicts:
+            raise HTTPException(status_code=409, detail={
+                "message": "Conflito com eventos existentes",
+                "conflicts": sorted({event_id for _, _, event_id in conflicts})
+            })
+    return await crud_event.create_for_user(db, event_data, current_user.id)
+
+@router.patch("/events/{event_id}", response_model=Event)
+async def update_event(
+    event_id: int,
+    event_data: EventUpdate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user = Depends(get_current_user)
+):
+    """Atualizar evento ou série inteira (mudar início ou regra descarta as exceções)"""
+    event = await crud_event.get_user_event(db, current_user.id, event_id)
+    if event is None:
+        raise HTTPException(status_code=404, detail="Evento não encontrado")
+    start_time = event_data.start_time or event.start_time
+    end_time = event_data.end_time or event.end_time
+    if start_time and end_time and end_time < start_time:
+        raise HTTPException(status_code=400, detail="end_time deve ser posterior a start_time")
+    await crud_event.update(db, EventModel, event_id, event_data)
+    await db.refresh(event)
+    return event
+
+@router.put("/events/{event_id}/exceptions", response_model=EventExceptionResponse)
+async def set_event_exception(
+    event_id: int,
+    exception_data: EventExceptionCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user = Depends(get_current_user)
+):
+    """Cancelar ou mover uma ocorrência de um evento recorrente"""
+    event = await crud_event.get_user_event(db, current_user.id, event_id)
+    if event is None:
+        raise HTTPException(status_code=404, detail="Evento não encontrado")
+    try:
+        return await crud_event.set_occurrence_exception(db, event, exception_data)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+@router.get("/live/stream")
+async def live_updates_stream(current_user = Depends(get_current_user)):
+    """Atualizações em tempo real (Server-Sent Events): sessões, estatísticas e conquistas"""
+    return StreamingResponse(
+        sse_stream(current_user.id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.websocket("/live/ws")
+async def live_updates_websocket(websocket: WebSocket, current_user = Depends(get_websocket_user)):
+    """Atualizações em tempo real via WebSocket (mesmas mensagens do fluxo SSE)"""
+    await websocket.accept()
+    try:
+        await websocket_stream(websocket, current_user.id)
+    except WebSocketDisconnect:
+        pass
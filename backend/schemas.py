@@ -1,6 +1,23 @@
-from pydantic import BaseModel, EmailStr, Field
-from datetime import datetime
-from typing import Optional, List, Dict
+from pydantic import BaseModel, EmailStr, Field, validator
+from pydantic.generics import GenericModel
+from datetime import datetime, timezone
+from typing import Optional, List, Dict, Generic, TypeVar
+from uuid import UUID
+
+from .recurrence import validate_rule
+
+ItemT = TypeVar("ItemT")
+
+def to_naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Datetime com fuso (ex.: ``...Z`` do ``toISOString()``) em UTC sem fuso, como no banco"""
+    if value is not None and value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+class Page(GenericModel, Generic[ItemT]):
+    """Página de resultados com cursor para a próxima página"""
+    items: List[ItemT]
+    next_cursor: Optional[str] = None
 
 class UserBase(BaseModel):
     """Schema base para usuário"""
@@ -19,6 +36,11 @@ class User(UserBase):
     class Config:
         orm_mode = True
 
+class Token(BaseModel):
+    """Token de acesso (OAuth2 password flow)"""
+    access_token: str
+    token_type: str = "bearer"
+
 class TaskBase(BaseModel):
     """Schema base para tarefa"""
     title: str = Field(..., min_length=3, max_length=100)
@@ -48,10 +70,52 @@ class EventBase(BaseModel):
     end_time: datetime
     location: Optional[str] = None
     is_all_day: bool = False
+    recurrence_rule: Optional[str] = Field(None, description="Regra RRULE, ex.: FREQ=WEEKLY;BYDAY=MO,WE")
+
+    _naive_utc = validator("start_time", "end_time", allow_reuse=True)(to_naive_utc)
+
+def _normalize_rule(rule):
+    return validate_rule(rule) if rule is not None else None
 
 class EventCreate(EventBase):
     """Schema para criação de evento"""
-    pass
+
+    @validator("end_time")
+    def end_after_start(cls, end_time, values):
+        if "start_time" in values and end_time < values["start_time"]:
+            raise ValueError("end_time deve ser posterior a start_time")
+        return end_time
+
+    _recurrence_rule = validator("recurrence_rule", allow_reuse=True)(_normalize_rule)
+
+class EventUpdate(BaseModel):
+    """Schema para atualização parcial de evento (ou de uma série inteira)"""
+    title: Optional[str] = Field(None, min_length=3, max_length=100)
+    description: Optional[str] = None
+    start_time: Optional[datetime] = None
+    end_time: Optional[datetime] = None
+    location: Optional[str] = None
+    is_all_day: Optional[bool] = None
+    recurrence_rule: Optional[str] = None
+
+    _naive_utc = validator("start_time", "end_time", allow_reuse=True)(to_naive_utc)
+    _recurrence_rule = validator("recurrence_rule", allow_reuse=True)(_normalize_rule)
+
+class EventExceptionCreate(BaseModel):
+    """Cancelar ou mover uma ocorrência de um evento recorrente"""
+    original_start: datetime = Field(..., description="Início original da ocorrência")
+    is_cancelled: bool = False
+    start_time: Optional[datetime] = None
+    end_time: Optional[datetime] = None
+
+    _naive_utc = validator("original_start", "start_time", "end_time", allow_reuse=True)(to_naive_utc)
+
+class EventExceptionResponse(EventExceptionCreate):
+    id: int
+    event_id: int
+
+    class Config:
+        orm_mode = True
 
 class Event(EventBase):
     """Schema para retorno de evento"""
@@ -61,6 +125,15 @@ class Event(EventBase):
     class Config:
         orm_mode = True
 
+class EventOccurrence(Event):
+    """Evento simples ou ocorrência de uma série (``original_start`` identifica a ocorrência)"""
+    original_start: Optional[datetime] = None
+
+class FreeSlot(BaseModel):
+    """Janela livre na agenda"""
+    start: datetime
+    end: datetime
+
 class PomodoroSessionBase(BaseModel):
     project_id: Optional[int] = None
     work_duration: int = Field(..., description="Duração do trabalho em minutos")
@@ -79,6 +152,52 @@ class PomodoroSessionResponse(PomodoroSessionBase):
     total_work_time: int = 0
     is_completed: bool = False
 
+    class Config:
+        orm_mode = True
+
+class PomodoroSessionImport(BaseModel):
+    """Sessão concluída registrada offline pelo cliente"""
+    client_uuid: UUID = Field(..., description="Identificador gerado pelo cliente (idempotência)")
+    project_id: Optional[int] = None
+    start_time: datetime
+    end_time: Optional[datetime] = None
+    work_duration: int = Field(25, gt=0, description="Duração do trabalho em minutos")
+    break_duration: int = Field(5, ge=0, description="Duração do intervalo em minutos")
+    mode: str = "work"
+    total_time: int = Field(..., ge=0, description="Tempo trabalhado em minutos")
+
+    @validator("end_time")
+    def end_after_start(cls, end_time, values):
+        if end_time and "start_time" in values and end_time < values["start_time"]:
+            raise ValueError("end_time deve ser posterior a start_time")
+        return end_time
+
+class PomodoroSessionBulkCreate(BaseModel):
+    sessions: List[PomodoroSessionImport] = Field(..., max_items=10000)
+
+class PomodoroSessionBulkResult(BaseModel):
+    received: int
+    inserted: int
+    duplicates: int
+    unlocked_achievements: List[str] = []
+
+class ExportRequest(BaseModel):
+    format: str = Field(default="parquet", description="parquet, arrow ou csv (sem pyarrow: csv)")
+    tables: Optional[List[str]] = Field(default=None, description="pomodoro_sessions, projects, tasks (padrão: todas)")
+
+class ExportJobResponse(BaseModel):
+    id: str
+    format: str
+    tables: List[str]
+    status: str
+    rows_total: int = 0
+    rows_written: int = 0
+    progress: float = 0.0
+    files: Dict[str, str] = {}
+    error: Optional[str] = None
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+
 class ProjectBase(BaseModel):
     title: str
     description: Optional[str] = None
@@ -94,6 +213,14 @@ class ProjectResponse(ProjectBase):
     start_date: datetime
     end_date: Optional[datetime] = None
 
+    class Config:
+        orm_mode = True
+
+# Tamanho das séries de StatisticsBase (dias, semanas e meses com atividade)
+DAILY_LIMIT = 30
+WEEKLY_LIMIT = 12
+MONTHLY_LIMIT = 12
+
 class StatisticsBase(BaseModel):
     total_work_time: int = 0
     total_pomodoro_sessions: int = 0
@@ -102,6 +229,16 @@ class StatisticsBase(BaseModel):
     weekly_productivity: List[Dict] = []
     monthly_productivity: List[Dict] = []
 
+class DashboardResponse(BaseModel):
+    total_projects: int = 0
+    total_pomodoro_sessions: int = 0
+    total_work_time_minutes: int = 0
+    total_achievements: int = 0
+    today_work_time_minutes: int = 0
+    today_sessions: int = 0
+    current_streak: int = 0
+    longest_streak: int = 0
+
 class AchievementBase(BaseModel):
     title: str
     description: str
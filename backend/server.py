@@ -0,0 +1,199 @@
+"""Iniciar o servidor do backend.
+
+Uso (a partir da raiz do projeto):
+    python -m backend.server                 # produção
+    python -m backend.server --workers 4
+    python -m backend.server --dev           # desenvolvimento: um processo com --reload
+
+O padrão é um worker por núcleo de CPU quando o cache de respostas, o
+registro de sessões e as atualizações em tempo real usam Redis; com algum
+backend ``memory`` o padrão é 1 e vários workers são recusados (o estado não
+seria compartilhado), salvo com ``--allow-per-process-state``.
+
+Em produção as migrações são aplicadas uma única vez, antes de criar os
+workers. Com gunicorn instalado (Linux/macOS) a aplicação é pré-carregada no
+processo mestre e ``kill -HUP <pid do mestre>`` reinicia os workers um a um;
+sem gunicorn (ex.: Windows) os workers são processos do próprio uvicorn.
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(BACKEND_DIR)
+APP = "backend.main:app"
+
+# Estado que fica em cada processo com o backend padrão ``memory``
+PER_PROCESS_BACKENDS = ("RESPONSE_CACHE_BACKEND", "ACTIVE_SESSIONS_BACKEND", "LIVE_UPDATES_BACKEND")
+
+def per_process_backends():
+    """Variáveis cujos backends ``memory`` não são compartilhados entre workers"""
+    return [name for name in PER_PROCESS_BACKENDS if os.getenv(name, "memory") != "redis"]
+
+def default_workers() -> int:
+    """WEB_CONCURRENCY, um worker por núcleo de CPU, ou 1 com backends em memória"""
+    value = os.getenv("WEB_CONCURRENCY")
+    if value:
+        return max(1, int(value))
+    if per_process_backends():
+        return 1
+    return os.cpu_count() or 1
+
+def check_workers(workers: int, allow_per_process_state: bool = False):
+    """Recusar vários workers com backends em memória (dados desatualizados e mensagens perdidas)"""
+    backends = per_process_backends()
+    if workers <= 1 or not backends:
+        return
+    message = (
+        f"{workers} workers com {', '.join(f'{name}=memory' for name in backends)}: cada worker "
+        "teria o seu próprio cache, registro de sessões e fan-out, servindo estatísticas "
+        "desatualizadas e perdendo atualizações em tempo real. Configure os backends redis"
+    )
+    if not allow_per_process_state:
+        print(f"❌ {message} (ou use --allow-per-process-state).", file=sys.stderr)
+        sys.exit(2)
+    print(f"⚠️  {message}.", file=sys.stderr)
+
+def migrations_pending() -> bool:
+    """Se o banco ainda não está na revisão head (verificação sem subprocesso)"""
+    from alembic.config import Config
+    from alembic.runtime.migration import MigrationContext
+    from alembic.script import ScriptDirectory
+    from backend.database import create_engine_from_env
+
+    config = Config(os.path.join(BACKEND_DIR, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(BACKEND_DIR, "migrations"))
+    heads = set(ScriptDirectory.from_config(config).get_heads())
+
+    engine = create_engine_from_env(os.getenv("DATABASE_URL"))
+    try:
+        with engine.connect() as connection:
+            current = set(MigrationContext.configure(connection).get_current_heads())
+    finally:
+        engine.dispose()
+    return current != heads
+
+def run_migrations():
+    """Aplicar as migrações do banco de dados (uma única vez, antes dos workers)"""
+    if not migrations_pending():
+        print("✅ Banco de dados já está atualizado")
+        return
+    print("🔄 Aplicando migrações do banco de dados...")
+    result = subprocess.run([sys.executable, "-m", "alembic", "upgrade", "head"], cwd=BACKEND_DIR)
+    if result.returncode != 0:
+        print("❌ Erro ao aplicar migrações")
+        sys.exit(result.returncode)
+    print("✅ Migrações aplicadas com sucesso!")
+
+def run_dev(args):
+    """Um único processo com recarga automática do código"""
+    import uvicorn
+
+    print(f"🚀 Iniciando servidor de desenvolvimento em {args.host}:{args.port} (--reload)...")
+    uvicorn.run(
+        APP,
+        host=args.host,
+        port=args.port,
+        reload=True,
+        reload_dirs=[BACKEND_DIR],
+        app_dir=PROJECT_ROOT
+    )
+
+def _gunicorn_available() -> bool:
+    if sys.platform == "win32":
+        return False
+    try:
+        import gunicorn  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+def _post_fork(server, worker):
+    """Descartar as conexões herdadas do mestre (a app foi pré-carregada)"""
+    from backend.database import async_engine, engine
+
+    engine.dispose(close=False)
+    async_engine.sync_engine.dispose(close=False)
+
+def run_gunicorn(args):
+    """Mestre gunicorn com workers uvicorn (uvloop/httptools quando instalados)"""
+    from gunicorn.app.base import BaseApplication
+
+    class ProductionApplication(BaseApplication):
+        def load_config(self):
+            self.cfg.set("bind", f"{args.host}:{args.port}")
+            self.cfg.set("workers", args.workers)
+            self.cfg.set("worker_class", "uvicorn.workers.UvicornWorker")
+            self.cfg.set("preload_app", True)
+            self.cfg.set("graceful_timeout", args.graceful_timeout)
+            self.cfg.set("timeout", args.timeout)
+            self.cfg.set("keepalive", args.keepalive)
+            self.cfg.set("max_requests", args.max_requests)
+            self.cfg.set("max_requests_jitter", args.max_requests // 10)
+            self.cfg.set("post_fork", _post_fork)
+
+        def load(self):
+            from backend.main import app
+            return app
+
+    ProductionApplication().run()
+
+def run_uvicorn_workers(args):
+    """Workers do próprio uvicorn (sem pré-carregamento nem reinício gradual)"""
+    import uvicorn
+
+    uvicorn.run(
+        APP,
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        loop="auto",
+        http="auto",
+        timeout_keep_alive=args.keepalive,
+        limit_max_requests=args.max_requests or None,
+        app_dir=PROJECT_ROOT
+    )
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Servidor do Productivity App")
+    parser.add_argument("--dev", action="store_true", help="Um único processo com --reload (desenvolvimento)")
+    parser.add_argument("--host", default=os.getenv("HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "8000")))
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Número de workers (padrão: WEB_CONCURRENCY, núcleos de CPU ou 1 com backends em memória)")
+    parser.add_argument("--graceful-timeout", type=int, default=int(os.getenv("GRACEFUL_TIMEOUT", "30")),
+                        help="Segundos para concluir as requisições em andamento ao reiniciar/encerrar")
+    parser.add_argument("--timeout", type=int, default=int(os.getenv("WORKER_TIMEOUT", "60")),
+                        help="Workers sem resposta por mais tempo são reiniciados")
+    parser.add_argument("--keepalive", type=int, default=int(os.getenv("KEEPALIVE", "5")))
+    parser.add_argument("--max-requests", type=int, default=int(os.getenv("MAX_REQUESTS", "0")),
+                        help="Reciclar cada worker após N requisições (0 = nunca)")
+    parser.add_argument("--skip-migrations", action="store_true", help="Não aplicar as migrações antes de iniciar")
+    parser.add_argument("--allow-per-process-state", action="store_true",
+                        help="Iniciar vários workers mesmo com backends em memória (apenas um aviso)")
+    args = parser.parse_args(argv)
+    args.workers = args.workers or default_workers()
+    if not args.dev:
+        check_workers(args.workers, args.allow_per_process_state)
+    # Os workers dimensionam os seus pools e avisos a partir desse valor
+    os.environ["WEB_CONCURRENCY"] = str(1 if args.dev else args.workers)
+
+    # Caminhos relativos (ex.: sqlite:///./productivity.db) relativos ao backend
+    os.chdir(BACKEND_DIR)
+    os.environ.setdefault("DATABASE_URL", "sqlite:///./productivity.db")
+
+    if not args.skip_migrations:
+        run_migrations()
+
+    if args.dev:
+        run_dev(args)
+    elif _gunicorn_available():
+        print(f"🚀 Iniciando {args.workers} workers (gunicorn) em {args.host}:{args.port}...")
+        run_gunicorn(args)
+    else:
+        print(f"🚀 Iniciando {args.workers} workers (uvicorn) em {args.host}:{args.port}...")
+        run_uvicorn_workers(args)
+
+if __name__ == "__main__":
+    main()
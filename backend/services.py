@@ -1,172 +1,527 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import func, extract
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, make_transient_to_detached
+from sqlalchemy import case, func, insert, select, update, delete
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from collections import defaultdict
 from datetime import datetime, timedelta
-from .models import PomodoroSession, Project, Achievement, User
-from .schemas import StatisticsBase, AchievementResponse
+from .models import (
+    PomodoroSession, Project, Achievement, UserProgress,
+    UserDailyStats, UserWeeklyStats, UserMonthlyStats, UserProjectStats
+)
+from .schemas import (
+    StatisticsBase, AchievementResponse, DashboardResponse, PomodoroSessionBulkResult, PomodoroSessionResponse,
+    DAILY_LIMIT, WEEKLY_LIMIT, MONTHLY_LIMIT
+)
+from .active_sessions import ACTIVE_STATUSES, active_sessions
+from .cache import response_cache
+from .live_updates import ACHIEVEMENT, SESSION, STATISTICS, notify
+from .pagination import DEFAULT_PAGE_SIZE, keyset_page, keyset_query
+
+ROLLUP_MODELS = (UserDailyStats, UserWeeklyStats, UserMonthlyStats, UserProjectStats)
+
+def session_message(session):
+    """Estado da sessão enviado aos clientes conectados"""
+    return PomodoroSessionResponse.from_orm(session).dict()
+
+def statistics_message(daily_totals):
+    """Delta das estatísticas a partir de {dia: [tempo, sessões]}"""
+    return {
+        'total_work_time': sum(work_time for work_time, _ in daily_totals.values()),
+        'total_sessions': sum(sessions for _, sessions in daily_totals.values()),
+        'daily': [
+            {'date': str(day), 'total_time': work_time, 'total_sessions': sessions}
+            for day, (work_time, sessions) in sorted(daily_totals.items())
+        ]
+    }
+
+# Tamanho dos lotes de parâmetros em consultas IN (limite de variáveis do SQLite)
+IN_CHUNK_SIZE = 900
+
+def dialect_insert(db: Session, model):
+    """INSERT com suporte a ON CONFLICT quando o dialeto oferece (SQLite/PostgreSQL)"""
+    dialect = db.get_bind().dialect.name
+    if dialect == 'sqlite':
+        return sqlite_insert(model)
+    if dialect == 'postgresql':
+        return pg_insert(model)
+    return None
+
+def longest_streaks(days):
+    """Sequência atual e maior sequência de dias consecutivos (dias ordenados)"""
+    current = longest = 0
+    previous = None
+    for day in days:
+        current = current + 1 if previous and day - previous == timedelta(days=1) else 1
+        longest = max(longest, current)
+        previous = day
+    return current, longest
+
+class RollupService:
+    """Manutenção incremental das tabelas de rollup de produtividade"""
+
+    @staticmethod
+    def bucket_keys(user_id: int, project_id: int, start_time: datetime):
+        """Chaves de cada rollup afetado por uma sessão"""
+        iso_year, iso_week, _ = start_time.isocalendar()
+        keys = [
+            (UserDailyStats, {'user_id': user_id, 'day': start_time.date()}),
+            (UserWeeklyStats, {'user_id': user_id, 'iso_year': iso_year, 'iso_week': iso_week}),
+            (UserMonthlyStats, {'user_id': user_id, 'year': start_time.year, 'month': start_time.month}),
+        ]
+        if project_id:
+            keys.append((UserProjectStats, {'user_id': user_id, 'project_id': project_id}))
+        return keys
+
+    @staticmethod
+    def increment(db: Session, model, keys: dict, total_work_time: int, total_sessions: int = 1):
+        """Somar valores a uma linha de rollup, criando-a se necessário (upsert atômico)"""
+        stmt = dialect_insert(db, model)
+
+        if stmt is not None:
+            stmt = stmt.values(
+                **keys,
+                total_work_time=total_work_time,
+                total_sessions=total_sessions
+            )
+            stmt = stmt.on_conflict_do_update(
+                index_elements=list(keys),
+                set_={
+                    'total_work_time': model.total_work_time + stmt.excluded.total_work_time,
+                    'total_sessions': model.total_sessions + stmt.excluded.total_sessions
+                }
+            )
+            db.execute(stmt)
+            return
+
+        # Demais dialetos: UPDATE e, se nenhuma linha existir, INSERT
+        result = db.execute(
+            update(model)
+            .where(*[getattr(model, column) == value for column, value in keys.items()])
+            .values(
+                total_work_time=model.total_work_time + total_work_time,
+                total_sessions=model.total_sessions + total_sessions
+            )
+        )
+        if result.rowcount == 0:
+            db.execute(insert(model).values(
+                **keys,
+                total_work_time=total_work_time,
+                total_sessions=total_sessions
+            ))
+
+    @classmethod
+    def record_session(cls, db: Session, user_id: int, project_id: int, start_time: datetime, total_work_time: int):
+        """Registrar sessão concluída nos rollups (mesma transação do chamador)"""
+        for model, keys in cls.bucket_keys(user_id, project_id, start_time):
+            cls.increment(db, model, keys, total_work_time)
+        notify(db, user_id, STATISTICS, statistics_message({start_time.date(): [total_work_time, 1]}))
+
+    @classmethod
+    def rebuild(cls, db: Session, user_id: int = None, batch_size: int = 10000):
+        """Reconstruir os rollups e o progresso a partir das sessões concluídas"""
+        for model in ROLLUP_MODELS + (UserProgress,):
+            query = delete(model)
+            if user_id is not None:
+                query = query.where(model.user_id == user_id)
+            db.execute(query)
+
+        query = db.query(
+            PomodoroSession.user_id,
+            PomodoroSession.project_id,
+            PomodoroSession.start_time,
+            PomodoroSession.total_work_time
+        ).filter(PomodoroSession.is_completed == True)
+        if user_id is not None:
+            query = query.filter(PomodoroSession.user_id == user_id)
+
+        # Agregar em memória por chave de rollup (o volume é proporcional
+        # ao número de buckets, não ao número de sessões)
+        buckets = defaultdict(lambda: [0, 0])
+        total_rows = 0
+        for row in query.yield_per(batch_size):
+            total_rows += 1
+            for model, keys in cls.bucket_keys(row.user_id, row.project_id, row.start_time):
+                bucket = buckets[(model, tuple(keys.items()))]
+                bucket[0] += row.total_work_time or 0
+                bucket[1] += 1
+
+        rows_by_model = defaultdict(list)
+        progress_by_user = {}
+        for (model, keys), (work_time, sessions) in buckets.items():
+            rows_by_model[model].append(dict(keys, total_work_time=work_time, total_sessions=sessions))
+
+        # Progresso por usuário derivado dos rollups diários
+        for row in sorted(rows_by_model[UserDailyStats], key=lambda row: (row['user_id'], row['day'])):
+            progress = progress_by_user.setdefault(row['user_id'], {'user_id': row['user_id'], 'days': []})
+            progress['days'].append(row['day'])
+        for progress in progress_by_user.values():
+            days = progress.pop('days')
+            progress['current_streak'], progress['longest_streak'] = longest_streaks(days)
+            progress['last_session_day'] = days[-1]
+        for row in rows_by_model[UserMonthlyStats]:
+            progress = progress_by_user[row['user_id']]
+            progress['total_sessions'] = progress.get('total_sessions', 0) + row['total_sessions']
+            progress['total_work_time'] = progress.get('total_work_time', 0) + row['total_work_time']
+        if progress_by_user:
+            rows_by_model[UserProgress] = list(progress_by_user.values())
+
+        for model, rows in rows_by_model.items():
+            if rows:
+                db.execute(insert(model), rows)
+
+        db.commit()
+        if user_id is not None:
+            response_cache.invalidate_user(user_id)
+        else:
+            response_cache.invalidate_all()
+        return total_rows
 
 class StatisticsService:
     @staticmethod
-    def calculate_productivity(db: Session, user_id: int):
-        """Calcular estatísticas de produtividade"""
-        # Total de tempo trabalhado
-        total_work_time = db.query(func.sum(PomodoroSession.total_work_time)).filter(
-            PomodoroSession.user_id == user_id
-        ).scalar() or 0
-
-        # Total de sessões de Pomodoro
-        total_sessions = db.query(func.count(PomodoroSession.id)).filter(
-            PomodoroSession.user_id == user_id
-        ).scalar() or 0
+    def calculate_productivity(db: Session, user_id: int, source: str = 'rollups'):
+        """Calcular estatísticas de produtividade a partir dos rollups
+
+        Com ``source='sessions'`` as estatísticas são recalculadas diretamente
+        das sessões em uma única leitura (útil para auditar os rollups).
+        """
+        if source == 'sessions':
+            # Carregado apenas quando usado (auditoria dos rollups)
+            from .statistics_engine import StatisticsEngine
+            return StatisticsEngine.calculate(db, user_id)
+
+        # Totais gerais (no máximo uma linha por mês de histórico)
+        totals = db.query(
+            func.sum(UserMonthlyStats.total_work_time),
+            func.sum(UserMonthlyStats.total_sessions)
+        ).filter(UserMonthlyStats.user_id == user_id).one()
 
         # Projeto mais produtivo
         most_productive_project = db.query(
-            Project.id, 
-            Project.title, 
-            func.sum(PomodoroSession.total_work_time).label('total_time')
-        ).join(PomodoroSession, Project.id == PomodoroSession.project_id)\
-         .filter(PomodoroSession.user_id == user_id)\
-         .group_by(Project.id, Project.title)\
-         .order_by(func.sum(PomodoroSession.total_work_time).desc())\
+            Project.id,
+            Project.title,
+            UserProjectStats.total_work_time
+        ).join(UserProjectStats, Project.id == UserProjectStats.project_id)\
+         .filter(UserProjectStats.user_id == user_id)\
+         .order_by(UserProjectStats.total_work_time.desc())\
          .first()
 
-        # Produtividade diária
-        daily_productivity = db.query(
-            func.date(PomodoroSession.start_time).label('date'),
-            func.sum(PomodoroSession.total_work_time).label('total_time'),
-            func.count(PomodoroSession.id).label('total_sessions')
-        ).filter(PomodoroSession.user_id == user_id)\
-         .group_by(func.date(PomodoroSession.start_time))\
-         .order_by('date')\
-         .limit(30)\
-         .all()
-
-        # Produtividade semanal
-        weekly_productivity = db.query(
-            extract('year', PomodoroSession.start_time).label('year'),
-            extract('week', PomodoroSession.start_time).label('week'),
-            func.sum(PomodoroSession.total_work_time).label('total_time'),
-            func.count(PomodoroSession.id).label('total_sessions')
-        ).filter(PomodoroSession.user_id == user_id)\
-         .group_by('year', 'week')\
-         .order_by('year', 'week')\
-         .limit(12)\
-         .all()
-
-        # Produtividade mensal
-        monthly_productivity = db.query(
-            extract('year', PomodoroSession.start_time).label('year'),
-            extract('month', PomodoroSession.start_time).label('month'),
-            func.sum(PomodoroSession.total_work_time).label('total_time'),
-            func.count(PomodoroSession.id).label('total_sessions')
-        ).filter(PomodoroSession.user_id == user_id)\
-         .group_by('year', 'month')\
-         .order_by('year', 'month')\
-         .limit(12)\
-         .all()
+        # Produtividade diária (últimos 30 dias com atividade)
+        daily_productivity = db.query(UserDailyStats)\
+            .filter(UserDailyStats.user_id == user_id)\
+            .order_by(UserDailyStats.day.desc())\
+            .limit(DAILY_LIMIT)\
+            .all()
+
+        # Produtividade semanal (últimas 12 semanas ISO com atividade)
+        weekly_productivity = db.query(UserWeeklyStats)\
+            .filter(UserWeeklyStats.user_id == user_id)\
+            .order_by(UserWeeklyStats.iso_year.desc(), UserWeeklyStats.iso_week.desc())\
+            .limit(WEEKLY_LIMIT)\
+            .all()
+
+        # Produtividade mensal (últimos 12 meses com atividade)
+        monthly_productivity = db.query(UserMonthlyStats)\
+            .filter(UserMonthlyStats.user_id == user_id)\
+            .order_by(UserMonthlyStats.year.desc(), UserMonthlyStats.month.desc())\
+            .limit(MONTHLY_LIMIT)\
+            .all()
 
         return StatisticsBase(
-            total_work_time=total_work_time,
-            total_pomodoro_sessions=total_sessions,
+            total_work_time=totals[0] or 0,
+            total_pomodoro_sessions=totals[1] or 0,
             most_productive_project={
                 'id': most_productive_project[0],
                 'title': most_productive_project[1],
                 'total_time': most_productive_project[2]
             } if most_productive_project else None,
             daily_productivity=[
-                {'date': str(row.date), 'total_time': row.total_time, 'total_sessions': row.total_sessions}
-                for row in daily_productivity
+                {'date': str(row.day), 'total_time': row.total_work_time, 'total_sessions': row.total_sessions}
+                for row in reversed(daily_productivity)
             ],
             weekly_productivity=[
-                {'year': row.year, 'week': row.week, 'total_time': row.total_time, 'total_sessions': row.total_sessions}
-                for row in weekly_productivity
+                {'year': row.iso_year, 'week': row.iso_week, 'total_time': row.total_work_time, 'total_sessions': row.total_sessions}
+                for row in reversed(weekly_productivity)
             ],
             monthly_productivity=[
-                {'year': row.year, 'month': row.month, 'total_time': row.total_time, 'total_sessions': row.total_sessions}
-                for row in monthly_productivity
+                {'year': row.year, 'month': row.month, 'total_time': row.total_work_time, 'total_sessions': row.total_sessions}
+                for row in reversed(monthly_productivity)
             ]
         )
 
 class AchievementService:
     @staticmethod
-    def check_pomodoro_achievements(db: Session, user_id: int):
-        """Verificar e desbloquear conquistas de Pomodoro"""
-        user = db.query(User).filter(User.id == user_id).first()
-        if not user:
-            return []
-
-        # Definir conquistas predefinidas
-        achievement_rules = [
-            {
-                'title': 'Iniciante do Pomodoro',
-                'description': 'Complete 5 sessões de Pomodoro',
-                'achievement_type': 'productivity',
-                'total_sessions_required': 5
-            },
-            {
-                'title': 'Produtividade em Progresso',
-                'description': 'Complete 25 sessões de Pomodoro',
-                'achievement_type': 'productivity',
-                'total_sessions_required': 25
-            },
+    def _unlock(db: Session, user_id: int, rules, total_sessions: int, total_work_time: int):
+        """Desbloquear as regras informadas (uma única vez por usuário)"""
+        now = datetime.utcnow()
+        for rule in rules:
+            notify(db, user_id, ACHIEVEMENT, {
+                'title': rule.title,
+                'description': rule.description,
+                'achievement_type': rule.achievement_type,
+                'achieved_at': now
+            })
+        rows = [
             {
-                'title': 'Mestre da Produtividade',
-                'description': 'Complete 100 sessões de Pomodoro',
-                'achievement_type': 'productivity',
-                'total_sessions_required': 100
-            },
-            {
-                'title': 'Tempo de Foco',
-                'description': 'Acumule 500 minutos de trabalho',
-                'achievement_type': 'focus',
-                'total_work_time_required': 500
-            }
+                'user_id': user_id,
+                'title': rule.title,
+                'description': rule.description,
+                'achievement_type': rule.achievement_type,
+                'total_pomodoro_sessions': total_sessions,
+                'total_work_time': total_work_time,
+                'is_unlocked': True,
+                'achieved_at': now
+            } for rule in rules
         ]
 
-        unlocked_achievements = []
+        stmt = dialect_insert(db, Achievement)
+        if stmt is not None:
+            # Conquistas já existentes (ex.: criadas bloqueadas pelo /setup) só
+            # são atualizadas se ainda não estiverem desbloqueadas
+            stmt = stmt.on_conflict_do_update(
+                index_elements=['user_id', 'title'],
+                set_={'is_unlocked': True, 'achieved_at': now},
+                where=Achievement.is_unlocked == False
+            )
+            db.execute(stmt, rows)
+            return
+
+        existing = {
+            achievement.title: achievement
+            for achievement in db.query(Achievement).filter(
+                Achievement.user_id == user_id,
+                Achievement.title.in_([row['title'] for row in rows])
+            )
+        }
+        for row in rows:
+            achievement = existing.get(row['title'])
+            if achievement is None:
+                db.add(Achievement(**row))
+            elif not achievement.is_unlocked:
+                achievement.is_unlocked = True
+                achievement.achieved_at = now
+
+    @staticmethod
+    def _to_response(achievement):
+        return AchievementResponse(
+            id=achievement.id,
+            user_id=achievement.user_id,
+            title=achievement.title,
+            description=achievement.description,
+            achievement_type=achievement.achievement_type,
+            achieved_at=achievement.achieved_at,
+            is_unlocked=True
+        )
 
-        # Calcular total de sessões e tempo
-        total_sessions = db.query(func.count(PomodoroSession.id)).filter(
-            PomodoroSession.user_id == user_id
-        ).scalar() or 0
+    @classmethod
+    def record_session(cls, db: Session, user_id: int, total_work_time: int, day, project_id: int = None):
+        """Atualizar o progresso com uma sessão concluída e desbloquear as conquistas cruzadas"""
+        return cls.record_sessions(
+            db,
+            user_id,
+            days=[day],
+            total_sessions=1,
+            total_work_time=total_work_time,
+            project_work_times={project_id: total_work_time} if project_id else {}
+        )
 
-        total_work_time = db.query(func.sum(PomodoroSession.total_work_time)).filter(
-            PomodoroSession.user_id == user_id
-        ).scalar() or 0
+    @classmethod
+    def record_sessions(cls, db: Session, user_id: int, days, total_sessions: int, total_work_time: int, project_work_times: dict):
+        """Atualizar o progresso com um lote de sessões concluídas
 
-        for rule in achievement_rules:
-            achievement = Achievement(
-                user_id=user_id,
-                title=rule['title'],
-                description=rule['description'],
-                achievement_type=rule['achievement_type']
+        Executado na mesma transação que registra as sessões, depois dos
+        rollups diários; o custo é proporcional ao número de regras e de dias
+        distintos do lote. Só um lote com dias anteriores ao último dia
+        registrado (sessões offline enviadas fora de ordem) relê os dias do
+        usuário para recalcular a sequência.
+        """
+        progress_columns = (UserProgress.total_sessions, UserProgress.total_work_time, UserProgress.longest_streak)
+        before = db.execute(
+            select(*progress_columns, UserProgress.last_session_day).where(UserProgress.user_id == user_id)
+        ).first()
+        if before is None:
+            stmt = dialect_insert(db, UserProgress)
+            if stmt is not None:
+                stmt = stmt.on_conflict_do_nothing(index_elements=['user_id'])
+            else:
+                stmt = insert(UserProgress)
+            db.execute(stmt.values(user_id=user_id))
+
+        days = sorted(set(days))
+        if before is not None and before.last_session_day is not None and days[0] < before.last_session_day:
+            # Dia anterior ao último registrado: pode unir ou criar sequências no meio do
+            # histórico, então recalcular a partir dos rollups diários (já incluem o lote)
+            rollup_days = db.execute(
+                select(UserDailyStats.day).where(UserDailyStats.user_id == user_id).order_by(UserDailyStats.day)
+            ).scalars().all()
+            current_streak, longest_streak = longest_streaks(rollup_days)
+            db.execute(update(UserProgress).where(UserProgress.user_id == user_id).values(
+                total_sessions=UserProgress.total_sessions + total_sessions,
+                total_work_time=UserProgress.total_work_time + total_work_time,
+                current_streak=current_streak,
+                longest_streak=longest_streak,
+                last_session_day=rollup_days[-1]
+            ))
+            days = []
+
+        # Sequência de dias: mesmo dia mantém, dia seguinte soma, lacuna reinicia
+        for index, day in enumerate(days):
+            new_streak = case(
+                (UserProgress.last_session_day >= day, UserProgress.current_streak),
+                (UserProgress.last_session_day == day - timedelta(days=1), UserProgress.current_streak + 1),
+                else_=1
             )
+            values = {
+                'current_streak': new_streak,
+                'longest_streak': case(
+                    (new_streak > UserProgress.longest_streak, new_streak),
+                    else_=UserProgress.longest_streak
+                ),
+                'last_session_day': case(
+                    (UserProgress.last_session_day >= day, UserProgress.last_session_day),
+                    else_=day
+                )
+            }
+            if index == 0:
+                values['total_sessions'] = UserProgress.total_sessions + total_sessions
+                values['total_work_time'] = UserProgress.total_work_time + total_work_time
+            db.execute(update(UserProgress).where(UserProgress.user_id == user_id).values(**values))
 
-            # Verificar condições de desbloqueio
-            if (
-                (rule.get('total_sessions_required') and total_sessions >= rule['total_sessions_required']) or
-                (rule.get('total_work_time_required') and total_work_time >= rule['total_work_time_required'])
-            ):
-                achievement.is_unlocked = True
-                achievement.achieved_at = datetime.utcnow()
-                
-                # Adicionar à lista de conquistas desbloqueadas
-                unlocked_achievements.append(
-                    AchievementResponse(
-                        id=achievement.id,
-                        user_id=achievement.user_id,
-                        title=achievement.title,
-                        description=achievement.description,
-                        achievement_type=achievement.achievement_type,
-                        achieved_at=achievement.achieved_at,
-                        is_unlocked=True
-                    )
+        after = db.execute(select(*progress_columns).where(UserProgress.user_id == user_id)).one()
+        old_sessions, old_work_time, old_streak = before[:3] if before else (0, 0, 0)
+
+        from .achievements import get_rule_catalog
+
+        # Busca binária no catálogo entre o valor anterior e o novo de cada métrica
+        catalog = get_rule_catalog()
+        crossed = catalog.crossed('sessions', old_sessions, after.total_sessions)
+        crossed += catalog.crossed('work_time', old_work_time // 60, after.total_work_time // 60)
+        crossed += catalog.crossed('streak', old_streak, after.longest_streak)
+
+        project_work_times = {project_id: time for project_id, time in project_work_times.items() if project_id}
+        if project_work_times and catalog.has_metric('project_time'):
+            project_totals = db.execute(
+                select(UserProjectStats.project_id, UserProjectStats.total_work_time).where(
+                    UserProjectStats.user_id == user_id,
+                    UserProjectStats.project_id.in_(list(project_work_times))
+                )
+            )
+            for project_id, project_time in project_totals:
+                crossed += catalog.crossed(
+                    'project_time',
+                    (project_time - project_work_times[project_id]) // 60,
+                    project_time // 60
                 )
 
-                # Salvar conquista no banco de dados
-                db.add(achievement)
+        if crossed:
+            # Uma regra de projeto pode ser cruzada por mais de um projeto no mesmo lote
+            crossed = list({rule.title: rule for rule in crossed}.values())
+            cls._unlock(db, user_id, crossed, after.total_sessions, after.total_work_time)
+        return crossed
 
-        db.commit()
-        return unlocked_achievements
+    @classmethod
+    def check_pomodoro_achievements(cls, db: Session, user_id: int):
+        """Verificar e desbloquear conquistas de Pomodoro"""
+        progress = db.execute(
+            select(UserProgress.total_sessions, UserProgress.total_work_time, UserProgress.longest_streak)
+            .where(UserProgress.user_id == user_id)
+        ).first()
+        if not progress:
+            return []
+
+        from .achievements import get_rule_catalog
+
+        catalog = get_rule_catalog()
+        satisfied = (
+            catalog.satisfied('sessions', progress.total_sessions)
+            + catalog.satisfied('work_time', progress.total_work_time // 60)
+            + catalog.satisfied('streak', progress.longest_streak)
+        )
+        if catalog.has_metric('project_time'):
+            best_project_time = db.execute(
+                select(func.max(UserProjectStats.total_work_time)).where(UserProjectStats.user_id == user_id)
+            ).scalar() or 0
+            satisfied += catalog.satisfied('project_time', best_project_time // 60)
+        if not satisfied:
+            return []
+
+        query = db.query(Achievement).filter(
+            Achievement.user_id == user_id,
+            Achievement.title.in_([rule.title for rule in satisfied])
+        ).order_by(Achievement.id)
+        achievements = query.all()
+        unlocked_titles = {achievement.title for achievement in achievements if achievement.is_unlocked}
+
+        # Apenas regras satisfeitas que ainda não foram desbloqueadas (ex.: após backfill)
+        missing = [rule for rule in satisfied if rule.title not in unlocked_titles]
+        if missing:
+            cls._unlock(db, user_id, missing, progress.total_sessions, progress.total_work_time)
+            db.commit()
+            response_cache.invalidate_user(user_id)
+            achievements = query.all()
+
+        return [cls._to_response(achievement) for achievement in achievements]
+
+    @staticmethod
+    def get_unlocked_achievements(db: Session, user_id: int):
+        """Listar as conquistas desbloqueadas do usuário"""
+        achievements = db.query(Achievement).filter(
+            Achievement.user_id == user_id,
+            Achievement.is_unlocked == True
+        ).all()
+
+        return [AchievementService._to_response(achievement) for achievement in achievements]
+
+class DashboardService:
+    @staticmethod
+    def dashboard_query(user_id: int, today):
+        """Totais do dashboard em uma única consulta
+
+        Sessões, tempo e sequências vêm do resumo mantido em ``user_progress``
+        e o dia atual do rollup diário (buscas pela chave primária); projetos e
+        conquistas são contados pelos índices de ``user_id``.
+        """
+        def progress(column):
+            return select(column).where(UserProgress.user_id == user_id).scalar_subquery()
+
+        def today_stats(column):
+            return select(column).where(UserDailyStats.user_id == user_id, UserDailyStats.day == today).scalar_subquery()
+
+        return select(
+            select(func.count(Project.id)).where(Project.user_id == user_id).scalar_subquery().label('total_projects'),
+            progress(UserProgress.total_sessions).label('total_sessions'),
+            progress(UserProgress.total_work_time).label('total_work_time'),
+            select(func.count(Achievement.id))
+                .where(Achievement.user_id == user_id, Achievement.is_unlocked == True)
+                .scalar_subquery().label('total_achievements'),
+            today_stats(UserDailyStats.total_work_time).label('today_work_time'),
+            today_stats(UserDailyStats.total_sessions).label('today_sessions'),
+            progress(UserProgress.current_streak).label('current_streak'),
+            progress(UserProgress.longest_streak).label('longest_streak'),
+            progress(UserProgress.last_session_day).label('last_session_day')
+        )
+
+    @staticmethod
+    def get_dashboard_data(db: Session, user_id: int):
+        """Calcular os totais do dashboard"""
+        today = datetime.utcnow().date()
+        row = db.execute(DashboardService.dashboard_query(user_id, today)).one()
+
+        # A sequência só continua se houve sessão hoje ou ontem
+        current_streak = row.current_streak or 0
+        if row.last_session_day is None or row.last_session_day < today - timedelta(days=1):
+            current_streak = 0
+
+        return DashboardResponse(
+            total_projects=row.total_projects,
+            total_pomodoro_sessions=row.total_sessions or 0,
+            total_work_time_minutes=(row.total_work_time or 0) // 60,  # Converter segundos para minutos
+            total_achievements=row.total_achievements,
+            today_work_time_minutes=(row.today_work_time or 0) // 60,
+            today_sessions=row.today_sessions or 0,
+            current_streak=current_streak,
+            longest_streak=row.longest_streak or 0
+        )
 
 class PomodoroService:
     @staticmethod
@@ -184,58 +539,325 @@ class PomodoroService:
         db.add(session)
         db.commit()
         db.refresh(session)
+        active_sessions.track(session)
+        response_cache.invalidate_user(user_id)
+        notify(db, user_id, SESSION, session_message(session))
         return session
 
     @staticmethod
-    def complete_session(db: Session, session_id: int, mode: str = 'work', total_time: int = 25):
-        """Completar sessão de Pomodoro"""
-        session = db.query(PomodoroSession).filter(PomodoroSession.id == session_id).first()
-        
-        if session:
-            session.end_time = datetime.utcnow()
-            session.status = 'completed'
-            session.mode = mode
-            session.total_work_time = total_time * 60  # Converter para segundos
-            session.is_completed = True
-
-            # Atualizar projeto, se existir
-            if session.project_id:
-                project = db.query(Project).filter(Project.id == session.project_id).first()
-                if project:
-                    project.total_pomodoro_sessions += 1
-                    project.total_work_time += total_time
+    def increment_project(db: Session, project_id: int, total_sessions: int, total_minutes: int):
+        """Somar sessões e minutos ao projeto com um UPDATE atômico (sem ler a linha)"""
+        db.execute(
+            update(Project)
+            .where(Project.id == project_id)
+            .values(
+                total_pomodoro_sessions=Project.total_pomodoro_sessions + total_sessions,
+                total_work_time=Project.total_work_time + total_minutes
+            )
+        )
 
-            db.commit()
-            db.refresh(session)
-            return session
-        
-        return None
+    @classmethod
+    def complete_session(cls, db: Session, session_id: int, mode: str = 'work', total_time: int = 25):
+        """Completar sessão de Pomodoro
+
+        A conclusão é reivindicada com um UPDATE condicional (``is_completed``
+        falso): entre conclusões concorrentes da mesma sessão só uma altera
+        contadores, rollups e conquistas.
+        """
+        row = cls._apply_completion(db, session_id, mode, total_time)
+
+        active_sessions.discard(session_id)
+        if row is None:
+            # Sessão inexistente ou já concluída: nada a contabilizar
+            db.rollback()
+            return db.get(PomodoroSession, session_id)
+
+        db.commit()
+        response_cache.invalidate_user(row.user_id)
+
+        # Montar a instância a partir da linha já lida, sem nova consulta
+        session = PomodoroSession(**row._mapping)
+        make_transient_to_detached(session)
+        return db.merge(session, load=False)
+
+    @classmethod
+    def _apply_completion(cls, db: Session, session_id: int, mode: str, total_time: int, end_time: datetime = None):
+        """Concluir a sessão sem commit; retorna a linha atualizada ou None se nada mudou"""
+        claim = update(PomodoroSession)\
+            .where(PomodoroSession.id == session_id, PomodoroSession.is_completed == False)\
+            .values(
+                end_time=end_time or datetime.utcnow(),
+                status='completed',
+                mode=mode,
+                total_work_time=total_time * 60,  # Converter para segundos
+                is_completed=True
+            )\
+            .execution_options(synchronize_session=False)
+        columns = PomodoroSession.__table__.c
+
+        if db.get_bind().dialect.full_returning:
+            # PostgreSQL: a própria atualização devolve a sessão
+            row = db.execute(claim.returning(*columns)).first()
+        else:
+            row = None
+            if db.execute(claim).rowcount:
+                row = db.execute(select(*columns).where(PomodoroSession.id == session_id)).first()
+
+        if row is None:
+            return None
+
+        # Contadores, rollups e conquistas na mesma transação
+        notify(db, row.user_id, SESSION, session_message(row))
+        if row.project_id:
+            cls.increment_project(db, row.project_id, 1, total_time)
+        RollupService.record_session(
+            db,
+            user_id=row.user_id,
+            project_id=row.project_id,
+            start_time=row.start_time,
+            total_work_time=row.total_work_time
+        )
+        AchievementService.record_session(
+            db,
+            user_id=row.user_id,
+            total_work_time=row.total_work_time,
+            day=row.start_time.date(),
+            project_id=row.project_id
+        )
+        return row
 
     @staticmethod
-    def pause_session(db: Session, session_id: int):
+    def _transition(db: Session, session_id: int, **values):
+        """Aplicar uma transição com um UPDATE direto, sem ler a sessão antes
+
+        A resposta é montada a partir do registro de sessões ativas; só em
+        caso de falta a sessão é lida do banco.
+        """
+        result = db.execute(
+            update(PomodoroSession)
+            .where(PomodoroSession.id == session_id)
+            .values(**values)
+            .execution_options(synchronize_session=False)
+        )
+        if not result.rowcount:
+            db.rollback()
+            active_sessions.discard(session_id)
+            return None
+        db.commit()
+
+        record = active_sessions.get(session_id)
+        if record is None:
+            session = db.get(PomodoroSession, session_id)
+            active_sessions.track(session)
+        else:
+            active_sessions.update(session_id, **{name: values[name] for name in ('status', 'mode') if name in values})
+            session = record.to_response(**values)
+        notify(db, session.user_id, SESSION, session_message(session))
+        return session
+
+    @classmethod
+    def pause_session(cls, db: Session, session_id: int):
         """Pausar sessão de Pomodoro"""
-        session = db.query(PomodoroSession).filter(PomodoroSession.id == session_id).first()
-        
-        if session:
-            session.status = 'paused'
-            db.commit()
-            db.refresh(session)
-            return session
-        
-        return None
+        return cls._transition(db, session_id, status='paused')
 
-    @staticmethod
-    def stop_session(db: Session, session_id: int):
+    @classmethod
+    def stop_session(cls, db: Session, session_id: int):
         """Interromper sessão de Pomodoro"""
-        session = db.query(PomodoroSession).filter(PomodoroSession.id == session_id).first()
-        
+        session = cls._transition(
+            db,
+            session_id,
+            end_time=datetime.utcnow(),
+            status='interrupted',
+            is_completed=False
+        )
         if session:
-            session.end_time = datetime.utcnow()
-            session.status = 'interrupted'
-            session.is_completed = False
-            
-            db.commit()
-            db.refresh(session)
-            return session
-        
-        return None
+            response_cache.invalidate_user(session.user_id)
+        return session
+
+    @staticmethod
+    def get_active_sessions(db: Session, user_id: int):
+        """Sessões em andamento ou pausadas do usuário (do registro em memória; banco só na falta)"""
+        records = active_sessions.for_user(user_id)
+        if records is None:
+            sessions = db.query(PomodoroSession).filter(
+                PomodoroSession.user_id == user_id,
+                PomodoroSession.status.in_(ACTIVE_STATUSES)
+            ).all()
+            records = active_sessions.load_user(user_id, sessions)
+        return [record.to_response() for record in records]
+
+    @classmethod
+    def apply_events(cls, db: Session, events):
+        """Aplicar, sem commit, um lote de transições registradas pelo buffer write-behind
+
+        Reaplicar o mesmo lote não duplica nada: inícios são identificados pelo
+        ``client_uuid`` e conclusões são reivindicadas uma única vez. Retorna
+        ``({client_uuid: session_id}, {user_id afetados})``.
+        """
+        starts = [event for event in events if event['type'] == 'start']
+        session_ids = {}
+        for offset in range(0, len(starts), IN_CHUNK_SIZE):
+            chunk = [event['client_uuid'] for event in starts[offset:offset + IN_CHUNK_SIZE]]
+            session_ids.update(db.execute(
+                select(PomodoroSession.client_uuid, PomodoroSession.id)
+                .where(PomodoroSession.client_uuid.in_(chunk))
+            ).all())
+
+        new_sessions = [
+            PomodoroSession(
+                user_id=event['user_id'],
+                project_id=event['project_id'],
+                work_duration=event['work_duration'],
+                break_duration=event['break_duration'],
+                start_time=event['at'],
+                status='running',
+                mode='work',
+                client_uuid=event['client_uuid']
+            )
+            for event in starts if event['client_uuid'] not in session_ids
+        ]
+        if new_sessions:
+            db.add_all(new_sessions)
+            db.flush()
+            session_ids.update((session.client_uuid, session.id) for session in new_sessions)
+            for session in new_sessions:
+                notify(db, session.user_id, SESSION, session_message(session))
+
+        user_ids = {event['user_id'] for event in events}
+        for event in events:
+            if event['type'] == 'pause':
+                db.execute(
+                    update(PomodoroSession)
+                    .where(PomodoroSession.id == event['session_id'])
+                    .values(status='paused')
+                )
+                notify(db, event['user_id'], SESSION, {'id': event['session_id'], 'status': 'paused'})
+            elif event['type'] == 'stop':
+                db.execute(
+                    update(PomodoroSession)
+                    .where(PomodoroSession.id == event['session_id'])
+                    .values(status='interrupted', end_time=event['at'], is_completed=False)
+                )
+                notify(db, event['user_id'], SESSION, {
+                    'id': event['session_id'], 'status': 'interrupted', 'end_time': event['at'], 'is_completed': False
+                })
+            elif event['type'] == 'complete':
+                cls._apply_completion(db, event['session_id'], event['mode'], event['total_time'], end_time=event['at'])
+        return session_ids, user_ids
+
+    @staticmethod
+    def list_sessions(db: Session, user_id: int, cursor: str = None, limit: int = DEFAULT_PAGE_SIZE):
+        """Listar sessões do usuário (mais recentes primeiro) paginadas por (start_time, id)"""
+        sort_columns = (PomodoroSession.start_time, PomodoroSession.id)
+        stmt = keyset_query(
+            select(PomodoroSession).where(PomodoroSession.user_id == user_id),
+            sort_columns, cursor, limit
+        )
+        return keyset_page(db.execute(stmt).scalars(), sort_columns, limit)
+
+    @classmethod
+    def ingest_sessions(cls, db: Session, user_id: int, sessions, _retry: bool = True):
+        """Registrar em lote sessões concluídas offline (idempotente por client_uuid)
+
+        Lança ``ValueError`` se alguma sessão referenciar um projeto que não
+        pertence ao usuário.
+        """
+        # Deduplicar o próprio lote (o primeiro registro de cada UUID vale)
+        by_uuid = {}
+        for item in sessions:
+            by_uuid.setdefault(str(item.client_uuid), item)
+
+        # Validar projetos com uma única consulta
+        project_ids = {item.project_id for item in by_uuid.values() if item.project_id}
+        if project_ids:
+            owned = {
+                row.id for row in db.query(Project.id).filter(
+                    Project.user_id == user_id,
+                    Project.id.in_(project_ids)
+                )
+            }
+            unknown = project_ids - owned
+            if unknown:
+                raise ValueError(f"Projetos inválidos: {sorted(unknown)}")
+
+        # UUIDs já registrados em importações anteriores
+        uuids = list(by_uuid)
+        existing = set()
+        for start in range(0, len(uuids), IN_CHUNK_SIZE):
+            existing.update(
+                row.client_uuid for row in db.query(PomodoroSession.client_uuid).filter(
+                    PomodoroSession.user_id == user_id,
+                    PomodoroSession.client_uuid.in_(uuids[start:start + IN_CHUNK_SIZE])
+                )
+            )
+
+        rows = []
+        buckets = defaultdict(lambda: [0, 0])
+        project_totals = defaultdict(lambda: [0, 0, 0])  # sessões, minutos, segundos
+        for client_uuid, item in by_uuid.items():
+            if client_uuid in existing:
+                continue
+            total_work_time = item.total_time * 60  # Converter para segundos
+            rows.append({
+                'user_id': user_id,
+                'project_id': item.project_id,
+                'client_uuid': client_uuid,
+                'start_time': item.start_time,
+                'end_time': item.end_time or item.start_time + timedelta(minutes=item.total_time),
+                'work_duration': item.work_duration,
+                'break_duration': item.break_duration,
+                'status': 'completed',
+                'mode': item.mode,
+                'total_work_time': total_work_time,
+                'is_completed': True
+            })
+            for model, keys in RollupService.bucket_keys(user_id, item.project_id, item.start_time):
+                bucket = buckets[(model, tuple(keys.items()))]
+                bucket[0] += total_work_time
+                bucket[1] += 1
+            if item.project_id:
+                project_totals[item.project_id][0] += 1
+                project_totals[item.project_id][1] += item.total_time
+                project_totals[item.project_id][2] += total_work_time
+
+        unlocked = []
+        if rows:
+            try:
+                # executemany: uma instrução para todo o lote
+                db.execute(insert(PomodoroSession), rows)
+
+                # Rollups e contadores de projeto: uma atualização por chave, não por sessão
+                for (model, keys), (work_time, total_sessions) in buckets.items():
+                    RollupService.increment(db, model, dict(keys), work_time, total_sessions)
+                for project_id, (total_sessions, total_minutes, _) in project_totals.items():
+                    cls.increment_project(db, project_id, total_sessions, total_minutes)
+                notify(db, user_id, STATISTICS, statistics_message({
+                    dict(keys)['day']: totals for (model, keys), totals in buckets.items() if model is UserDailyStats
+                }))
+
+                unlocked = AchievementService.record_sessions(
+                    db,
+                    user_id,
+                    days=[row['start_time'].date() for row in rows],
+                    total_sessions=len(rows),
+                    total_work_time=sum(row['total_work_time'] for row in rows),
+                    project_work_times={
+                        project_id: totals[2] for project_id, totals in project_totals.items()
+                    }
+                )
+                db.commit()
+            except IntegrityError:
+                # Outra requisição registrou os mesmos UUIDs ao mesmo tempo: refazer uma vez
+                db.rollback()
+                if not _retry:
+                    raise
+                return cls.ingest_sessions(db, user_id, sessions, _retry=False)
+
+            response_cache.invalidate_user(user_id)
+
+        return PomodoroSessionBulkResult(
+            received=len(sessions),
+            inserted=len(rows),
+            duplicates=len(sessions) - len(rows),
+            unlocked_achievements=[rule.title for rule in unlocked]
+        )
@@ -0,0 +1,49 @@
+import logging
+import os
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+class StartupReport:
+    """Tempo gasto em cada etapa da inicialização (importações e eventos de startup)"""
+
+    def __init__(self):
+        self.phases = []
+        self._last_mark = time.perf_counter()
+
+    def mark(self, name: str):
+        """Registrar o tempo decorrido desde a marca anterior como ``name``"""
+        now = time.perf_counter()
+        self.phases.append((name, now - self._last_mark))
+        self._last_mark = now
+
+    @contextmanager
+    def phase(self, name: str):
+        """Registrar a duração do bloco como ``name``"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append((name, time.perf_counter() - started))
+            self._last_mark = time.perf_counter()
+
+    def as_dict(self):
+        return {
+            'phases_ms': {name: round(elapsed * 1000, 1) for name, elapsed in self.phases},
+            'total_ms': round(sum(elapsed for _, elapsed in self.phases) * 1000, 1)
+        }
+
+    def format(self) -> str:
+        report = self.as_dict()
+        lines = [f"  {name:<32} {elapsed:>8.1f} ms" for name, elapsed in report['phases_ms'].items()]
+        return f"Inicialização em {report['total_ms']:.1f} ms:\n" + "\n".join(lines)
+
+    def emit(self):
+        """Exibir o relatório com STARTUP_REPORT=1 (senão apenas no log de DEBUG)"""
+        if os.getenv("STARTUP_REPORT", "").strip().lower() in ("1", "true", "yes", "on"):
+            print(f"⏱️  {self.format()}", flush=True)
+        else:
+            logger.debug(self.format())
+
+startup_report = StartupReport()
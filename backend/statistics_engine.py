@@ -0,0 +1,145 @@
+from collections import defaultdict
+from datetime import date
+
+from sqlalchemy import Date, cast, extract, func, tuple_
+from sqlalchemy.orm import Session
+
+from .models import PomodoroSession, Project
+from .schemas import StatisticsBase, DAILY_LIMIT, WEEKLY_LIMIT, MONTHLY_LIMIT
+
+class ProductivityAggregate:
+    """Acumulador das séries de produtividade de um usuário"""
+
+    def __init__(self):
+        self.total_work_time = 0
+        self.total_sessions = 0
+        self.daily = defaultdict(lambda: [0, 0])
+        self.weekly = defaultdict(lambda: [0, 0])
+        self.monthly = defaultdict(lambda: [0, 0])
+        self.projects = {}
+
+    def add(self, day: date, work_time: int, sessions: int = 1, project_id: int = None, project_title: str = None):
+        """Acumular sessões concluídas de um dia (e projeto)"""
+        work_time = work_time or 0
+        iso_year, iso_week, _ = day.isocalendar()
+
+        self.total_work_time += work_time
+        self.total_sessions += sessions
+        for bucket in (
+            self.daily[day],
+            self.weekly[(iso_year, iso_week)],
+            self.monthly[(day.year, day.month)]
+        ):
+            bucket[0] += work_time
+            bucket[1] += sessions
+
+        if project_id:
+            project = self.projects.setdefault(project_id, [project_title, 0])
+            project[1] += work_time
+
+    def to_statistics(self):
+        """Converter o acumulado no schema de resposta"""
+        most_productive_project = None
+        if self.projects:
+            project_id, (title, total_time) = max(self.projects.items(), key=lambda item: item[1][1])
+            most_productive_project = {'id': project_id, 'title': title, 'total_time': total_time}
+
+        return StatisticsBase(
+            total_work_time=self.total_work_time,
+            total_pomodoro_sessions=self.total_sessions,
+            most_productive_project=most_productive_project,
+            daily_productivity=[
+                {'date': str(day), 'total_time': total_time, 'total_sessions': sessions}
+                for day, (total_time, sessions) in sorted(self.daily.items())[-DAILY_LIMIT:]
+            ],
+            weekly_productivity=[
+                {'year': year, 'week': week, 'total_time': total_time, 'total_sessions': sessions}
+                for (year, week), (total_time, sessions) in sorted(self.weekly.items())[-WEEKLY_LIMIT:]
+            ],
+            monthly_productivity=[
+                {'year': year, 'month': month, 'total_time': total_time, 'total_sessions': sessions}
+                for (year, month), (total_time, sessions) in sorted(self.monthly.items())[-MONTHLY_LIMIT:]
+            ]
+        )
+
+class StatisticsEngine:
+    """Estatísticas calculadas diretamente das sessões em uma única leitura"""
+
+    @classmethod
+    def calculate(cls, db: Session, user_id: int, batch_size: int = 10000):
+        """Calcular estatísticas com uma única consulta sobre as sessões do usuário"""
+        if db.get_bind().dialect.name == 'postgresql':
+            return cls._calculate_grouping_sets(db, user_id)
+        return cls._calculate_streaming(db, user_id, batch_size)
+
+    @staticmethod
+    def _calculate_streaming(db: Session, user_id: int, batch_size: int):
+        """Uma varredura agregada por (dia, projeto), consolidada em Python à medida que as linhas chegam"""
+        day = func.date(PomodoroSession.start_time)
+        rows = db.query(
+            day.label('day'),
+            PomodoroSession.project_id,
+            Project.title,
+            func.sum(PomodoroSession.total_work_time).label('total_time'),
+            func.count(PomodoroSession.id).label('total_sessions')
+        ).outerjoin(Project, Project.id == PomodoroSession.project_id)\
+         .filter(PomodoroSession.user_id == user_id, PomodoroSession.is_completed == True)\
+         .group_by(day, PomodoroSession.project_id, Project.title)\
+         .execution_options(stream_results=True)\
+         .yield_per(batch_size)
+
+        aggregate = ProductivityAggregate()
+        for row in rows:
+            row_day = date.fromisoformat(row.day) if isinstance(row.day, str) else row.day
+            aggregate.add(row_day, row.total_time, row.total_sessions, row.project_id, row.title)
+        return aggregate.to_statistics()
+
+    @staticmethod
+    def _calculate_grouping_sets(db: Session, user_id: int):
+        """Todas as séries em uma consulta GROUPING SETS (PostgreSQL)"""
+        day = cast(PomodoroSession.start_time, Date)
+        iso_year = extract('isoyear', PomodoroSession.start_time)
+        iso_week = extract('week', PomodoroSession.start_time)
+        year = extract('year', PomodoroSession.start_time)
+        month = extract('month', PomodoroSession.start_time)
+
+        rows = db.query(
+            day.label('day'),
+            iso_year.label('iso_year'),
+            iso_week.label('iso_week'),
+            year.label('year'),
+            month.label('month'),
+            PomodoroSession.project_id,
+            Project.title,
+            func.grouping(day).label('g_day'),
+            func.grouping(iso_year, iso_week).label('g_week'),
+            func.grouping(year, month).label('g_month'),
+            func.grouping(PomodoroSession.project_id, Project.title).label('g_project'),
+            func.coalesce(func.sum(PomodoroSession.total_work_time), 0).label('total_time'),
+            func.count(PomodoroSession.id).label('total_sessions')
+        ).outerjoin(Project, Project.id == PomodoroSession.project_id)\
+         .filter(PomodoroSession.user_id == user_id, PomodoroSession.is_completed == True)\
+         .group_by(func.grouping_sets(
+             tuple_(day),
+             tuple_(iso_year, iso_week),
+             tuple_(year, month),
+             tuple_(PomodoroSession.project_id, Project.title),
+             tuple_()
+         )).all()
+
+        aggregate = ProductivityAggregate()
+        for row in rows:
+            total_time, sessions = int(row.total_time), row.total_sessions
+            if not row.g_day:
+                aggregate.daily[row.day] = [total_time, sessions]
+            elif not row.g_week:
+                aggregate.weekly[(int(row.iso_year), int(row.iso_week))] = [total_time, sessions]
+            elif not row.g_month:
+                aggregate.monthly[(int(row.year), int(row.month))] = [total_time, sessions]
+            elif not row.g_project:
+                if row.project_id:
+                    aggregate.projects[row.project_id] = [row.title, total_time]
+            else:
+                aggregate.total_work_time = total_time
+                aggregate.total_sessions = sessions
+        return aggregate.to_statistics()
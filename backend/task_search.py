@@ -0,0 +1,60 @@
+"""Busca textual de tarefas (título e descrição).
+
+No SQLite a busca usa a tabela FTS5 ``tasks_fts`` (ranking BM25, título com
+peso maior); no PostgreSQL, a coluna ``search_vector`` com índice GIN e
+``ts_rank``. Ambas são mantidas por triggers (ver ``TASK_SEARCH_DDL`` em
+``backend/models.py``). Cada termo da consulta é buscado como prefixo e todos
+precisam aparecer na tarefa.
+"""
+import re
+
+from sqlalchemy import and_, column, func, literal, literal_column, or_, select, table
+
+from .models import Task
+
+# Termos considerados por consulta (o restante é ignorado)
+MAX_TERMS = 16
+# Peso do título em relação à descrição no BM25 do SQLite
+TITLE_WEIGHT = 10.0
+
+_tasks_fts = table("tasks_fts", column("rowid"))
+
+def search_terms(text: str):
+    """Palavras da consulta, em minúsculas; lança ``ValueError`` se não houver nenhuma"""
+    terms = re.findall(r"\w+", text.lower())[:MAX_TERMS]
+    if not terms:
+        raise ValueError("A busca precisa de pelo menos uma palavra")
+    return terms
+
+def search_query(dialect: str, user_id: int, text: str, status: str = None,
+                 priority: int = None, project_id: int = None):
+    """SELECT de (Task, score) em ordem de relevância para o dialeto do banco"""
+    terms = search_terms(text)
+
+    if dialect == "sqlite":
+        fts = literal_column("tasks_fts")
+        score = -func.bm25(fts, TITLE_WEIGHT, 1.0)
+        stmt = select(Task, score.label("score"))\
+            .join(_tasks_fts, _tasks_fts.c.rowid == Task.id)\
+            .where(fts.match(" ".join(f'"{term}"*' for term in terms)))
+    elif dialect == "postgresql":
+        vector = literal_column("tasks.search_vector")
+        query = func.to_tsquery("simple", " & ".join(f"{term}:*" for term in terms))
+        score = func.ts_rank(vector, query)
+        stmt = select(Task, score.label("score")).where(vector.op("@@")(query))
+    else:
+        # Outros bancos: sem índice textual nem ranking
+        score = literal(0.0)
+        stmt = select(Task, score.label("score")).where(and_(*(
+            or_(Task.title.ilike(f"%{term}%"), Task.description.ilike(f"%{term}%"))
+            for term in terms
+        )))
+
+    stmt = stmt.where(Task.owner_id == user_id)
+    if status is not None:
+        stmt = stmt.where(Task.status == status)
+    if priority is not None:
+        stmt = stmt.where(Task.priority == priority)
+    if project_id is not None:
+        stmt = stmt.where(Task.project_id == project_id)
+    return stmt.order_by(literal_column("score").desc(), Task.id.desc())
@@ -0,0 +1,91 @@
+import asyncio
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from backend.active_sessions import active_sessions
+from backend.database import Base, create_async_engine_from_env
+from backend.models import User, Project
+from backend.services import PomodoroService
+
+@pytest.fixture(autouse=True)
+def clear_active_sessions():
+    # Cada teste usa um banco novo e os ids se repetem
+    active_sessions.clear()
+    yield
+    active_sessions.clear()
+
+@pytest.fixture
+def engine():
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool
+    )
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    engine.dispose()
+
+@pytest.fixture
+def db(engine):
+    session = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+    yield session
+    session.close()
+
+@pytest.fixture
+def run_async_db():
+    """Executar ``await scenario(db)`` com uma AsyncSession num banco em memória novo
+
+    Os testes seguem síncronos: engine, tabelas e sessão são criados no mesmo
+    event loop do cenário (``asyncio.run``).
+    """
+    async def run(scenario):
+        engine = create_async_engine_from_env("sqlite://")
+        try:
+            async with engine.begin() as connection:
+                await connection.run_sync(Base.metadata.create_all)
+            AsyncSessionLocal = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+            async with AsyncSessionLocal() as db:
+                return await scenario(db)
+        finally:
+            await engine.dispose()
+
+    return lambda scenario: asyncio.run(run(scenario))
+
+@pytest.fixture
+def user(db):
+    user = User(username="rollupuser", email="rollup@example.com")
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+    return user
+
+@pytest.fixture
+def project(db, user):
+    project = Project(title="Projeto", user_id=user.id)
+    db.add(project)
+    db.commit()
+    db.refresh(project)
+    return project
+
+@pytest.fixture
+def started_session(db):
+    """Fábrica de sessões de Pomodoro em andamento (``start_time`` opcional)"""
+    def start(user_id, project_id=None, start_time=None):
+        session = PomodoroService.start_session(db, user_id=user_id, project_id=project_id)
+        if start_time:
+            session.start_time = start_time
+            db.commit()
+        return session
+    return start
+
+@pytest.fixture
+def completed_session(db, started_session):
+    """Fábrica de sessões de Pomodoro concluídas (``start_time`` define o dia dos rollups)"""
+    def complete(user_id, start_time=None, total_time=25, project_id=None):
+        session = started_session(user_id, project_id, start_time)
+        return PomodoroService.complete_session(db, session_id=session.id, total_time=total_time)
+    return complete
@@ -0,0 +1,88 @@
+from datetime import datetime
+
+from sqlalchemy import event
+
+import pytest
+
+from backend.achievements import AchievementRule, RuleCatalog
+from backend.models import Achievement, UserProgress
+from backend.services import AchievementService, RollupService
+
+def test_achievements_unlock_once_on_completion(db, user, completed_session):
+    for _ in range(6):
+        completed_session(user.id)
+
+    titles = [row.title for row in db.query(Achievement).filter_by(user_id=user.id, is_unlocked=True)]
+    assert sorted(titles) == ['Bem-vindo ao Pomodoro', 'Iniciante do Pomodoro']
+
+    # Verificações repetidas não criam novas linhas
+    for _ in range(3):
+        AchievementService.check_pomodoro_achievements(db, user.id)
+    assert db.query(Achievement).filter_by(user_id=user.id).count() == 2
+
+def test_streak_and_project_rules(db, user, project, completed_session):
+    for day in (1, 2, 3):
+        completed_session(user.id, start_time=datetime(2025, 3, day, 9), total_time=400, project_id=project.id)
+
+    titles = {row.title for row in db.query(Achievement).filter_by(user_id=user.id, is_unlocked=True)}
+    assert {'Constância', 'Projeto em Foco', 'Tempo de Foco'} <= titles
+    assert 'Semana Focada' not in titles
+
+def test_work_time_rule_crosses_in_minutes(db, user, completed_session):
+    for _ in range(10):
+        completed_session(user.id, total_time=50)
+
+    achievements = AchievementService.check_pomodoro_achievements(db, user.id)
+    assert 'Tempo de Foco' in {achievement.title for achievement in achievements}
+
+def test_locked_setup_achievement_is_unlocked_in_place(db, user, completed_session):
+    db.add(Achievement(user_id=user.id, title='Bem-vindo ao Pomodoro', description='', achievement_type='onboarding', is_unlocked=False))
+    db.commit()
+
+    completed_session(user.id)
+
+    achievement = db.query(Achievement).filter_by(user_id=user.id).one()
+    assert achievement.is_unlocked
+
+def test_streaks_tracked_incrementally(db, user, completed_session):
+    for day in (1, 2, 2, 3, 5, 6):
+        completed_session(user.id, start_time=datetime(2025, 3, day, 9))
+    completed_session(user.id, start_time=datetime(2025, 2, 20, 9))  # sessão antiga não altera a sequência
+
+    progress = db.query(UserProgress).filter_by(user_id=user.id).one()
+    assert (progress.current_streak, progress.longest_streak, str(progress.last_session_day)) == (2, 3, '2025-03-06')
+
+    db.query(UserProgress).delete()
+    db.commit()
+    RollupService.rebuild(db)
+    rebuilt = db.query(UserProgress).filter_by(user_id=user.id).one()
+    assert (rebuilt.total_sessions, rebuilt.current_streak, rebuilt.longest_streak) == (7, 2, 3)
+
+def test_check_cost_does_not_depend_on_history(engine, db, user, completed_session):
+    user_id = user.id
+    for _ in range(30):
+        completed_session(user_id)
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+    AchievementService.check_pomodoro_achievements(db, user_id)
+
+    assert len(statements) == 3
+    assert not any('FROM pomodoro_sessions' in statement for statement in statements)
+
+def _rule(title, metric, threshold):
+    return AchievementRule(title=title, description='', achievement_type='test', metric=metric, threshold=threshold)
+
+def test_rule_catalog_binary_search():
+    catalog = RuleCatalog(_rule(f"s{threshold}", 'sessions', threshold) for threshold in range(10, 1001, 10))
+
+    assert [rule.threshold for rule in catalog.crossed('sessions', 19, 41)] == [20, 30, 40]
+    assert catalog.crossed('sessions', 40, 40) == []
+    assert catalog.crossed('streak', 0, 100) == []
+    assert len(catalog.satisfied('sessions', 255)) == 25
+
+def test_rule_catalog_rejects_invalid_rules():
+    with pytest.raises(ValueError):
+        _rule('x', 'unknown', 1)
+    with pytest.raises(ValueError):
+        RuleCatalog([_rule('x', 'sessions', 1), _rule('x', 'sessions', 2)])
@@ -0,0 +1,109 @@
+import asyncio
+import time
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.util import greenlet_spawn
+
+from backend.active_sessions import ActiveSession, MemoryActiveSessionStore, RedisActiveSessionStore, active_sessions
+from backend.models import PomodoroSession
+from backend.services import PomodoroService
+
+def _statements(db, run):
+    statements = []
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(db.get_bind(), "before_cursor_execute", listener)
+    try:
+        result = run()
+    finally:
+        event.remove(db.get_bind(), "before_cursor_execute", listener)
+    return result, statements
+
+def test_active_sessions_served_from_memory(db, user, project):
+    user_id = user.id
+    first = PomodoroService.start_session(db, user_id=user_id, project_id=project.id).id
+    second = PomodoroService.start_session(db, user_id=user_id).id
+
+    # Primeira leitura carrega do banco; as seguintes vêm do registro
+    assert [session.id for session in PomodoroService.get_active_sessions(db, user_id)] == [first, second]
+    PomodoroService.pause_session(db, first)
+    active, statements = _statements(db, lambda: PomodoroService.get_active_sessions(db, user_id))
+
+    assert statements == []
+    assert [(session.id, session.status) for session in active] == [(first, 'paused'), (second, 'running')]
+
+def test_transitions_skip_select_and_evict_finished(db, user):
+    user_id = user.id
+    session_id = PomodoroService.start_session(db, user_id=user_id).id
+    PomodoroService.get_active_sessions(db, user_id)
+
+    paused, statements = _statements(db, lambda: PomodoroService.pause_session(db, session_id))
+    assert paused.status == 'paused'
+    assert not any(statement.startswith("SELECT") for statement in statements)
+
+    stopped = PomodoroService.stop_session(db, session_id)
+    assert (stopped.status, stopped.is_completed) == ('interrupted', False)
+    assert active_sessions.get(session_id) is None
+    assert PomodoroService.get_active_sessions(db, user_id) == []
+    assert db.get(PomodoroSession, session_id).status == 'interrupted'
+
+def test_completed_sessions_leave_registry(db, user):
+    session_id = PomodoroService.start_session(db, user_id=user.id).id
+    PomodoroService.complete_session(db, session_id)
+
+    assert active_sessions.get(session_id) is None
+    assert PomodoroService.get_active_sessions(db, user.id) == []
+
+def test_abandoned_sessions_expire(db, user):
+    active_sessions.load_user(user.id, [])
+    active_sessions.track(ActiveSession(
+        id=99, user_id=user.id, project_id=None, status='running', mode='work',
+        start_time=datetime.utcnow() - timedelta(days=2), work_duration=25, break_duration=5
+    ))
+
+    assert active_sessions.for_user(user.id) == []
+    assert active_sessions.get(99) is None
+
+def test_record_is_compact():
+    record = ActiveSession(1, 1, None, 'running', 'work', datetime.utcnow(), 25, 5)
+    assert not hasattr(record, '__dict__')
+    assert ActiveSession.from_dict(record.to_dict()).to_response().status == 'running'
+
+def test_memory_store_expires_and_caps_users(monkeypatch):
+    store = MemoryActiveSessionStore(max_users=2, ttl=30)
+    now = time.monotonic()
+    monkeypatch.setattr("backend.active_sessions.time.monotonic", lambda: now)
+    for user_id in (1, 2):
+        store.load_user(user_id, [ActiveSession(user_id * 10, user_id, None, 'running', 'work', datetime.utcnow(), 25, 5)])
+
+    # Um terceiro usuário tira o menos usado recentemente, com as suas sessões
+    store.for_user(1)
+    store.load_user(3, [])
+    assert store.for_user(2) is None and store.get(20) is None
+    assert [record.id for record in store.for_user(1)] == [10]
+
+    # Após o TTL o usuário volta a ser lido do banco (alterações de outro worker)
+    monkeypatch.setattr("backend.active_sessions.time.monotonic", lambda: now + 30)
+    assert store.for_user(1) is None and store.get(10) is None
+    assert store.for_user(3) is None
+
+def test_redis_store_uses_async_client_on_the_loop_and_expires_keys():
+    fakeredis = pytest.importorskip("fakeredis")
+    server = fakeredis.FakeServer()
+    store = RedisActiveSessionStore("redis://localhost:6379/0", ttl=30, max_age=3600)
+    sync_client = fakeredis.FakeRedis(server=server)
+    store.async_client = fakeredis.FakeAsyncRedis(server=server)
+    store.client = None  # Nenhum comando síncrono no event loop
+    record = ActiveSession(7, 1, None, 'running', 'work', datetime.utcnow(), 25, 5)
+
+    async def scenario():
+        await greenlet_spawn(store.load_user, 1, [record])
+        await greenlet_spawn(store.put, ActiveSession(8, 1, None, 'paused', 'work', datetime.utcnow(), 25, 5))
+        await greenlet_spawn(store.delete, 8)
+        return await greenlet_spawn(store.for_user, 1)
+
+    assert [item.id for item in asyncio.run(scenario())] == [7]
+    assert 0 < sync_client.ttl("productivity:active:loaded:1") <= 30
+    assert 30 < sync_client.ttl("productivity:active:session:7") <= 3600
+    assert 30 < sync_client.ttl("productivity:active:user:1") <= 3600
@@ -0,0 +1,124 @@
+import random
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from backend.agenda import IntervalIndex, agenda_cache, find_conflicts, free_slots
+from backend.auth import get_current_user
+from backend.crud import crud_event
+from backend.database import Base, create_async_engine_from_env, create_engine_from_env, get_async_db
+from backend.models import Event, User
+from backend.routes import router
+from backend.schemas import EventCreate
+
+DAY = datetime(2026, 3, 2)
+
+def _at(hour, minute=0):
+    return DAY + timedelta(hours=hour, minutes=minute)
+
+def test_interval_index_matches_linear_scan():
+    rng = random.Random(7)
+    intervals = []
+    for event_id in range(500):
+        start = DAY + timedelta(minutes=rng.randrange(60 * 24 * 30))
+        intervals.append((start, start + timedelta(minutes=rng.choice((0, 15, 60, 240, 3 * 24 * 60))), event_id))
+    index = IntervalIndex(intervals)
+
+    for _ in range(200):
+        start = DAY + timedelta(minutes=rng.randrange(-600, 60 * 24 * 31))
+        end = start + timedelta(minutes=rng.randrange(1, 5000))
+        expected = sorted(item for item in intervals if item[0] < end and item[1] > start)
+        assert index.overlapping(start, end) == expected
+
+def test_free_slots_fit_pomodoro_blocks():
+    index = IntervalIndex([
+        (_at(9), _at(10), 1),
+        (_at(9, 30), _at(11), 2),  # sobrepõe o anterior
+        (_at(11, 20), _at(12), 3),  # deixa só 20 minutos livres
+        (_at(14), _at(15), 4),
+    ])
+    slots = index.free_slots(_at(8), _at(16), timedelta(minutes=25))
+    assert slots == [(_at(8), _at(9)), (_at(12), _at(14)), (_at(15), _at(16))]
+    assert index.free_slots(_at(8), _at(16), timedelta(minutes=25), limit=1) == [(_at(8), _at(9))]
+
+async def _agenda_cycle(db):
+    user = User(username="agendauser", email="agenda@example.com")
+    db.add(user)
+    await db.commit()
+    db.add_all([
+        Event(title="Antes", start_time=_at(6), end_time=_at(7), owner_id=user.id),
+        Event(title="Começa antes", start_time=_at(8), end_time=_at(10), owner_id=user.id),
+        Event(title="Dentro", start_time=_at(11), end_time=_at(12), owner_id=user.id),
+        Event(title="Atravessa", start_time=_at(-24), end_time=_at(48), owner_id=user.id),
+        Event(title="Termina depois", start_time=_at(16), end_time=_at(20), owner_id=user.id),
+        Event(title="Depois", start_time=_at(18), end_time=_at(19), owner_id=user.id),
+    ])
+    await db.commit()
+
+    in_range = await crud_event.get_user_events(db, user.id, _at(9), _at(17))
+    slots_before = await free_slots(db, user.id, _at(20), _at(22))
+
+    created = await crud_event.create_for_user(db, EventCreate(
+        title="Reunião", start_time=_at(20, 30), end_time=_at(21)
+    ), user.id)
+    conflicts = await find_conflicts(db, user.id, _at(20, 45), _at(21, 15))
+
+    return [event.title for event in in_range], slots_before, created, conflicts
+
+def test_range_query_overlap_and_cache_invalidation(run_async_db):
+    agenda_cache.clear()
+    titles, slots_before, created, conflicts = run_async_db(_agenda_cycle)
+    agenda_cache.clear()
+
+    assert titles == ["Atravessa", "Começa antes", "Dentro", "Termina depois"]
+    # O evento que atravessa a janela ocupa o dia inteiro
+    assert slots_before == []
+    assert [event_id for _, _, event_id in conflicts] == [4, created.id]
+
+def test_aware_timestamps_are_compared_as_utc(tmp_path):
+    url = f"sqlite:///{tmp_path / 'agenda.db'}"
+    sync_engine = create_engine_from_env(url)
+    Base.metadata.create_all(bind=sync_engine)
+    db = sessionmaker(bind=sync_engine)()
+    user = User(username="tzuser", email="tz@example.com")
+    db.add(user)
+    db.commit()
+    db.add(Event(title="Local", start_time=_at(12), end_time=_at(13), owner_id=user.id))
+    db.commit()
+
+    AsyncSessionLocal = sessionmaker(bind=create_async_engine_from_env(url), class_=AsyncSession)
+
+    async def override_db():
+        async with AsyncSessionLocal() as session:
+            yield session
+
+    app = FastAPI()
+    app.include_router(router, prefix="/api")
+    app.dependency_overrides[get_async_db] = override_db
+    app.dependency_overrides[get_current_user] = lambda: SimpleNamespace(id=user.id)
+    client = TestClient(app)
+
+    agenda_cache.clear()
+    # 09:30-10:00 em -03:00 = 12:30-13:00 UTC
+    conflict = client.post("/api/events", json={
+        "title": "Reunião", "start_time": "2026-03-02T09:30:00-03:00", "end_time": "2026-03-02T10:00:00-03:00"
+    })
+    assert conflict.status_code == 409
+    created = client.post("/api/events", json={
+        "title": "Reunião", "start_time": "2026-03-02T13:00:00Z", "end_time": "2026-03-02T13:30:00Z"
+    })
+    assert created.status_code == 201 and created.json()["start_time"] == "2026-03-02T13:00:00"
+
+    slots = client.get("/api/events/free-slots", params={
+        "start": "2026-03-02T11:00:00Z", "end": "2026-03-02T15:00:00Z", "duration": 30
+    })
+    agenda_cache.clear()
+    sync_engine.dispose()
+    assert slots.json() == [
+        {"start": "2026-03-02T11:00:00", "end": "2026-03-02T12:00:00"},
+        {"start": "2026-03-02T13:30:00", "end": "2026-03-02T15:00:00"},
+    ]
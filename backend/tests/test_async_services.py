@@ -0,0 +1,20 @@
+from backend.async_services import AsyncPomodoroService, AsyncStatisticsService
+from backend.models import User
+
+async def _session_cycle(db):
+    user = User(username="asyncuser", email="async@example.com")
+    db.add(user)
+    await db.commit()
+
+    session = await AsyncPomodoroService.start_session(db, user_id=user.id)
+    completed = await AsyncPomodoroService.complete_session(db, session_id=session.id, total_time=25)
+    statistics = await AsyncStatisticsService.calculate_productivity(db, user.id)
+
+    return completed, statistics
+
+def test_async_services_use_async_driver(run_async_db):
+    completed, statistics = run_async_db(_session_cycle)
+
+    assert completed.status == 'completed'
+    assert completed.total_work_time == 1500
+    assert statistics.total_pomodoro_sessions == 1
@@ -0,0 +1,109 @@
+from datetime import timedelta
+
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from backend import auth, passwords
+from backend.auth import create_access_token, get_current_user, token_cache, user_cache
+from backend.database import Base, create_async_engine_from_env, create_engine_from_env, get_async_db
+from backend.models import User
+from backend.routes import router
+
+@pytest.fixture
+def auth_env(tmp_path, monkeypatch):
+    monkeypatch.setattr(passwords, "_hasher", passwords.PasswordHasher(workers=0, rounds=4))
+    url = f"sqlite:///{tmp_path / 'auth.db'}"
+    sync_engine = create_engine_from_env(url)
+    Base.metadata.create_all(bind=sync_engine)
+    async_engine = create_async_engine_from_env(url)
+    AsyncSessionLocal = sessionmaker(bind=async_engine, class_=AsyncSession, expire_on_commit=False)
+
+    async def override_db():
+        async with AsyncSessionLocal() as db:
+            yield db
+
+    app = FastAPI()
+    app.include_router(router, prefix="/api")
+    app.dependency_overrides[get_async_db] = override_db
+
+    @app.get("/me")
+    async def me(current_user=Depends(get_current_user)):
+        return {"id": current_user.id, "username": current_user.username}
+
+    queries = []
+    event.listen(async_engine.sync_engine, "before_cursor_execute",
+                 lambda conn, cursor, statement, *args: queries.append(statement))
+
+    token_cache.clear()
+    user_cache.clear()
+    yield TestClient(app), sessionmaker(bind=sync_engine), queries
+    passwords.shutdown_password_hasher()
+    token_cache.clear()
+    user_cache.clear()
+    sync_engine.dispose()
+
+def test_register_login_and_cached_resolution(auth_env, monkeypatch):
+    client, _, queries = auth_env
+    assert client.post("/api/auth/register", json={
+        "username": "timer", "email": "timer@example.com", "password": "segredo123"
+    }).status_code == 201
+    assert client.post("/api/auth/token", data={"username": "timer", "password": "errada123"}).status_code == 401
+    token = client.post("/api/auth/token", data={"username": "timer@example.com", "password": "segredo123"}).json()["access_token"]
+
+    decodes = []
+    original_decode = auth.jwt.decode
+    monkeypatch.setattr(auth.jwt, "decode", lambda *args, **kwargs: decodes.append(1) or original_decode(*args, **kwargs))
+    headers = {"Authorization": f"Bearer {token}"}
+
+    queries.clear()
+    assert client.get("/me", headers=headers).json()["username"] == "timer"
+    assert len(queries) == 1 and len(decodes) == 1
+
+    # Requisições seguintes: sem decodificar o token nem consultar o banco
+    for _ in range(3):
+        assert client.get("/me", headers=headers).status_code == 200
+    assert len(queries) == 1 and len(decodes) == 1
+
+def test_user_changes_invalidate_cache(auth_env):
+    client, SessionLocal, _ = auth_env
+    db = SessionLocal()
+    user = User(username="cached", email="cached@example.com", is_active=True)
+    db.add(user)
+    db.commit()
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': str(user.id)})}"}
+
+    assert client.get("/me", headers=headers).status_code == 200
+    user.is_active = False
+    db.commit()
+    db.close()
+    assert client.get("/me", headers=headers).status_code == 401
+
+def test_invalid_and_expired_tokens_are_rejected(auth_env):
+    client, SessionLocal, _ = auth_env
+    db = SessionLocal()
+    user = User(username="expired", email="expired@example.com", is_active=True)
+    db.add(user)
+    db.commit()
+    user_id = user.id
+    db.close()
+
+    expired = create_access_token({"sub": str(user_id)}, expires_delta=timedelta(seconds=-1))
+    valid = create_access_token({"sub": str(user_id)})
+    for token in (expired, valid[:-2] + "xx", "nao-e-jwt"):
+        assert client.get("/me", headers={"Authorization": f"Bearer {token}"}).status_code == 401
+    assert client.get("/me").status_code == 401
+    assert len(token_cache) == 0
+
+def test_login_upgrades_password_cost(auth_env, monkeypatch):
+    client, SessionLocal, _ = auth_env
+    client.post("/api/auth/register", json={"username": "rehash", "email": "rehash@example.com", "password": "segredo123"})
+    monkeypatch.setattr(passwords, "_hasher", passwords.PasswordHasher(workers=0, rounds=5))
+
+    assert client.post("/api/auth/token", data={"username": "rehash", "password": "segredo123"}).status_code == 200
+    db = SessionLocal()
+    assert db.query(User.hashed_password).filter(User.username == "rehash").scalar().startswith("$2b$05$")
+    db.close()
@@ -0,0 +1,57 @@
+from sqlalchemy import func, select
+
+from backend.benchmarks.datagen import generate
+from backend.benchmarks.suite import compare
+from backend.database import Base
+from backend.models import PomodoroSession, Project, UserProgress
+from backend.services import DashboardService
+
+def _dataset(tmp_path, name, seed):
+    from backend.database import create_engine_from_env
+
+    engine = create_engine_from_env(f"sqlite:///{tmp_path / name}")
+    Base.metadata.create_all(bind=engine)
+    counts = generate(engine, sessions=4500, seed=seed)
+    with engine.connect() as connection:
+        digest = connection.execute(select(
+            func.count(PomodoroSession.id),
+            func.sum(PomodoroSession.total_work_time),
+            func.max(PomodoroSession.start_time)
+        )).one()
+    return engine, counts, tuple(digest)
+
+def test_generator_is_deterministic_and_consistent(tmp_path):
+    engine, counts, digest = _dataset(tmp_path, "a.db", seed=7)
+    _, _, same_digest = _dataset(tmp_path, "b.db", seed=7)
+    _, _, other_digest = _dataset(tmp_path, "c.db", seed=8)
+
+    assert counts['users'] == 2 and counts['sessions'] == 4500
+    assert digest == same_digest != other_digest
+
+    with engine.connect() as connection:
+        completed_minutes = connection.execute(
+            select(func.sum(PomodoroSession.total_work_time)).where(PomodoroSession.is_completed == True)
+        ).scalar() // 60
+        assert connection.execute(select(func.sum(Project.total_work_time))).scalar() <= completed_minutes
+        assert connection.execute(select(func.count()).select_from(UserProgress)).scalar() == 2
+
+    from sqlalchemy.orm import Session
+    with Session(bind=engine) as session:
+        assert DashboardService.get_dashboard_data(session, 1).total_pomodoro_sessions > 2000
+    engine.dispose()
+
+def test_compare_flags_slower_scenarios_and_extra_queries():
+    baseline = {"scenarios": {
+        "statistics": {"p50_ms": 10.0, "queries": 5},
+        "dashboard": {"p50_ms": 0.2, "queries": 4},
+    }}
+    results = {"scenarios": {
+        "statistics": {"p50_ms": 13.0, "queries": 6},
+        "dashboard": {"p50_ms": 0.5, "queries": 4},  # abaixo do ruído absoluto
+        "new_scenario": {"p50_ms": 100.0},
+    }}
+
+    assert compare(results, baseline, tolerance=0.2) == [
+        "statistics: p50 13.000 ms > 10.000 ms (+20%)",
+        "statistics: 6 consultas > 5",
+    ]
@@ -0,0 +1,75 @@
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+
+from backend.models import Achievement, PomodoroSession, Project, UserDailyStats, UserProgress
+from backend.schemas import PomodoroSessionImport
+from backend.services import PomodoroService, StatisticsService
+
+def _offline_sessions(project, count, start=datetime(2025, 3, 3, 9), total_time=25):
+    return [
+        PomodoroSessionImport(
+            client_uuid=uuid.uuid4(),
+            project_id=project.id if project else None,
+            start_time=start + timedelta(hours=index),
+            total_time=total_time
+        )
+        for index in range(count)
+    ]
+
+def test_ingest_records_sessions_and_rollups(db, user, project):
+    result = PomodoroService.ingest_sessions(db, user.id, _offline_sessions(project, 5))
+
+    assert (result.received, result.inserted, result.duplicates) == (5, 5, 0)
+    assert db.query(PomodoroSession).filter_by(user_id=user.id, is_completed=True).count() == 5
+
+    daily = db.query(UserDailyStats).filter_by(user_id=user.id).one()
+    assert (daily.total_sessions, daily.total_work_time) == (5, 5 * 1500)
+
+    statistics = StatisticsService.calculate_productivity(db, user.id)
+    assert statistics == StatisticsService.calculate_productivity(db, user.id, source='sessions')
+
+    db.refresh(project)
+    assert (project.total_pomodoro_sessions, project.total_work_time) == (5, 125)
+
+def test_ingest_retry_is_idempotent(db, user, project):
+    sessions = _offline_sessions(project, 3)
+    PomodoroService.ingest_sessions(db, user.id, sessions)
+
+    # Reenvio do mesmo lote (mais uma sessão nova e um UUID repetido no próprio lote)
+    extra = _offline_sessions(project, 1, start=datetime(2025, 3, 4, 9))
+    result = PomodoroService.ingest_sessions(db, user.id, sessions + extra + extra)
+
+    assert (result.received, result.inserted, result.duplicates) == (5, 1, 4)
+    progress = db.query(UserProgress).filter_by(user_id=user.id).one()
+    assert (progress.total_sessions, progress.current_streak) == (4, 2)
+    db.refresh(project)
+    assert project.total_pomodoro_sessions == 4
+
+def test_ingest_out_of_order_days_recomputes_streak(db, user, project):
+    # Quarta-feira sincronizada antes de segunda e terça
+    PomodoroService.ingest_sessions(db, user.id, _offline_sessions(project, 1, start=datetime(2025, 3, 5, 9)))
+    PomodoroService.ingest_sessions(db, user.id, _offline_sessions(project, 1, start=datetime(2025, 3, 3, 9)))
+    PomodoroService.ingest_sessions(db, user.id, _offline_sessions(project, 1, start=datetime(2025, 3, 4, 9)))
+
+    progress = db.query(UserProgress).filter_by(user_id=user.id).one()
+    db.refresh(progress)
+    assert (progress.current_streak, progress.longest_streak) == (3, 3)
+    assert progress.last_session_day == datetime(2025, 3, 5).date()
+
+def test_ingest_unlocks_achievements(db, user, project):
+    result = PomodoroService.ingest_sessions(db, user.id, _offline_sessions(project, 5))
+
+    assert {"Bem-vindo ao Pomodoro", "Iniciante do Pomodoro"} <= set(result.unlocked_achievements)
+    titles = {achievement.title for achievement in db.query(Achievement).filter_by(user_id=user.id, is_unlocked=True)}
+    assert set(result.unlocked_achievements) == titles
+
+def test_ingest_rejects_foreign_project(db, user):
+    other = Project(title="Outro", user_id=user.id + 1)
+    db.add(other)
+    db.commit()
+
+    with pytest.raises(ValueError):
+        PomodoroService.ingest_sessions(db, user.id, _offline_sessions(other, 1))
+    assert db.query(PomodoroSession).count() == 0
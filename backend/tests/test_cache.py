@@ -0,0 +1,107 @@
+import asyncio
+
+import pytest
+from sqlalchemy.util import greenlet_spawn
+from starlette.requests import Request
+
+from backend.cache import MemoryCacheBackend, RedisCacheBackend, ResponseCache, cached_json_response, response_cache
+from backend.services import PomodoroService
+
+def test_memory_backend_lru_and_ttl(monkeypatch):
+    backend = MemoryCacheBackend(max_entries=2, ttl=10)
+    backend.set("a", b"1")
+    backend.set("b", b"2")
+    assert backend.get("a") == b"1"
+    backend.set("c", b"3")  # remove "b", o menos usado recentemente
+
+    assert backend.get("b") is None
+    assert backend.stats.as_dict() == {'hits': 1, 'misses': 1, 'evictions': 1}
+    metrics = ResponseCache(backend).render()
+    assert "# TYPE response_cache_hits_total counter" in metrics
+    assert "response_cache_evictions_total 1" in metrics
+
+    now = backend._entries["a"][1]
+    monkeypatch.setattr("backend.cache.time.monotonic", lambda: now + 1)
+    assert backend.get("a") is None
+    assert backend.stats.evictions == 2
+
+def test_version_bump_changes_key_and_etag():
+    cache = ResponseCache(MemoryCacheBackend())
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        return b"{}"
+
+    _, etag = asyncio.run(cache.get_or_compute("statistics", 1, compute))
+    assert asyncio.run(cache.get_or_compute("statistics", 1, compute)) == (b"{}", etag)
+    assert len(calls) == 1
+
+    cache.invalidate_user(1)
+    _, new_etag = asyncio.run(cache.get_or_compute("statistics", 1, compute))
+    assert new_etag != etag
+    assert len(calls) == 2
+
+def test_redis_backend_stays_off_the_sync_client_on_the_event_loop():
+    fakeredis = pytest.importorskip("fakeredis")
+    server = fakeredis.FakeServer()
+    backend = RedisCacheBackend("redis://localhost:6379/0", ttl=10)
+    backend.client = fakeredis.FakeRedis(server=server)
+    backend.async_client = fakeredis.FakeAsyncRedis(server=server)
+    cache = ResponseCache(backend)
+
+    async def compute():
+        return b"{}"
+
+    async def scenario():
+        _, etag = await cache.get_or_compute("statistics", 1, compute)
+        assert (await cache.get_or_compute("statistics", 1, compute))[1] == etag
+
+        # Invalidação feita por um serviço dentro de run_sync: só o cliente assíncrono
+        sync_client, backend.client = backend.client, None
+        await greenlet_spawn(cache.invalidate_user, 1)
+        backend.client = sync_client
+        assert await cache.aversion(1) == "0.1"
+
+        # Entrada removida pelo Redis antes de a versão mudar
+        key = f"statistics:1:{await cache.aversion(1)}"
+        await backend.aset(key, b"{}")
+        await backend.async_client.delete("productivity:" + key)
+        assert await backend.aget(key) is None
+
+    asyncio.run(scenario())
+    assert backend.stats.as_dict() == {'hits': 1, 'misses': 2, 'evictions': 1}
+
+def test_pomodoro_transitions_invalidate_user(db, user):
+    before = response_cache.version(user.id)
+    session = PomodoroService.start_session(db, user_id=user.id)
+    after_start = response_cache.version(user.id)
+    PomodoroService.complete_session(db, session_id=session.id)
+
+    assert before != after_start != response_cache.version(user.id)
+
+def _request(if_none_match=None):
+    headers = [(b"if-none-match", if_none_match.encode())] if if_none_match else []
+    return Request({"type": "http", "method": "GET", "path": "/data", "headers": headers})
+
+def test_if_none_match_returns_304_without_computing():
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        return b'{"ok": true}'
+
+    def respond(request):
+        return asyncio.run(cached_json_response(request, "test", 42, compute))
+
+    first = respond(_request())
+    assert first.status_code == 200 and first.body == b'{"ok": true}'
+
+    second = respond(_request(first.headers["etag"]))
+    assert second.status_code == 304
+    assert len(calls) == 1
+
+    response_cache.invalidate_user(42)
+    third = respond(_request(first.headers["etag"]))
+    assert third.status_code == 200
+    assert len(calls) == 2
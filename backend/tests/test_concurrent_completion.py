@@ -0,0 +1,86 @@
+import threading
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.orm import sessionmaker
+
+from backend.database import Base, create_engine_from_env
+from backend.models import Project, UserDailyStats, UserProgress
+from backend.services import PomodoroService
+
+WORKERS = 64
+
+@pytest.fixture
+def engine(tmp_path):
+    # Banco em arquivo (em vez do em memória do conftest) para conexões reais
+    # concorrentes; uma conexão a mais para a sessão ``db`` do teste
+    engine = create_engine_from_env(f"sqlite:///{tmp_path / 'concurrency.db'}", pool_size=WORKERS + 1, max_overflow=0)
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    engine.dispose()
+
+def _run_concurrently(engine, targets):
+    """Executar cada ``target(db)`` em sua própria thread e sessão, todas liberadas juntas"""
+    SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False)
+    barrier = threading.Barrier(len(targets))
+    errors = []
+
+    def worker(target):
+        db = SessionLocal()
+        try:
+            barrier.wait()
+            target(db)
+        except Exception as exc:
+            errors.append(exc)
+        finally:
+            db.close()
+
+    threads = [threading.Thread(target=worker, args=(target,)) for target in targets]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    return SessionLocal()
+
+def test_concurrent_completions_lose_no_increments(engine, user, project, started_session):
+    user_id, project_id = user.id, project.id
+    session_ids = [started_session(user_id, project_id).id for _ in range(WORKERS)]
+
+    db = _run_concurrently(engine, [
+        lambda db, session_id=session_id: PomodoroService.complete_session(db, session_id, total_time=25)
+        for session_id in session_ids
+    ])
+
+    project = db.get(Project, project_id)
+    assert (project.total_pomodoro_sessions, project.total_work_time) == (WORKERS, WORKERS * 25)
+    progress = db.get(UserProgress, user_id)
+    assert (progress.total_sessions, progress.total_work_time) == (WORKERS, WORKERS * 1500)
+    assert sum(row.total_sessions for row in db.query(UserDailyStats).filter_by(user_id=user_id)) == WORKERS
+    db.close()
+
+def test_concurrent_completions_of_one_session_count_once(engine, user, project, started_session):
+    user_id, project_id = user.id, project.id
+    session_id = started_session(user_id, project_id).id
+
+    db = _run_concurrently(engine, [
+        lambda db: PomodoroService.complete_session(db, session_id, total_time=25)
+    ] * WORKERS)
+
+    assert db.get(Project, project_id).total_pomodoro_sessions == 1
+    assert db.get(UserProgress, user_id).total_sessions == 1
+    db.close()
+
+def test_completion_reads_session_once(db, user, project, started_session):
+    session_id = started_session(user.id, project.id).id
+    statements = []
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(db.get_bind(), "before_cursor_execute", listener)
+    try:
+        completed = PomodoroService.complete_session(db, session_id, total_time=25)
+    finally:
+        event.remove(db.get_bind(), "before_cursor_execute", listener)
+
+    assert (completed.status, completed.total_work_time, completed.is_completed) == ('completed', 1500, True)
+    assert sum("FROM pomodoro_sessions" in statement for statement in statements) == 1
+    assert not any(statement.startswith("SELECT") and "FROM projects" in statement for statement in statements)
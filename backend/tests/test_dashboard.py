@@ -0,0 +1,47 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import event
+
+from backend.services import DashboardService, PomodoroService
+
+def _completed_session(db, user, project, start_time):
+    session = PomodoroService.start_session(db, user_id=user.id, project_id=project.id)
+    session.start_time = start_time
+    db.commit()
+    PomodoroService.complete_session(db, session_id=session.id, total_time=25)
+
+def test_dashboard_is_a_single_query(engine, db, user, project):
+    now = datetime.utcnow()
+    _completed_session(db, user, project, now - timedelta(days=2))
+    _completed_session(db, user, project, now - timedelta(days=1))
+    _completed_session(db, user, project, now)
+    interrupted = PomodoroService.start_session(db, user_id=user.id, project_id=project.id)
+    PomodoroService.stop_session(db, interrupted.id)
+    user_id = user.id
+
+    statements = []
+    listener = lambda *args: statements.append(args[2])
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        dashboard = DashboardService.get_dashboard_data(db, user_id)
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+
+    assert len(statements) == 1
+    assert dashboard.dict() == {
+        'total_projects': 1,
+        'total_pomodoro_sessions': 3,
+        'total_work_time_minutes': 75,
+        'total_achievements': 2,
+        'today_work_time_minutes': 25,
+        'today_sessions': 1,
+        'current_streak': 3,
+        'longest_streak': 3,
+    }
+
+def test_dashboard_for_new_user_and_broken_streak(db, user, project):
+    assert DashboardService.get_dashboard_data(db, user.id).total_pomodoro_sessions == 0
+
+    _completed_session(db, user, project, datetime.utcnow() - timedelta(days=3))
+    dashboard = DashboardService.get_dashboard_data(db, user.id)
+    assert (dashboard.current_streak, dashboard.longest_streak, dashboard.today_sessions) == (0, 1, 0)
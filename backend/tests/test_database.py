@@ -0,0 +1,29 @@
+import logging
+
+from sqlalchemy import text
+from sqlalchemy.pool import QueuePool
+
+from backend.database import create_engine_from_env
+
+def test_sqlite_file_engine_is_pooled_with_pragmas(tmp_path, monkeypatch):
+    monkeypatch.setenv("SQLITE_BUSY_TIMEOUT_MS", "1234")
+    engine = create_engine_from_env(f"sqlite:///{tmp_path / 'app.db'}")
+
+    with engine.connect() as connection:
+        assert connection.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        assert connection.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+        assert connection.execute(text("PRAGMA busy_timeout")).scalar() == 1234
+
+    assert isinstance(engine.pool, QueuePool)
+    assert engine.echo is False
+    engine.dispose()
+
+def test_slow_queries_are_logged(monkeypatch, caplog):
+    monkeypatch.setenv("DB_SLOW_QUERY_MS", "0.000001")
+    engine = create_engine_from_env("sqlite://")
+
+    with caplog.at_level(logging.WARNING, logger="backend.database"):
+        with engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+
+    assert any("SELECT 1" in record.getMessage() for record in caplog.records)
@@ -0,0 +1,111 @@
+import csv
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from backend import exports
+from backend.exports import ExportManager
+from backend.models import PomodoroSession, Task, User
+
+@pytest.fixture
+def manager(engine, tmp_path):
+    manager = ExportManager(sessionmaker(bind=engine), str(tmp_path / "exports"), chunk_size=4)
+    yield manager
+    manager.shutdown()
+
+@pytest.fixture
+def history(db, user, project):
+    other = User(username="other", email="other@example.com")
+    db.add(other)
+    db.flush()
+    start = datetime(2025, 1, 6, 9)
+    db.add_all([
+        PomodoroSession(user_id=user.id, project_id=project.id if index % 2 else None,
+                        start_time=start + timedelta(hours=index), work_duration=25, break_duration=5,
+                        status='completed', mode='work', total_work_time=1500, is_completed=True)
+        for index in range(10)
+    ])
+    db.add(PomodoroSession(user_id=other.id, start_time=start, work_duration=25, break_duration=5, mode='work'))
+    db.add(Task(title="Relatório", owner_id=user.id))
+    db.commit()
+    return user.id
+
+def _finished(manager, job):
+    manager.shutdown(wait=True)
+    return manager.get(job.id)
+
+def test_csv_export_is_scoped_to_user(manager, history):
+    job = _finished(manager, manager.submit(history, "csv"))
+
+    assert job.status == "completed"
+    assert (job.rows_total, job.rows_written, job.progress) == (12, 12, 1.0)
+    with open(manager.file_path(job, "pomodoro_sessions"), newline="") as source:
+        rows = list(csv.DictReader(source))
+    assert len(rows) == 10
+    assert {row['user_id'] for row in rows} == {str(history)}
+    assert rows[0]['start_time'] == "2025-01-06T09:00:00"
+
+def test_parquet_export_in_chunks(manager, history):
+    pyarrow = pytest.importorskip("pyarrow")
+    import pyarrow.parquet
+
+    job = _finished(manager, manager.submit(history, "parquet", ["pomodoro_sessions"]))
+
+    parquet_file = pyarrow.parquet.ParquetFile(manager.file_path(job, "pomodoro_sessions"))
+    assert parquet_file.metadata.num_rows == 10
+    assert parquet_file.metadata.num_row_groups == 3  # lotes de 4 linhas
+    table = parquet_file.read()
+    assert table.schema.field("start_time").type == pyarrow.timestamp("us")
+    assert table.column("project_id").null_count == 5
+
+def test_missing_pyarrow_falls_back_to_csv(manager, history, monkeypatch):
+    monkeypatch.setattr(exports, "_pyarrow", lambda: None)
+    job = _finished(manager, manager.submit(history, "arrow", ["tasks"]))
+    assert job.format == "csv"
+    assert job.files == {"tasks": "tasks.csv"}
+
+def test_invalid_requests_and_unknown_jobs(manager):
+    with pytest.raises(ValueError):
+        manager.submit(1, "xlsx")
+    with pytest.raises(ValueError):
+        manager.submit(1, "csv", ["users"])
+    assert manager.get("../etc") is None
+
+def test_shutdown_fails_queued_and_running_jobs(manager, history, monkeypatch):
+    started, release = threading.Event(), threading.Event()
+
+    def slow_count(db, table, user_id=None):
+        started.set()
+        release.wait(5)
+        return 0
+
+    monkeypatch.setattr(manager, "_count", slow_count)
+    running = manager.submit(history, "csv")
+    queued = manager.submit(history, "csv")
+    assert started.wait(5)
+
+    manager.shutdown(wait=False)
+    assert manager.get(queued.id).status == "failed"
+    release.set()
+    manager.shutdown(wait=True)
+    assert manager.get(running.id).status == "failed"
+
+def test_fail_stale_marks_abandoned_jobs(manager, history):
+    job = _finished(manager, manager.submit(history, "csv", ["tasks"]))
+    abandoned = exports.ExportJob("a" * 32, history, "csv", ["tasks"])
+    recent = exports.ExportJob("b" * 32, history, "csv", ["tasks"])
+    for pending in (abandoned, recent):
+        os.makedirs(manager._job_dir(pending.id))
+        manager._save(pending)
+    old = time.time() - 2 * 3600
+    for job_id in (job.id, abandoned.id):
+        os.utime(os.path.join(manager._job_dir(job_id), "job.json"), (old, old))
+
+    assert manager.fail_stale() == 1
+    assert manager.get(abandoned.id).status == "failed"
+    assert manager.get(recent.id).status == "pending"
+    assert manager.get(job.id).status == "completed"
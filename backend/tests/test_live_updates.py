@@ -0,0 +1,87 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy.util import greenlet_spawn
+
+from backend.live_updates import RedisBroker, broker, notify, sse_stream
+from backend.services import PomodoroService
+
+async def _collect(subscription, timeout=0.2):
+    messages = []
+    while True:
+        payload = await subscription.get(timeout)
+        if payload is None:
+            return messages
+        messages.append(json.loads(payload))
+
+def test_messages_published_only_after_commit(db, user):
+    async def scenario():
+        async with broker.subscribe(user.id) as subscription:
+            db.connection()  # Abrir a transação
+            notify(db, user.id, "session", {"id": 1})
+            assert await _collect(subscription, 0.05) == []
+            db.commit()
+            committed = await _collect(subscription)
+
+            db.connection()
+            notify(db, user.id, "session", {"id": 2})
+            db.rollback()
+            rolled_back = await _collect(subscription, 0.05)
+        return committed, rolled_back
+
+    committed, rolled_back = asyncio.run(scenario())
+    assert committed == [{"type": "session", "data": {"id": 1}}]
+    assert rolled_back == []
+
+def test_completion_pushes_session_statistics_and_achievements(db, user, project):
+    user_id = user.id
+
+    async def scenario():
+        async with broker.subscribe(user_id) as subscription:
+            session = PomodoroService.start_session(db, user_id=user_id, project_id=project.id)
+            PomodoroService.complete_session(db, session.id, total_time=25)
+            return await _collect(subscription)
+
+    messages = asyncio.run(scenario())
+    assert [message["type"] for message in messages] == ["session", "session", "statistics", "achievement"]
+    assert messages[1]["data"]["status"] == "completed"
+    assert messages[2]["data"]["total_work_time"] == 1500
+    assert messages[2]["data"]["daily"][0]["total_sessions"] == 1
+    assert messages[3]["data"]["title"] == "Bem-vindo ao Pomodoro"
+    assert broker.subscriber_count(user_id) == 0
+
+def test_sse_stream_frames_messages():
+    async def scenario():
+        stream = sse_stream(42, heartbeat=0.05)
+        frames = [await stream.__anext__()]
+        broker.publish(42, '{"type": "session", "data": {}}')
+        frames.append(await stream.__anext__())
+        frames.append(await stream.__anext__())
+        await stream.aclose()
+        return frames
+
+    assert asyncio.run(scenario()) == [
+        b"retry: 3000\n\n",
+        b'data: {"type": "session", "data": {}}\n\n',
+        b": ping\n\n",
+    ]
+
+def test_redis_broker_publishes_without_the_sync_client_on_the_event_loop():
+    fakeredis = pytest.importorskip("fakeredis")
+    server = fakeredis.FakeServer()
+    redis_broker = RedisBroker("redis://localhost:6379/0")
+    redis_broker.client = None
+    redis_broker.async_client = fakeredis.FakeAsyncRedis(server=server)
+    redis_broker._async_module = SimpleNamespace(
+        Redis=SimpleNamespace(from_url=lambda url: fakeredis.FakeAsyncRedis(server=server))
+    )
+
+    async def scenario():
+        async with redis_broker.subscribe(7) as subscription:
+            # after_commit de uma sessão dentro de run_sync
+            await greenlet_spawn(redis_broker.publish, 7, '{"type": "session", "data": {}}')
+            return await _collect(subscription)
+
+    assert asyncio.run(scenario()) == [{"type": "session", "data": {}}]
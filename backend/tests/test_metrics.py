@@ -0,0 +1,80 @@
+import logging
+
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import select, text
+from sqlalchemy.orm import sessionmaker
+
+from backend.metrics import MetricsMiddleware, MetricsRegistry
+from backend.models import Project
+
+def _app(engine, registry, query_threshold=5):
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware, registry=registry, query_threshold=query_threshold)
+    SessionLocal = sessionmaker(bind=engine)
+
+    def get_db():
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    @app.get("/projects/{user_id}")
+    def list_projects(user_id: int, db=Depends(get_db)):
+        return [project.title for project in db.scalars(select(Project).where(Project.user_id == user_id))]
+
+    @app.get("/n-plus-one")
+    def n_plus_one(db=Depends(get_db)):
+        return [db.execute(text("SELECT :value"), {"value": value}).scalar() for value in range(10)]
+
+    return app
+
+def test_route_latency_queries_and_rows(engine, db, user):
+    db.add_all([Project(title=f"P{index}", user_id=user.id) for index in range(3)])
+    db.commit()
+    registry = MetricsRegistry()
+    client = TestClient(_app(engine, registry))
+
+    assert client.get(f"/projects/{user.id}").json() == ["P0", "P1", "P2"]
+    client.get(f"/projects/{user.id}")
+
+    metrics = registry.get("GET", "/projects/{user_id}")
+    assert metrics.latency.count == 2
+    assert metrics.queries.sum == 2
+    assert metrics.rows == 6
+    assert metrics.status == {200: 2}
+
+    output = registry.render()
+    assert 'http_requests_total{method="GET",route="/projects/{user_id}",status="200"} 2' in output
+    assert 'http_request_db_queries_bucket{method="GET",route="/projects/{user_id}",le="1"} 2' in output
+    assert 'http_request_duration_seconds_count{method="GET",route="/projects/{user_id}"} 2' in output
+
+def test_n_plus_one_requests_are_logged(engine, caplog):
+    registry = MetricsRegistry()
+    client = TestClient(_app(engine, registry, query_threshold=5))
+
+    with caplog.at_level(logging.WARNING, logger="backend.metrics"):
+        client.get("/n-plus-one")
+
+    assert registry.get("GET", "/n-plus-one").queries.sum == 10
+    assert any("10 consultas" in record.getMessage() and "SELECT ?" in record.getMessage() for record in caplog.records)
+
+def test_async_routes_are_measured():
+    from sqlalchemy.ext.asyncio import AsyncSession
+    from backend.database import create_async_engine_from_env
+
+    engine = create_async_engine_from_env("sqlite://")
+    registry = MetricsRegistry()
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware, registry=registry)
+
+    @app.get("/values")
+    async def values():
+        async with AsyncSession(engine) as db:
+            result = await db.execute(text("SELECT 1 UNION ALL SELECT 2"))
+            return result.scalars().all()
+
+    assert TestClient(app).get("/values").json() == [1, 2]
+    metrics = registry.get("GET", "/values")
+    assert (metrics.queries.sum, metrics.rows) == (1, 2)
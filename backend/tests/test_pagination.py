@@ -0,0 +1,120 @@
+import json
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import select
+
+from backend.crud import crud_event, crud_task
+from backend.models import Event, PomodoroSession, Task, User
+from backend.pagination import decode_cursor, encode_cursor, stream_ndjson
+from backend.services import PomodoroService
+
+def _add_sessions(db, user, count, start=datetime(2025, 1, 1, 9)):
+    # Horários repetidos para exercitar o desempate por id
+    db.add_all([
+        PomodoroSession(user_id=user.id, start_time=start + timedelta(hours=index // 2),
+                        work_duration=25, break_duration=5, mode='work')
+        for index in range(count)
+    ])
+    db.commit()
+
+def _all_pages(db, user_id, limit):
+    ids, cursor = [], None
+    while True:
+        page = PomodoroService.list_sessions(db, user_id, cursor, limit)
+        ids += [session.id for session in page["items"]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return ids
+
+def test_sessions_pages_cover_history_in_order(db, user):
+    _add_sessions(db, user, 7)
+
+    ids = _all_pages(db, user.id, limit=3)
+
+    expected = db.execute(
+        select(PomodoroSession.id).order_by(PomodoroSession.start_time.desc(), PomodoroSession.id.desc())
+    ).scalars().all()
+    assert ids == expected
+
+def test_cursor_is_stable_across_inserts(db, user):
+    _add_sessions(db, user, 4)
+    first = PomodoroService.list_sessions(db, user.id, limit=2)
+
+    # Sessão nova (mais recente) não desloca a próxima página
+    _add_sessions(db, user, 1, start=datetime(2025, 2, 1))
+    second = PomodoroService.list_sessions(db, user.id, first["next_cursor"], limit=2)
+
+    seen = {session.id for session in first["items"]}
+    assert len(second["items"]) == 2
+    assert seen.isdisjoint(session.id for session in second["items"])
+    assert second["next_cursor"] is None
+
+def test_invalid_cursor_is_rejected(db, user):
+    with pytest.raises(ValueError):
+        PomodoroService.list_sessions(db, user.id, cursor="não-é-um-cursor")
+
+async def _async_history(db):
+    user = User(username="pageuser", email="page@example.com")
+    db.add(user)
+    await db.commit()
+    db.add_all([Task(title=f"Tarefa {index}", owner_id=user.id) for index in range(5)])
+    db.add_all([
+        PomodoroSession(user_id=user.id, start_time=datetime(2025, 1, 1) + timedelta(minutes=index),
+                        work_duration=25, break_duration=5, mode='work')
+        for index in range(25)
+    ])
+    await db.commit()
+
+    first = await crud_task.get_user_tasks_page(db, user.id, limit=3)
+    second = await crud_task.get_user_tasks_page(db, user.id, first["next_cursor"], limit=3)
+
+    stmt = select(PomodoroSession.id, PomodoroSession.start_time)\
+        .where(PomodoroSession.user_id == user.id)\
+        .order_by(PomodoroSession.start_time, PomodoroSession.id)
+    chunks = [chunk async for chunk in stream_ndjson(db, stmt, batch_size=10)]
+
+    return first, second, chunks
+
+def test_tasks_pages_and_ndjson_stream(run_async_db):
+    first, second, chunks = run_async_db(_async_history)
+
+    assert [task.title for task in first["items"] + second["items"]] == [f"Tarefa {index}" for index in range(4, -1, -1)]
+    assert second["next_cursor"] is None
+
+    # Um bloco por lote do cursor no servidor
+    assert len(chunks) == 3
+    lines = b"".join(chunks).decode().splitlines()
+    assert len(lines) == 25
+    assert json.loads(lines[0])["start_time"] == "2025-01-01T00:00:00"
+
+async def _event_pages(db):
+    user = User(username="eventpages", email="eventpages@example.com")
+    db.add(user)
+    await db.commit()
+    db.add_all([
+        Event(title=f"Evento {index}", owner_id=user.id,
+              start_time=datetime(2025, 1, 1) + timedelta(hours=index) if index % 2 else None)
+        for index in range(5)
+    ])
+    await db.commit()
+
+    pages, cursor = [], None
+    while True:
+        page = await crud_event.get_user_events_page(db, user.id, cursor, limit=2)
+        pages.append([event.title for event in page["items"]])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return pages
+
+def test_events_without_start_time_are_paged_last(run_async_db):
+    pages = run_async_db(_event_pages)
+
+    # Com início primeiro (mais recentes antes); sem início depois, por id decrescente
+    assert pages == [["Evento 3", "Evento 1"], ["Evento 4", "Evento 2"], ["Evento 0"]]
+
+def test_null_cursor_values_only_for_nullable_columns():
+    sort_columns = (Event.start_time, Event.id)
+    assert decode_cursor(encode_cursor([None, 3]), sort_columns) == [None, 3]
+    with pytest.raises(ValueError):
+        decode_cursor(encode_cursor([datetime(2025, 1, 1), None]), sort_columns)
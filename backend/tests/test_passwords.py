@@ -0,0 +1,111 @@
+import asyncio
+import time
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from backend import passwords
+from backend.passwords import PasswordHasher, PasswordHasherBusy
+
+@pytest.fixture
+def process_hasher():
+    hasher = PasswordHasher(workers=1, max_pending=8, rounds=4)
+    yield hasher
+    hasher.shutdown()
+
+def test_hash_and_verify_in_process_pool(process_hasher):
+    async def run():
+        hashed = await process_hasher.hash("segredo123")
+        return hashed, await process_hasher.verify("segredo123", hashed), await process_hasher.verify("errada", hashed)
+
+    hashed, valid, invalid = asyncio.run(run())
+    assert hashed.startswith("$2b$04$")
+    assert valid == (True, None)
+    assert invalid == (False, None)
+    assert process_hasher.counts["hash"] == 1 and process_hasher.counts["verify"] == 2
+    assert process_hasher.pending == 0
+
+def test_login_rehashes_to_configured_cost(process_hasher):
+    stronger = PasswordHasher(workers=0, rounds=5)
+
+    async def run():
+        hashed = await process_hasher.hash("segredo123")
+        return await stronger.verify("segredo123", hashed)
+
+    try:
+        valid, new_hash = asyncio.run(run())
+    finally:
+        stronger.shutdown()
+    assert valid and new_hash.startswith("$2b$05$")
+    assert stronger.counts["rehash"] == 1
+
+def test_pending_limit_rejects_and_is_reported():
+    hasher = PasswordHasher(workers=0, max_pending=1, rounds=4)
+
+    async def run():
+        return await asyncio.gather(hasher.hash("a"), hasher.hash("b"), return_exceptions=True)
+
+    try:
+        first, second = asyncio.run(run())
+    finally:
+        hasher.shutdown()
+    assert isinstance(first, str) and isinstance(second, PasswordHasherBusy)
+    metrics = hasher.render()
+    assert 'password_hash_operations_total{operation="rejected"} 1' in metrics
+    assert "password_hash_queue_depth 0" in metrics
+
+def test_event_loop_stays_responsive_while_hashing():
+    hasher = PasswordHasher(workers=2, max_pending=8, rounds=12)
+
+    async def run():
+        await hasher.hash("aquecimento")  # inicia os processos do pool
+        gaps = []
+        done = asyncio.Event()
+
+        async def ticker():
+            last = time.perf_counter()
+            while not done.is_set():
+                await asyncio.sleep(0.005)
+                now = time.perf_counter()
+                gaps.append(now - last)
+                last = now
+
+        task = asyncio.create_task(ticker())
+        await asyncio.gather(*(hasher.hash(f"senha{index}") for index in range(4)))
+        done.set()
+        await task
+        return max(gaps)
+
+    try:
+        worst_gap = asyncio.run(run())
+    finally:
+        hasher.shutdown()
+    assert worst_gap < 0.1
+
+class _BrokenPool:
+    def submit(self, *args):
+        future = Future()
+        future.set_exception(BrokenProcessPool("processo encerrado"))
+        return future
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        pass
+
+def test_broken_pool_is_replaced_and_operation_retried():
+    hasher = PasswordHasher(workers=0, rounds=4)
+    hasher._executor = _BrokenPool()
+    try:
+        hashed = asyncio.run(hasher.hash("segredo123"))
+        assert not isinstance(hasher._executor, _BrokenPool)
+    finally:
+        hasher.shutdown()
+    assert hashed.startswith("$2b$04$")
+    assert hasher.pending == 0
+
+def test_default_pool_is_split_between_web_workers(monkeypatch):
+    monkeypatch.delenv("PASSWORD_HASH_WORKERS", raising=False)
+    monkeypatch.setattr(passwords.os, "cpu_count", lambda: 16)
+    monkeypatch.setattr(passwords, "_hasher", None)
+    monkeypatch.setenv("WEB_CONCURRENCY", "4")
+    assert passwords.get_password_hasher().workers == 2
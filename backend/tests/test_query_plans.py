@@ -0,0 +1,91 @@
+from datetime import datetime
+
+from sqlalchemy import event, func, select
+
+from backend.models import Achievement, Event, PomodoroSession
+from backend.services import AchievementService, RollupService
+from backend.statistics_engine import StatisticsEngine
+
+def _query_plan(engine, statement, parameters=()):
+    with engine.connect() as connection:
+        rows = connection.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters)
+        return "\n".join(row[-1] for row in rows)
+
+def _captured_selects(engine, run):
+    """Executar ``run`` e devolver os SELECTs emitidos (com parâmetros)"""
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        run()
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+    return statements
+
+def _compiled(engine, query):
+    compiled = query.compile(engine)
+    return str(compiled), tuple(compiled.params[name] for name in compiled.positiontup)
+
+def test_statistics_scan_is_index_only(engine, db, user):
+    user_id = user.id
+    (statement, parameters), = _captured_selects(
+        engine, lambda: StatisticsEngine.calculate(db, user_id)
+    )
+    assert "COVERING INDEX idx_pomodoro_sessions_user_completed_start" in _query_plan(engine, statement, parameters)
+
+def test_rollup_rebuild_scan_is_index_only(engine, db, user):
+    user_id = user.id
+    statements = _captured_selects(engine, lambda: RollupService.rebuild(db, user_id))
+    plans = [_query_plan(engine, statement, parameters) for statement, parameters in statements
+             if "FROM pomodoro_sessions" in statement]
+    assert plans and all("COVERING INDEX idx_pomodoro_sessions_user_completed_start" in plan for plan in plans)
+
+def test_dashboard_totals_are_index_only(engine, user):
+    totals = select(func.count(PomodoroSession.id), func.sum(PomodoroSession.total_work_time))\
+        .where(PomodoroSession.user_id == user.id)
+    assert "COVERING INDEX" in _query_plan(engine, *_compiled(engine, totals))
+
+    by_project = select(PomodoroSession.project_id, func.sum(PomodoroSession.total_work_time))\
+        .where(PomodoroSession.user_id == user.id)\
+        .group_by(PomodoroSession.project_id)
+    plan = _query_plan(engine, *_compiled(engine, by_project))
+    assert "COVERING INDEX idx_pomodoro_sessions_user_project_work" in plan
+    assert "TEMP B-TREE" not in plan
+
+    unlocked = select(func.count(Achievement.id))\
+        .where(Achievement.user_id == user.id, Achievement.is_unlocked == True)
+    assert "COVERING INDEX idx_achievements_user_unlocked" in _query_plan(engine, *_compiled(engine, unlocked))
+
+def test_unlocked_achievements_use_composite_index(engine, db, user):
+    user_id = user.id
+    (statement, parameters), = _captured_selects(
+        engine, lambda: AchievementService.get_unlocked_achievements(db, user_id)
+    )
+    assert "INDEX idx_achievements_user_unlocked" in _query_plan(engine, statement, parameters)
+
+def test_running_sessions_use_partial_index(engine, user):
+    running = select(PomodoroSession.id, PomodoroSession.start_time)\
+        .where(PomodoroSession.user_id == user.id, PomodoroSession.status == 'running')\
+        .order_by(PomodoroSession.start_time.desc())
+    # O índice parcial só é considerado quando o predicado aparece como literal
+    statement = str(running.compile(engine, compile_kwargs={"literal_binds": True}))
+    plan = _query_plan(engine, statement)
+    assert "INDEX idx_pomodoro_sessions_running" in plan
+    assert "TEMP B-TREE" not in plan
+
+def test_event_range_queries_stay_in_the_interval_indexes(engine, user):
+    window = select(Event.id).where(
+        Event.owner_id == user.id,
+        Event.start_time < datetime(2026, 2, 1),
+        Event.end_time > datetime(2026, 1, 1)
+    )
+    plan = _query_plan(engine, *_compiled(engine, window))
+    assert "COVERING INDEX idx_events_owner_" in plan
+    assert "owner_id=?" in plan
+
+    upcoming = select(Event.id).where(Event.owner_id == user.id, Event.end_time > datetime(2026, 1, 1))
+    assert "COVERING INDEX idx_events_owner_end_start (owner_id=? AND end_time>?)" in _query_plan(engine, *_compiled(engine, upcoming))
@@ -0,0 +1,106 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from backend.agenda import agenda_cache
+from backend.crud import crud_event
+from backend.models import Event, User
+from backend.recurrence import RecurrenceRule, Series
+from backend.schemas import EventExceptionCreate
+
+MONDAY = datetime(2026, 3, 2, 9, 30)
+
+def _brute_force(rule, dtstart, after):
+    return [start for start in rule.starts(dtstart) if start >= after]
+
+def test_parse_normalizes_and_rejects_invalid_rules():
+    assert str(RecurrenceRule.parse("rrule:freq=weekly;byday=fr,mo;count=4")) == "FREQ=WEEKLY;BYDAY=MO,FR;COUNT=4"
+    for text in ("FREQ=YEARLY", "FREQ=DAILY;BYDAY=MO", "FREQ=DAILY;COUNT=0", "FREQ=DAILY;BYHOUR=9", "FREQ=WEEKLY;BYDAY=XX"):
+        with pytest.raises(ValueError):
+            RecurrenceRule.parse(text)
+
+@pytest.mark.parametrize("text", [
+    "FREQ=DAILY;INTERVAL=3;COUNT=40",
+    "FREQ=WEEKLY;BYDAY=MO,WE,SU;COUNT=25",
+    "FREQ=WEEKLY;INTERVAL=2;BYDAY=TU,TH;UNTIL=20260701T000000",
+    "FREQ=MONTHLY;COUNT=8",
+])
+def test_jumping_to_the_window_matches_full_iteration(text):
+    rule = RecurrenceRule.parse(text)
+    dtstart = MONDAY + timedelta(days=2)
+    for offset in range(-3, 200, 7):
+        after = dtstart + timedelta(days=offset, hours=1)
+        assert list(rule.starts(dtstart, after=after)) == _brute_force(rule, dtstart, after)
+
+def test_monthly_skips_months_without_the_day():
+    rule = RecurrenceRule.parse("FREQ=MONTHLY;COUNT=4")
+    starts = list(rule.starts(datetime(2026, 1, 31, 8)))
+    assert [start.month for start in starts] == [1, 3, 5, 7]
+
+class _Row:
+    def __init__(self, **values):
+        self.__dict__.update(values)
+
+def test_series_occurrences_apply_exceptions():
+    event = _Row(id=1, owner_id=1, title="Daily", description=None, location=None, is_all_day=False,
+                 start_time=MONDAY, end_time=MONDAY + timedelta(minutes=15),
+                 recurrence_rule="FREQ=WEEKLY;BYDAY=MO,TU,WE,TH,FR")
+    exceptions = [
+        _Row(original_start=MONDAY + timedelta(days=1), is_cancelled=True, start_time=None, end_time=None),
+        # Ocorrência da semana seguinte movida para dentro da janela consultada
+        _Row(original_start=MONDAY + timedelta(days=7), is_cancelled=False,
+             start_time=MONDAY + timedelta(days=5), end_time=MONDAY + timedelta(days=5, minutes=30)),
+    ]
+    series = Series(event, exceptions)
+
+    occurrences = series.occurrences(MONDAY - timedelta(hours=1), MONDAY + timedelta(days=6))
+    assert [(item.start_time, item.original_start) for item in occurrences] == [
+        (MONDAY, MONDAY),
+        (MONDAY + timedelta(days=2), MONDAY + timedelta(days=2)),
+        (MONDAY + timedelta(days=3), MONDAY + timedelta(days=3)),
+        (MONDAY + timedelta(days=4), MONDAY + timedelta(days=4)),
+        (MONDAY + timedelta(days=5), MONDAY + timedelta(days=7)),
+    ]
+    # Uma semana daqui a dez anos sem percorrer as ocorrências anteriores
+    far = MONDAY + timedelta(weeks=520)
+    assert len(series.occurrences(far, far + timedelta(days=7))) == 5
+
+async def _series_cycle(db):
+    user = User(username="seriesuser", email="series@example.com")
+    db.add(user)
+    await db.commit()
+    series = Event(title="Daily", start_time=MONDAY, end_time=MONDAY + timedelta(minutes=15),
+                   owner_id=user.id, recurrence_rule="FREQ=DAILY")
+    single = Event(title="Revisão", start_time=MONDAY + timedelta(hours=1),
+                   end_time=MONDAY + timedelta(hours=2), owner_id=user.id)
+    db.add_all([series, single])
+    await db.commit()
+
+    window = (MONDAY - timedelta(hours=1), MONDAY + timedelta(days=3))
+    first = await crud_event.get_user_occurrences(db, user.id, *window)
+    cached = (await agenda_cache.get(db, user.id, events=False)).occurrences(*window)
+    again = (await agenda_cache.get(db, user.id, events=False)).occurrences(*window)
+
+    await crud_event.set_occurrence_exception(db, series, EventExceptionCreate(
+        original_start=MONDAY + timedelta(days=1), is_cancelled=True
+    ))
+    after_cancel = await crud_event.get_user_occurrences(db, user.id, *window)
+    with pytest.raises(ValueError):
+        await crud_event.set_occurrence_exception(db, series, EventExceptionCreate(
+            original_start=MONDAY + timedelta(days=1, minutes=5), is_cancelled=True
+        ))
+
+    return first, cached is again, after_cancel
+
+def test_range_merges_series_and_invalidates_on_exceptions(run_async_db):
+    agenda_cache.clear()
+    first, window_cached, after_cancel = run_async_db(_series_cycle)
+    agenda_cache.clear()
+
+    assert [(item.title, item.start_time.day) for item in first] == [
+        ("Daily", 2), ("Revisão", 2), ("Daily", 3), ("Daily", 4)
+    ]
+    assert window_cached
+    assert [(item.title, item.start_time.day) for item in after_cancel] == [
+        ("Daily", 2), ("Revisão", 2), ("Daily", 4)
+    ]
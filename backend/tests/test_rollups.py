@@ -0,0 +1,56 @@
+from datetime import datetime
+
+from backend.models import PomodoroSession, UserDailyStats, UserWeeklyStats, UserProjectStats
+from backend.services import PomodoroService, RollupService, StatisticsService
+
+def test_complete_session_updates_rollups(db, user, project, completed_session):
+    completed_session(user.id, datetime(2025, 1, 6, 9), project_id=project.id)
+    completed_session(user.id, datetime(2025, 1, 6, 14), project_id=project.id)
+    completed_session(user.id, datetime(2025, 1, 13, 9))
+
+    daily = db.query(UserDailyStats).filter_by(user_id=user.id).order_by(UserDailyStats.day).all()
+    assert [(str(row.day), row.total_sessions, row.total_work_time) for row in daily] == [
+        ('2025-01-06', 2, 3000),
+        ('2025-01-13', 1, 1500),
+    ]
+
+    weekly = db.query(UserWeeklyStats).filter_by(user_id=user.id).order_by(UserWeeklyStats.iso_week).all()
+    assert [(row.iso_year, row.iso_week, row.total_sessions) for row in weekly] == [(2025, 2, 2), (2025, 3, 1)]
+
+    project_stats = db.query(UserProjectStats).filter_by(user_id=user.id).one()
+    assert project_stats.total_sessions == 2
+
+def test_complete_session_twice_counts_once(db, user, project, completed_session):
+    session = completed_session(user.id, datetime(2025, 1, 6, 9), project_id=project.id)
+    PomodoroService.complete_session(db, session_id=session.id, total_time=25)
+
+    statistics = StatisticsService.calculate_productivity(db, user.id)
+    assert statistics.total_pomodoro_sessions == 1
+    assert statistics.total_work_time == 1500
+
+def test_statistics_read_from_rollups(db, user, project, completed_session):
+    completed_session(user.id, datetime(2024, 12, 30, 9), project_id=project.id)
+    completed_session(user.id, datetime(2025, 1, 2, 9), total_time=50, project_id=project.id)
+
+    statistics = StatisticsService.calculate_productivity(db, user.id)
+
+    assert statistics.total_pomodoro_sessions == 2
+    assert statistics.total_work_time == 4500
+    assert statistics.most_productive_project == {'id': project.id, 'title': project.title, 'total_time': 4500}
+    assert [row['date'] for row in statistics.daily_productivity] == ['2024-12-30', '2025-01-02']
+    # 2024-12-30 pertence à semana ISO 1 de 2025
+    assert statistics.weekly_productivity == [{'year': 2025, 'week': 1, 'total_time': 4500, 'total_sessions': 2}]
+    assert [(row['year'], row['month']) for row in statistics.monthly_productivity] == [(2024, 12), (2025, 1)]
+
+def test_rebuild_matches_incremental_rollups(db, user, project, completed_session):
+    for day in (3, 4, 4, 20):
+        completed_session(user.id, datetime(2025, 2, day, 10), project_id=project.id)
+    PomodoroService.start_session(db, user_id=user.id, project_id=project.id)  # em andamento, ignorada
+    expected = StatisticsService.calculate_productivity(db, user.id)
+
+    db.query(UserDailyStats).delete()
+    db.commit()
+    processed = RollupService.rebuild(db)
+
+    assert processed == db.query(PomodoroSession).filter_by(is_completed=True).count() == 4
+    assert StatisticsService.calculate_productivity(db, user.id) == expected
@@ -0,0 +1,117 @@
+import os
+import time
+
+import pytest
+
+from backend.server import check_workers, default_workers, migrations_pending, run_migrations
+from backend.startup import StartupReport
+
+def test_startup_report_records_marks_and_phases(capsys, monkeypatch):
+    report = StartupReport()
+    time.sleep(0.01)
+    report.mark("imports")
+    with report.phase("catalog"):
+        time.sleep(0.01)
+
+    data = report.as_dict()
+    assert list(data['phases_ms']) == ["imports", "catalog"]
+    assert all(elapsed >= 10 for elapsed in data['phases_ms'].values())
+    assert data['total_ms'] >= 20
+
+    monkeypatch.setenv("STARTUP_REPORT", "1")
+    report.emit()
+    assert "catalog" in capsys.readouterr().out
+
+def test_migrations_run_only_when_pending(tmp_path, monkeypatch):
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path / 'app.db'}")
+    assert migrations_pending()
+    run_migrations()
+    assert not migrations_pending()
+
+def test_achievement_dedup_keeps_unlocked_row(tmp_path, monkeypatch):
+    import subprocess
+    import sys
+
+    from sqlalchemy import create_engine, text
+
+    from backend.server import BACKEND_DIR
+
+    url = f"sqlite:///{tmp_path / 'app.db'}"
+    monkeypatch.setenv("DATABASE_URL", url)
+    subprocess.run([sys.executable, "-m", "alembic", "upgrade", "002"], cwd=BACKEND_DIR, check=True)
+
+    engine = create_engine(url)
+    with engine.begin() as connection:
+        connection.execute(text("INSERT INTO users (id, username, email) VALUES (1, 'ana', 'ana@example.com')"))
+        connection.execute(text(
+            "INSERT INTO achievements (id, user_id, title, description, achievement_type, is_unlocked, achieved_at) "
+            "VALUES (1, 1, 'Maratonista', '', 'sessions', 0, NULL), "
+            "(2, 1, 'Maratonista', '', 'sessions', 1, '2025-03-05 10:00:00'), "
+            "(3, 1, 'Maratonista', '', 'sessions', 1, '2025-03-04 10:00:00')"
+        ))
+    run_migrations()
+
+    with engine.connect() as connection:
+        rows = connection.execute(text("SELECT id, is_unlocked FROM achievements")).all()
+    engine.dispose()
+    assert [tuple(row) for row in rows] == [(3, 1)]
+
+def test_migrated_database_accepts_registration(tmp_path, monkeypatch):
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from sqlalchemy.ext.asyncio import AsyncSession
+    from sqlalchemy.orm import sessionmaker
+
+    from backend import passwords
+    from backend.database import create_async_engine_from_env, get_async_db
+    from backend.routes import router
+
+    url = f"sqlite:///{tmp_path / 'app.db'}"
+    monkeypatch.setenv("DATABASE_URL", url)
+    run_migrations()
+
+    monkeypatch.setattr(passwords, "_hasher", passwords.PasswordHasher(workers=0, rounds=4))
+    AsyncSessionLocal = sessionmaker(bind=create_async_engine_from_env(url), class_=AsyncSession)
+
+    async def override_db():
+        async with AsyncSessionLocal() as db:
+            yield db
+
+    app = FastAPI()
+    app.include_router(router, prefix="/api")
+    app.dependency_overrides[get_async_db] = override_db
+    response = TestClient(app).post("/api/auth/register", json={
+        "username": "novo", "email": "novo@example.com", "password": "segredo123"
+    })
+    passwords.shutdown_password_hasher()
+    assert response.status_code == 201
+
+def test_memory_backends_limit_workers(monkeypatch, capsys):
+    monkeypatch.delenv("WEB_CONCURRENCY", raising=False)
+    monkeypatch.setenv("RESPONSE_CACHE_BACKEND", "redis")
+    monkeypatch.setenv("ACTIVE_SESSIONS_BACKEND", "redis")
+    monkeypatch.delenv("LIVE_UPDATES_BACKEND", raising=False)
+    assert default_workers() == 1
+    with pytest.raises(SystemExit):
+        check_workers(4)
+    assert "LIVE_UPDATES_BACKEND=memory" in capsys.readouterr().err
+
+    check_workers(4, allow_per_process_state=True)
+    monkeypatch.setenv("LIVE_UPDATES_BACKEND", "redis")
+    check_workers(4)
+    assert default_workers() >= 1
+
+def test_fast_startup_defers_optional_subsystems(tmp_path):
+    import subprocess
+    import sys
+
+    script = (
+        "import sys\n"
+        "from fastapi.testclient import TestClient\n"
+        "from backend.main import app\n"
+        "with TestClient(app):\n"
+        "    print(sorted(m for m in ('backend.achievements', 'backend.exports', 'backend.passwords') if m in sys.modules))\n"
+    )
+    env = dict(os.environ, FAST_STARTUP="1", DATABASE_URL=f"sqlite:///{tmp_path / 'app.db'}", EXPORT_DIR=str(tmp_path))
+    result = subprocess.run([sys.executable, "-c", script], env=env, capture_output=True, text=True, check=True)
+    assert result.stdout.strip().splitlines()[-1] == "[]"
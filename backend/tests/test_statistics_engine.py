@@ -0,0 +1,35 @@
+from datetime import datetime
+
+from sqlalchemy import event
+
+from backend.models import Project
+from backend.services import PomodoroService, StatisticsService
+
+def test_single_pass_matches_rollups(db, user, project, completed_session):
+    other = Project(title="Outro", user_id=user.id)
+    db.add(other)
+    db.commit()
+
+    for month in range(1, 13):
+        for day in (1, 15, 28):
+            completed_session(user.id, datetime(2024, month, day, 9), project_id=project.id if day != 15 else other.id)
+    completed_session(user.id, datetime(2025, 1, 3, 9), total_time=50)
+    PomodoroService.start_session(db, user_id=user.id, project_id=project.id)
+
+    from_rollups = StatisticsService.calculate_productivity(db, user.id)
+    from_sessions = StatisticsService.calculate_productivity(db, user.id, source='sessions')
+
+    assert from_sessions == from_rollups
+    assert len(from_sessions.daily_productivity) == 30
+    assert from_sessions.most_productive_project['id'] == project.id
+
+def test_single_pass_issues_one_query(engine, db, user, project, completed_session):
+    user_id = user.id
+    completed_session(user_id, datetime(2025, 3, 1, 9), project_id=project.id)
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+    statistics = StatisticsService.calculate_productivity(db, user_id, source='sessions')
+
+    assert len(statements) == 1
+    assert statistics.total_work_time == 1500
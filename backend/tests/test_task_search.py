@@ -0,0 +1,64 @@
+import pytest
+from sqlalchemy import delete, update
+
+from backend.crud import crud_task
+from backend.models import Task, User
+from backend.task_search import search_terms
+
+def test_search_terms_are_words_only():
+    assert search_terms('Relatório "mensal"* OR -x') == ["relatório", "mensal", "or", "x"]
+    with pytest.raises(ValueError):
+        search_terms('"*" -')
+
+async def _search_cycle(db):
+    results = {}
+    owner = User(username="searchuser", email="search@example.com")
+    other = User(username="otheruser", email="other@example.com")
+    db.add_all([owner, other])
+    await db.commit()
+
+    db.add_all([
+        Task(title="Revisar orçamento", description="Planilha do relatório anual", priority=1, owner_id=owner.id),
+        Task(title="Relatório mensal", description="Enviar para a equipe", priority=2, owner_id=owner.id),
+        Task(title="Relatórios trimestrais", description=None, status="completed", priority=2, owner_id=owner.id),
+        Task(title="Comprar café", description="Mercado", owner_id=owner.id),
+        Task(title="Relatório de outro usuário", owner_id=other.id),
+    ])
+    await db.commit()
+
+    async def titles(text, **filters):
+        page = await crud_task.search(db, owner.id, text, **filters)
+        return [task.title for task in page["items"]]
+
+    # Prefixo sem acento encontra "Relatório"; título pesa mais que a descrição
+    results["prefix"] = await titles("relat")
+    results["all_terms"] = await titles("relatorio mensal")
+    results["status"] = await titles("relat", status="completed")
+    results["priority"] = await titles("relat", priority=1)
+
+    first = await crud_task.search(db, owner.id, "relat", limit=2)
+    second = await crud_task.search(db, owner.id, "relat", cursor=first["next_cursor"], limit=2)
+    results["pages"] = ([task.title for task in first["items"]], [task.title for task in second["items"]],
+                        second["next_cursor"])
+
+    # Triggers mantêm o índice em sincronia
+    await db.execute(update(Task).where(Task.title == "Comprar café").values(title="Comprar chá"))
+    await db.execute(delete(Task).where(Task.title == "Relatório mensal"))
+    await db.commit()
+    results["updated"] = (await titles("café"), await titles("chá"), await titles("mensal"))
+
+    return results
+
+def test_search_ranks_filters_and_paginates(run_async_db):
+    results = run_async_db(_search_cycle)
+
+    assert set(results["prefix"][:2]) == {"Relatório mensal", "Relatórios trimestrais"}
+    assert results["prefix"][2] == "Revisar orçamento"
+    assert len(results["prefix"]) == 3
+    assert results["all_terms"] == ["Relatório mensal"]
+    assert results["status"] == ["Relatórios trimestrais"]
+    assert results["priority"] == ["Revisar orçamento"]
+
+    first, second, next_cursor = results["pages"]
+    assert first + second == results["prefix"] and next_cursor is None
+    assert results["updated"] == ([], ["Comprar chá"], [])
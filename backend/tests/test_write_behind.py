@@ -0,0 +1,108 @@
+import pytest
+from sqlalchemy import event
+from sqlalchemy.orm import sessionmaker
+
+from backend.database import Base, create_engine_from_env
+from backend.models import PomodoroSession, User, UserProgress
+from backend.write_behind import SessionWriteBuffer
+
+@pytest.fixture
+def file_engine(tmp_path):
+    engine = create_engine_from_env(f"sqlite:///{tmp_path / 'write_behind.db'}")
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    engine.dispose()
+
+@pytest.fixture
+def SessionLocal(file_engine):
+    return sessionmaker(bind=file_engine, autocommit=False, autoflush=False)
+
+@pytest.fixture
+def user_id(SessionLocal):
+    db = SessionLocal()
+    user = User(username="buffered", email="buffered@example.com")
+    db.add(user)
+    db.commit()
+    user_id = user.id
+    db.close()
+    return user_id
+
+def _buffer(SessionLocal, tmp_path, **options):
+    buffer = SessionWriteBuffer(SessionLocal, str(tmp_path / "journal.jsonl"), **options)
+    buffer.start()
+    return buffer
+
+def test_starts_are_group_committed(file_engine, SessionLocal, user_id, tmp_path):
+    commits = []
+    event.listen(file_engine, "commit", lambda conn: commits.append(conn))
+    buffer = _buffer(SessionLocal, tmp_path, flush_interval=5, max_events=20)
+
+    futures = [buffer.submit_start(user_id) for _ in range(20)]
+    session_ids = [future.result(timeout=5) for future in futures]
+    buffer.close()
+
+    assert len(set(session_ids)) == 20
+    assert len(commits) == 1
+    assert (tmp_path / "journal.jsonl").read_text() == ""
+
+def test_reads_see_pending_transitions(SessionLocal, user_id, tmp_path):
+    buffer = _buffer(SessionLocal, tmp_path, flush_interval=0.01)
+    session_id = buffer.submit_start(user_id).result(timeout=5)
+
+    db = SessionLocal()
+    session = db.get(PomodoroSession, session_id)
+    buffer.submit_transition(user_id, session_id, 'pause')
+    buffer.submit_transition(user_id, session_id, 'complete', mode='work', total_time=25)
+    merged = buffer.merged(session)
+    assert (merged.status, merged.total_work_time, merged.is_completed) == ('completed', 1500, True)
+
+    assert buffer.drain(timeout=5)
+    db.expire_all()
+    assert db.get(PomodoroSession, session_id).status == 'completed'
+    assert db.get(UserProgress, user_id).total_sessions == 1
+    db.close()
+    buffer.close()
+
+def test_journal_is_replayed_once_after_crash(SessionLocal, user_id, tmp_path):
+    crashed = _buffer(SessionLocal, tmp_path, flush_interval=60, max_events=1000)
+    crashed.submit_start(user_id)
+    crashed.submit_start(user_id)
+    # Simular a queda: os eventos só existem no journal
+    with crashed._condition:
+        crashed._queue.clear()
+    crashed.close()
+    journal = (tmp_path / "journal.jsonl").read_text()
+    # Linha incompleta de uma escrita interrompida
+    (tmp_path / "journal.jsonl").write_text(journal + journal + '{"type":"sta')
+
+    recovered = _buffer(SessionLocal, tmp_path)
+    recovered.close()
+
+    db = SessionLocal()
+    assert db.query(PomodoroSession).filter_by(user_id=user_id).count() == 2
+    db.close()
+
+def test_workers_lock_separate_journals_and_adopt_orphans(SessionLocal, user_id, tmp_path):
+    first = _buffer(SessionLocal, tmp_path, flush_interval=60, max_events=1000)
+    second = _buffer(SessionLocal, tmp_path, flush_interval=0.01)
+    assert first.journal_path == str(tmp_path / "journal.jsonl")
+    assert second.journal_path == str(tmp_path / "journal.1.jsonl")
+
+    # O flush do segundo worker não apaga os eventos pendentes do primeiro
+    first.submit_start(user_id)
+    second.submit_start(user_id).result(timeout=5)
+    assert (tmp_path / "journal.jsonl").read_text() != ""
+
+    # Queda do primeiro: o journal fica sem trava e é reaplicado pelo próximo
+    with first._condition:
+        first._queue.clear()
+    first.close()
+
+    third = _buffer(SessionLocal, tmp_path)
+    assert third.journal_path == str(tmp_path / "journal.jsonl")
+    third.close()
+    second.close()
+
+    db = SessionLocal()
+    assert db.query(PomodoroSession).filter_by(user_id=user_id).count() == 2
+    db.close()
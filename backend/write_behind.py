@@ -0,0 +1,319 @@
+import glob
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import Future
+from datetime import datetime
+
+from .cache import response_cache
+from .schemas import PomodoroSessionResponse
+from .services import PomodoroService
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+logger = logging.getLogger(__name__)
+
+# Limite de journals por arquivo configurado (um por worker)
+MAX_JOURNAL_SLOTS = 1024
+
+def _pending_fields(event):
+    """Campos da sessão alterados por uma transição (visão mesclada antes do flush)"""
+    if event['type'] == 'pause':
+        return {'status': 'paused'}
+    if event['type'] == 'stop':
+        return {'status': 'interrupted', 'end_time': event['at'], 'is_completed': False}
+    if event['type'] == 'complete':
+        return {
+            'status': 'completed',
+            'mode': event['mode'],
+            'end_time': event['at'],
+            'total_work_time': event['total_time'] * 60,
+            'is_completed': True
+        }
+    return {}
+
+def _encode(event) -> str:
+    return json.dumps({**event, 'at': event['at'].isoformat()}, separators=(",", ":")) + "\n"
+
+def _decode(line: str):
+    event = json.loads(line)
+    event['at'] = datetime.fromisoformat(event['at'])
+    return event
+
+def _journal_slot(base_path: str, slot: int) -> str:
+    """``pomodoro_journal.jsonl``, ``pomodoro_journal.1.jsonl``, ..."""
+    if slot == 0:
+        return base_path
+    stem, extension = os.path.splitext(base_path)
+    return f"{stem}.{slot}{extension}"
+
+def _existing_slots(base_path: str):
+    stem, extension = os.path.splitext(base_path)
+    paths = {base_path} if os.path.exists(base_path) else set()
+    for path in glob.glob(f"{glob.escape(stem)}.*{glob.escape(extension)}"):
+        if path[len(stem) + 1:len(path) - len(extension)].isdigit():
+            paths.add(path)
+    return sorted(paths)
+
+def _try_lock(journal_path: str):
+    """Trava exclusiva do journal (arquivo ``.lock`` ao lado); None se outro processo a detém
+
+    A trava é liberada pelo sistema se o processo morrer.
+    """
+    handle = open(journal_path + ".lock", "a+b")
+    try:
+        if fcntl is not None:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            handle.seek(0)
+            msvcrt.locking(handle.fileno(), msvcrt.LK_NBLCK, 1)
+    except OSError:
+        handle.close()
+        return None
+    return handle
+
+class SessionWriteBuffer:
+    """Buffer write-behind das transições de Pomodoro com group commit
+
+    Cada transição é anexada a um journal local (append-only) e enfileirada;
+    uma thread aplica a fila em uma única transação a cada ``flush_interval``
+    segundos ou ``max_events`` eventos. O journal recebe fsync uma vez por
+    grupo e é truncado quando tudo o que contém já foi gravado no banco. Após
+    uma queda, ``start()`` reaplica o journal (a aplicação é idempotente).
+
+    Cada processo trava o seu journal: ``journal_path`` é o primeiro livre
+    entre o configurado e ``<nome>.1.jsonl``, ``<nome>.2.jsonl``... Journals
+    de processos que morreram (sem trava) são reaplicados e esvaziados por
+    quem iniciar depois.
+
+    Inícios de sessão esperam o group commit (o cliente precisa do id);
+    pausas, interrupções e conclusões retornam assim que estão no journal.
+    Estas sobrevivem à queda do processo, mas não à do sistema (falta de
+    energia) antes do fsync do próximo grupo, em até ``flush_interval``.
+    """
+
+    def __init__(self, session_factory, journal_path: str, flush_interval: float = 0.05, max_events: int = 500):
+        self.session_factory = session_factory
+        self.journal_path = journal_path
+        self.flush_interval = flush_interval
+        self.max_events = max_events
+
+        self._condition = threading.Condition()
+        self._queue = []
+        self._in_flight = 0
+        self._pending = {}  # session_id -> (campos pendentes, último seq)
+        self._seq = 0
+        self._journal = None
+        self._lock_handle = None
+        self._thread = None
+        self._stopping = False
+
+    def start(self):
+        """Travar um journal, reaplicar os órfãos e iniciar a thread de flush"""
+        base_path = self.journal_path
+        for slot in range(MAX_JOURNAL_SLOTS):
+            self._lock_handle = _try_lock(_journal_slot(base_path, slot))
+            if self._lock_handle is not None:
+                self.journal_path = _journal_slot(base_path, slot)
+                break
+        else:
+            raise RuntimeError(f"Nenhum journal livre para {base_path}")
+
+        self._replay(self.journal_path)
+        for path in _existing_slots(base_path):
+            if path == self.journal_path:
+                continue
+            # Journal de um processo que morreu: reaplicar enquanto travado
+            handle = _try_lock(path)
+            if handle is not None:
+                try:
+                    self._replay(path)
+                finally:
+                    handle.close()
+
+        self._journal = open(self.journal_path, "a", encoding="utf-8")
+        self._thread = threading.Thread(target=self._run, name="session-write-behind", daemon=True)
+        self._thread.start()
+
+    def close(self):
+        """Gravar o que estiver pendente e parar a thread"""
+        with self._condition:
+            self._stopping = True
+            self._condition.notify_all()
+        if self._thread:
+            self._thread.join()
+        if self._journal:
+            self._journal.close()
+        if self._lock_handle:
+            self._lock_handle.close()
+
+    def submit_start(self, user_id: int, project_id: int = None, work_duration: int = 25, break_duration: int = 5,
+                     started_at: datetime = None):
+        """Enfileirar o início de uma sessão; o Future resolve com o id após o group commit"""
+        return self._submit({
+            'type': 'start',
+            'at': started_at or datetime.utcnow(),
+            'client_uuid': str(uuid.uuid4()),
+            'user_id': user_id,
+            'project_id': project_id,
+            'work_duration': work_duration,
+            'break_duration': break_duration,
+        })
+
+    def submit_transition(self, user_id: int, session_id: int, kind: str, **fields):
+        """Enfileirar pausa (``pause``), interrupção (``stop``) ou conclusão (``complete``)"""
+        return self._submit({'type': kind, 'user_id': user_id, 'session_id': session_id, **fields})
+
+    def merged(self, session):
+        """Sessão (do banco ou do registro ativo) com as transições ainda não gravadas aplicadas por cima"""
+        response = session if isinstance(session, PomodoroSessionResponse) else PomodoroSessionResponse.from_orm(session)
+        with self._condition:
+            pending = self._pending.get(response.id)
+        return response.copy(update=pending[0]) if pending else response
+
+    def drain(self, timeout: float = None):
+        """Esperar até que todos os eventos enviados estejam gravados no banco"""
+        with self._condition:
+            self._condition.notify_all()
+            return self._condition.wait_for(lambda: not self._queue and not self._in_flight, timeout)
+
+    def _submit(self, event):
+        event.setdefault('at', datetime.utcnow())
+        future = Future()
+        with self._condition:
+            if self._stopping:
+                raise RuntimeError("Buffer write-behind encerrado")
+            self._seq += 1
+            event['seq'] = self._seq
+            self._journal.write(_encode(event))
+            self._journal.flush()  # Sobrevive a uma queda do processo; fsync (queda do sistema) no próximo grupo
+
+            if event['type'] != 'start':
+                fields, _ = self._pending.get(event['session_id'], ({}, 0))
+                self._pending[event['session_id']] = ({**fields, **_pending_fields(event)}, event['seq'])
+
+            self._queue.append((event, future))
+            if len(self._queue) in (1, self.max_events):
+                # Primeiro evento inicia a janela do grupo; o limite a encerra
+                self._condition.notify_all()
+        return future
+
+    def _run(self):
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._queue or self._stopping)
+                if not self._queue:
+                    return
+
+                # Acumular eventos até o intervalo de flush ou o tamanho máximo do grupo
+                deadline = time.monotonic() + self.flush_interval
+                while len(self._queue) < self.max_events and not self._stopping:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0 or not self._condition.wait(remaining):
+                        break
+
+                batch = self._queue[:self.max_events]
+                if not batch:
+                    continue
+                del self._queue[:self.max_events]
+                self._in_flight = len(batch)
+                os.fsync(self._journal.fileno())
+
+            self._flush(batch)
+
+            with self._condition:
+                self._in_flight = 0
+                last_seq = batch[-1][0]['seq']
+                for session_id in [key for key, (_, seq) in self._pending.items() if seq <= last_seq]:
+                    del self._pending[session_id]
+                if not self._queue:
+                    # Tudo o que está no journal já foi gravado
+                    self._journal.truncate(0)
+                    self._journal.seek(0)
+                self._condition.notify_all()
+
+    def _flush(self, batch):
+        """Aplicar um grupo em uma transação; em caso de erro, evento a evento"""
+        db = self.session_factory()
+        try:
+            try:
+                session_ids, user_ids = PomodoroService.apply_events(db, [event for event, _ in batch])
+                db.commit()
+                self._resolve(batch, session_ids)
+            except Exception:
+                logger.exception("Falha no group commit de %d eventos; aplicando individualmente", len(batch))
+                db.rollback()
+                user_ids = set()
+                for event, future in batch:
+                    try:
+                        session_ids, users = PomodoroService.apply_events(db, [event])
+                        db.commit()
+                        user_ids |= users
+                        self._resolve([(event, future)], session_ids)
+                    except Exception as exc:
+                        db.rollback()
+                        future.set_exception(exc)
+        finally:
+            db.close()
+
+        for user_id in user_ids:
+            response_cache.invalidate_user(user_id)
+
+    @staticmethod
+    def _resolve(batch, session_ids):
+        for event, future in batch:
+            if not future.done():
+                future.set_result(session_ids.get(event['client_uuid']) if event['type'] == 'start' else event['session_id'])
+
+    def _replay(self, journal_path: str):
+        """Reaplicar eventos que ficaram no journal (ignora uma última linha incompleta)"""
+        if not os.path.exists(journal_path):
+            return
+        events = []
+        with open(journal_path, encoding="utf-8") as journal:
+            for line in journal:
+                try:
+                    events.append(_decode(line))
+                except ValueError:
+                    logger.warning("Linha incompleta ignorada no journal %s", journal_path)
+        for offset in range(0, len(events), self.max_events):
+            self._flush([(event, Future()) for event in events[offset:offset + self.max_events]])
+        if events:
+            logger.info("%d eventos reaplicados do journal %s", len(events), journal_path)
+        open(journal_path, "w").close()
+
+# Buffer global (None quando o modo write-behind está desligado)
+write_buffer = None
+
+def configure_write_buffer():
+    """Criar e iniciar o buffer se POMODORO_WRITE_BEHIND estiver ligado
+
+    Variáveis: POMODORO_WRITE_BEHIND, WRITE_BEHIND_JOURNAL,
+    WRITE_BEHIND_FLUSH_MS e WRITE_BEHIND_MAX_EVENTS.
+    """
+    global write_buffer
+    from .database import SessionLocal, _env_bool
+
+    if write_buffer is None and _env_bool("POMODORO_WRITE_BEHIND"):
+        write_buffer = SessionWriteBuffer(
+            SessionLocal,
+            journal_path=os.getenv("WRITE_BEHIND_JOURNAL", "./pomodoro_journal.jsonl"),
+            flush_interval=float(os.getenv("WRITE_BEHIND_FLUSH_MS", "50")) / 1000,
+            max_events=int(os.getenv("WRITE_BEHIND_MAX_EVENTS", "500"))
+        )
+        write_buffer.start()
+    return write_buffer
+
+def shutdown_write_buffer():
+    """Gravar os eventos pendentes e desligar o buffer"""
+    global write_buffer
+    if write_buffer is not None:
+        write_buffer.close()
+        write_buffer = None
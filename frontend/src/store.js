@@ -6,7 +6,8 @@ export default createStore({
     user: null,
     tasks: [],
     events: [],
-    pomodoroSessions: []
+    pomodoroSessions: [],
+    pomodoroSessionsCursor: null
   },
   mutations: {
     setUser(state, user) {
@@ -20,13 +21,19 @@ export default createStore({
     },
     setPomodoroSessions(state, sessions) {
       state.pomodoroSessions = sessions
+    },
+    appendPomodoroSessions(state, sessions) {
+      state.pomodoroSessions = state.pomodoroSessions.concat(sessions)
+    },
+    setPomodoroSessionsCursor(state, cursor) {
+      state.pomodoroSessionsCursor = cursor
     }
   },
   actions: {
     async fetchTasks({ commit }) {
       try {
         const response = await axios.get('/api/tasks')
-        commit('setTasks', response.data)
+        commit('setTasks', response.data.items)
       } catch (error) {
         console.error('Erro ao buscar tarefas:', error)
       }
@@ -34,15 +41,29 @@ export default createStore({
     async fetchEvents({ commit }) {
       try {
         const response = await axios.get('/api/events')
-        commit('setEvents', response.data)
+        commit('setEvents', response.data.items)
       } catch (error) {
         console.error('Erro ao buscar eventos:', error)
       }
     },
     async fetchPomodoroSessions({ commit }) {
       try {
-        const response = await axios.get('/api/pomodoro-sessions')
-        commit('setPomodoroSessions', response.data)
+        const response = await axios.get('/api/pomodoro/sessions')
+        commit('setPomodoroSessions', response.data.items)
+        commit('setPomodoroSessionsCursor', response.data.next_cursor)
+      } catch (error) {
+        console.error('Erro ao buscar sessões Pomodoro:', error)
+      }
+    },
+    // Próxima página do histórico (paginação por cursor)
+    async fetchMorePomodoroSessions({ commit, state }) {
+      if (!state.pomodoroSessionsCursor) return
+      try {
+        const response = await axios.get('/api/pomodoro/sessions', {
+          params: { cursor: state.pomodoroSessionsCursor }
+        })
+        commit('appendPomodoroSessions', response.data.items)
+        commit('setPomodoroSessionsCursor', response.data.next_cursor)
       } catch (error) {
         console.error('Erro ao buscar sessões Pomodoro:', error)
       }
@@ -4,6 +4,7 @@ setup(
     name='ProductivityApp_New',
     version='0.1',
     packages=find_packages(),
+    package_data={'backend': ['achievement_rules.json']},
     install_requires=[
         'fastapi',
         'sqlalchemy',
@@ -5,14 +5,12 @@ import threading
 import time
 
 def start_backend():
-    """Iniciar servidor backend"""
+    """Iniciar servidor backend (opções repassadas ao launcher, ex.: --dev)"""
     print("🔧 Iniciando Backend...")
+    # Saída herdada do terminal: sem threads lendo pipes
     backend_process = subprocess.Popen(
-        [sys.executable, "run_server.py"], 
-        cwd="./backend",
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE,
-        text=True
+        [sys.executable, "run_server.py", *sys.argv[1:]],
+        cwd="./backend"
     )
     return backend_process
 
@@ -55,11 +53,8 @@ def main():
     time.sleep(3)  # Aguardar backend iniciar
     frontend = start_frontend()
 
-    # Threads para capturar saída
-    backend_thread = threading.Thread(target=print_output, args=(backend, "🔧 Backend"))
+    # Thread para capturar saída do frontend
     frontend_thread = threading.Thread(target=print_output, args=(frontend, "🚀 Frontend"))
-
-    backend_thread.start()
     frontend_thread.start()
 
     try: